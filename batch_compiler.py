@@ -0,0 +1,134 @@
+import argparse
+import glob
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from compiler import compile_program
+from modules.compile_cache import CompileCache
+from modules.grammar import load_grammar
+
+_NO_ERROR_MSGS: Dict[str, str] = {
+    "syntax_errors.txt": "There is no syntax error.",
+    "semantic_errors.txt": "The input program is semantically correct.",
+}
+""" error files of a compilation and what they contain if there is no error """
+
+
+def _count_errors(job_dir: str, file_name: str) -> Optional[int]:
+    """number of errors reported in an error file of a job, None if the file is not written"""
+
+    try:
+        with open(os.path.join(job_dir, file_name)) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    return 0 if lines == [_NO_ERROR_MSGS[file_name]] else len(lines)
+
+
+def _compile_job(source: str, job_dir: str, grammar_addr: str, save_tree: bool, cache_dir: Optional[str], 
+        cache_size: int) -> dict:
+    """compiles a single source into its own directory and describes the result for the manifest"""
+
+    os.makedirs(job_dir, exist_ok=True)
+    cache = CompileCache(cache_dir, cache_size) if cache_dir else None
+    start = time.perf_counter()
+    status, err = "ok", None
+    try:
+        compile_program(source, job_dir, grammar_addr, save_tree, cache=cache)
+    except Exception:
+        status, err = "failed", traceback.format_exc(limit=-1).strip()
+
+    return {
+        "source": source,
+        "output_dir": job_dir,
+        "status": status,
+        "error": err,
+        "seconds": round(time.perf_counter() - start, 6),
+        "cached": bool(cache.stats["hits"]) if cache is not None else None,
+        # files of a failed job may be left from an earlier run in the same directory
+        "syntax_errors": _count_errors(job_dir, "syntax_errors.txt") if status == "ok" else None,
+        "semantic_errors": _count_errors(job_dir, "semantic_errors.txt") if status == "ok" else None,
+    }
+
+
+def _job_dirs(sources: List[str], out_dir: str) -> List[str]:
+    """an output directory per source, named after it and numbered if the name is taken"""
+
+    dirs: List[str] = list()
+    taken = set()
+    for source in sources:
+        name = os.path.splitext(os.path.basename(source))[0]
+        unique, i = name, 1
+        while unique in taken:
+            unique, i = f"{name}_{i}", i + 1
+        taken.add(unique)
+        dirs.append(os.path.join(out_dir, unique))
+    return dirs
+
+
+def compile_batch(sources: List[str], out_dir: str, grammar_addr: str = "grammar_v2.txt", save_tree: bool = True, 
+        jobs: Optional[int] = None, cache_dir: Optional[str] = None, cache_size: int = 256 << 20) -> dict:
+    """compiles many sources in parallel, each one into its own directory under `out_dir`, 
+    and writes a summary of all of them into `out_dir/manifest.json`
+
+    Args:
+        sources (List[str]): directories of the input codes
+        out_dir (str): directory where outputs of all compilations are saved
+        grammar_addr (str): directory of text file containing all rules of the language
+        save_tree (bool): whether to build and save parse trees
+        jobs (Optional[int]): number of worker processes. If None, the number of CPUs is used
+        cache_dir (Optional[str]): directory of cached outputs shared by all workers. If None, nothing is cached
+        cache_size (int): size of the cache in bytes
+
+    Returns:
+        dict: the manifest
+    """
+
+    # generate the grammar cache once, before workers race to do it
+    load_grammar(grammar_addr)
+
+    start = time.perf_counter()
+    job_dirs = _job_dirs(sources, out_dir)
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunksize = max(1, len(sources) // (jobs * 4))
+        results = list(executor.map(_compile_job, sources, job_dirs, [grammar_addr] * len(sources), 
+                [save_tree] * len(sources), [cache_dir] * len(sources), [cache_size] * len(sources), 
+                chunksize=chunksize))
+
+    manifest = {
+        "jobs": jobs,
+        "seconds": round(time.perf_counter() - start, 6),
+        "total": len(results),
+        "failed": sum(result["status"] != "ok" for result in results),
+        "with_errors": sum(bool(result["syntax_errors"] or result["semantic_errors"]) for result in results),
+        "cache_hits": sum(result["cached"] is True for result in results),
+        "cache_misses": sum(result["cached"] is False for result in results),
+        "results": results,
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="compiles many programs in parallel, each into its own directory")
+    arg_parser.add_argument("sources", nargs="+", help="source files or glob patterns")
+    arg_parser.add_argument("--out-dir", default="build", help="directory where outputs of all programs are saved")
+    arg_parser.add_argument("--grammar", default="grammar_v2.txt")
+    arg_parser.add_argument("--jobs", type=int, default=None, help="number of worker processes (default: number of CPUs)")
+    arg_parser.add_argument("--no-parse-tree", action="store_true", help="neither build nor save parse trees")
+    arg_parser.add_argument("--cache-dir", default=None, help="directory of cached outputs, shared by many batches")
+    arg_parser.add_argument("--cache-size", type=int, default=256, help="size of the cache in MB")
+    args = arg_parser.parse_args()
+
+    sources = [source for pattern in args.sources for source in sorted(glob.glob(pattern, recursive=True)) or [pattern]]
+    manifest = compile_batch(sources, args.out_dir, args.grammar, not args.no_parse_tree, args.jobs, 
+            args.cache_dir, args.cache_size << 20)
+    print(f"{manifest['total']} programs, {manifest['failed']} failed, {manifest['with_errors']} with errors, "
+          f"{manifest['cache_hits']} cached, {manifest['seconds']:.2f}s")
@@ -0,0 +1,77 @@
+""" measures how many semantic actions per second `CodeGenerator.code_gen` dispatches
+
+usage: python -m benchmarks.action_dispatch [--repeat 20000]
+"""
+import argparse
+import time
+from importlib import import_module
+from typing import Callable, List
+
+from benchmarks.parser_scaling import KEYWORDS, REPO_DIR
+from core.scanner import Scanner # imported first, like in compiler.py, to settle the import cycle
+from core.code_gen import CodeGenerator
+from enums.semantic_action import Action
+from modules.context import CompilationContext
+
+
+def _grammar_actions() -> List[str]:
+    """all action symbols of the grammar in the order they appear in its rules"""
+
+    with open(REPO_DIR / "grammar_v2.txt") as f:
+        return [symbol for symbol in f.read().split() if symbol.startswith("#")]
+
+
+def _silence_routines() -> None:
+    """replaces every routine by a no-op so only the dispatch itself is measured"""
+
+    routines = import_module("utils.routines")
+    for name, func in list(vars(routines).items()):
+        if name.isupper() and callable(func):
+            setattr(routines, name, lambda *args: None)
+
+
+def _legacy_code_gen(code_generator: CodeGenerator, action: Action) -> None:
+    """dispatch as it was done before the table: module lookup and list checks on every action"""
+
+    if action in [Action.ADD, Action.SUB, Action.MULT]:
+        prev_action = action
+        action = "#MATH"
+
+    routines = import_module(f"utils.routines")
+    func = getattr(routines, action[1:])
+
+    if action in [Action.CALL, Action.CHG_SCOPE, Action.PID, Action.PID2, Action.PNUM, Action.NARG, Action.SCOPING]:
+        func(code_generator.last_parsed_token)
+    elif action == "#MATH":
+        func(prev_action[1:])
+    else:
+        func()
+
+
+def _actions_per_sec(dispatch: Callable[[str], None], actions: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for action in actions:
+            dispatch(action)
+    return repeat * len(actions) / (time.perf_counter() - start)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=20000, help="passes over the grammar's action symbols")
+    args = arg_parser.parse_args()
+
+    _silence_routines()
+    actions = _grammar_actions()
+    code_generator = CodeGenerator(CompilationContext(KEYWORDS))
+    code_generator.last_parsed_token = "x"
+
+    before = _actions_per_sec(lambda action: _legacy_code_gen(code_generator, action), actions, args.repeat)
+    after = _actions_per_sec(code_generator.code_gen, actions, args.repeat)
+
+    print(f"before: {before:>12,.0f} actions/s")
+    print(f"after:  {after:>12,.0f} actions/s  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
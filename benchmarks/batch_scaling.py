@@ -0,0 +1,44 @@
+""" measures how batch compilation throughput scales with the number of worker processes
+
+usage: python -m benchmarks.batch_scaling [--files 200] [--size 2] [--jobs 1 2 4 8]  (size in KB)
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.parser_scaling import REPO_DIR
+from benchmarks.programs import synthetic_program
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=200, help="number of programs to compile")
+    arg_parser.add_argument("--size", type=int, default=2, help="size of every program in KB")
+    arg_parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8], help="numbers of workers to try")
+    args = arg_parser.parse_args()
+
+    from batch_compiler import compile_batch
+
+    # small enough for the default memory layout of `compiler.py`
+    source = synthetic_program(args.size * 1024)
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'jobs':>6} {'seconds':>10} {'files/s':>10} {'speedup':>8}")
+
+    with tempfile.TemporaryDirectory() as root:
+        sources = list()
+        for i in range(args.files):
+            sources.append(os.path.join(root, f"p{i}.txt"))
+            with open(sources[-1], "w") as f:
+                f.write(source)
+
+        base = None
+        for jobs in args.jobs:
+            manifest = compile_batch(sources, os.path.join(root, f"out{jobs}"), str(REPO_DIR / "grammar_v2.txt"), 
+                    save_tree=False, jobs=jobs)
+            assert manifest["failed"] == 0, "programs must fit in the default memory"
+            base = base or manifest["seconds"]
+            print(f"{jobs:>6} {manifest['seconds']:>10.3f} {args.files / manifest['seconds']:>10.1f} {base / manifest['seconds']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+""" measures compiling many programs in one process, each in its own `CompilationContext`, 
+against compiling each one in a separate interpreter
+
+usage: python -m benchmarks.compile_throughput [--files 50] [--size 4]  (size in KB)
+"""
+import argparse
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.parser_scaling import REPO_DIR
+from benchmarks.programs import synthetic_program
+
+_COMPILE_SCRIPT = "from compiler import compile_program; compile_program({!r}, {!r}, {!r})"
+
+
+def _job_dirs(root: str, n_files: int, source: str, name: str) -> List[str]:
+    """creates a directory per job with its own copy of the input"""
+
+    dirs = list()
+    for i in range(n_files):
+        job_dir = os.path.join(root, name, str(i))
+        os.makedirs(job_dir)
+        with open(os.path.join(job_dir, "input.txt"), "w") as f:
+            f.write(source)
+        dirs.append(job_dir)
+    return dirs
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=50, help="number of programs to compile")
+    arg_parser.add_argument("--size", type=int, default=4, help="size of every program in KB")
+    args = arg_parser.parse_args()
+
+    from compiler import compile_program
+
+    source = synthetic_program(args.size * 1024)
+    grammar_addr = str(REPO_DIR / "grammar_v2.txt")
+
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        in_process = _job_dirs(root, args.files, source, "in_process")
+        for job_dir in in_process:
+            compile_program(os.path.join(job_dir, "input.txt"), job_dir, grammar_addr)
+        in_process_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        separate = _job_dirs(root, args.files, source, "separate")
+        env = dict(os.environ, PYTHONPATH=str(REPO_DIR))
+        for job_dir in separate:
+            script = _COMPILE_SCRIPT.format(os.path.join(job_dir, "input.txt"), job_dir, grammar_addr)
+            subprocess.run([sys.executable, "-c", script], env=env, check=True)
+        separate_time = time.perf_counter() - start
+
+        # state must not leak between contexts, so every job gives the same outputs
+        outputs = os.listdir(separate[0])
+        for a, b in zip(in_process, separate):
+            _, mismatch, errors = filecmp.cmpfiles(a, b, outputs, shallow=False)
+            assert not mismatch and not errors, f"outputs differ: {mismatch + errors}"
+
+    print(f"one process:        {in_process_time:8.3f} s  {args.files / in_process_time:8.1f} files/s")
+    print(f"separate processes: {separate_time:8.3f} s  {args.files / separate_time:8.1f} files/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+""" measures loading the LL(1) grammar: generating it from `grammar_v2.txt` against loading it from the cache
+
+usage: python -m benchmarks.grammar_startup [--repeat 200]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from typing import Callable
+
+from benchmarks.parser_scaling import REPO_DIR
+from modules.grammar import load_grammar
+
+
+def _median_time(func: Callable[[], object], repeat: int) -> float:
+    times = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    grammar_addr = str(REPO_DIR / "grammar_v2.txt")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # every cold load gets an empty cache directory of its own
+        cold = _median_time(lambda: load_grammar(grammar_addr, tempfile.mkdtemp(dir=cache_dir)), args.repeat)
+        load_grammar(grammar_addr, cache_dir)
+        warm = _median_time(lambda: load_grammar(grammar_addr, cache_dir), args.repeat)
+
+    print(f"generated and cached: {cold * 1e3:8.3f} ms")
+    print(f"loaded from cache:    {warm * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+""" measures scanning of identifier-heavy sources, where every identifier and keyword is recorded in the symbol table
+
+usage: python -m benchmarks.identifier_scan [--size 2] [--locals 4 32] [--repeat 3]  (size in MB)
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Tuple
+
+from benchmarks.parser_scaling import KEYWORDS
+
+
+def identifier_program(size: int, n_locals: int, seed: int = 0) -> str:
+    """program of about `size` characters made of functions, each one assigning expressions over
+    `n_locals` local variables to each other, so nearly all tokens are repeated identifiers"""
+
+    rng = random.Random(seed)
+    names = [f"v{j}" for j in range(n_locals)]
+    lines: List[str] = list()
+    length, func_no = 0, 0
+    while length < size:
+        lines.append(f"def f{func_no}(v0):")
+        for name in names[1:]:
+            lines.append(f"    {name} = v0;")
+        for _ in range(4 * n_locals):
+            a, b, c, d = (rng.choice(names) for _ in range(4))
+            lines.append(f"    {a} = {b} + {c} * {d};")
+        lines.append(f"    return {rng.choice(names)};")
+        lines.append(";")
+        length = sum(len(line) + 1 for line in lines)
+        func_no += 1
+    lines.append("def main():")
+    lines.append("    output(f0(1));")
+    lines.append(";")
+    return "\n".join(lines) + "\n"
+
+
+def _scan(source: str, repeat: int) -> Tuple[int, float]:
+    """scans `source` some times as the parser would, recording identifiers in the symbol table
+
+    Returns:
+        Tuple[int, float]: number of identifiers and keywords, and the least seconds of the runs
+    """
+
+    from core.scanner import Scanner
+    from enums.token_type import TokenType
+    from modules.context import CompilationContext
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_addr = os.path.join(work_dir, "input.txt")
+        with open(input_addr, "w") as f:
+            f.write(source)
+
+        best = None
+        for _ in range(repeat):
+            n_names = 0
+            ctx = CompilationContext(KEYWORDS, work_dir)
+            with ctx.semantic, ctx.symbol_table:
+                start = time.perf_counter()
+                for token in Scanner(ctx, input_addr).tokens():
+                    if token.type in [TokenType.ID, TokenType.KEYWORD]:
+                        n_names += 1
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return n_names, best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--size", type=float, default=2, help="input size in MB")
+    arg_parser.add_argument("--locals", type=int, nargs="+", default=[4, 32], help="local variables per function")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="number of timed runs")
+    args = arg_parser.parse_args()
+
+    print(f"{'locals':>8} {'names':>10} {'seconds':>9} {'names/s':>12}")
+    for n_locals in args.locals:
+        source = identifier_program(int(args.size * 1024 * 1024), n_locals)
+        # a fresh process for every input, so runs do not share a warmed-up heap
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            n_names, seconds = executor.submit(_scan, source, args.repeat).result()
+        print(f"{n_locals:>8} {n_names:>10} {seconds:>9.3f} {n_names / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
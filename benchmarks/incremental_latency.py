@@ -0,0 +1,89 @@
+""" measures latency of recompiling a large program after single-line edits, incrementally against from scratch
+
+usage: python -m benchmarks.incremental_latency [--lines 20000] [--edits 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.parser_scaling import REPO_DIR
+from benchmarks.programs import synthetic_program
+
+_EDITS: Dict[str, Callable[[str], str]] = {
+    "change a constant": lambda line: line.replace("2", "3", 1) if "2" in line else line + " ",
+    "append a space": lambda line: line + " ",
+    "insert a statement": lambda line: "    c = c + 1;\n" + line,
+}
+""" single-line edits, made on a line inside a function """
+
+
+def _program(n_lines: int) -> List[str]:
+    lines: List[str] = list()
+    size = 16 * n_lines
+    while len(lines) < n_lines:
+        lines = synthetic_program(size).splitlines()
+        size *= 2
+    # whole functions only
+    end = max(i for i, line in enumerate(lines[:n_lines + 1]) if line.startswith("def"))
+    return lines[:end]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--lines", type=int, default=20000, help="lines of the program")
+    arg_parser.add_argument("--edits", type=int, default=20, help="edits of every kind, spread over the program")
+    args = arg_parser.parse_args()
+
+    from compiler import compile_program
+    from incremental_compiler import IncrementalCompiler
+
+    lines = _program(args.lines)
+    grammar_addr = str(REPO_DIR / "grammar_v2.txt")
+    # lines inside functions, from evenly spread lines on
+    targets: List[int] = list()
+    for start in range(0, len(lines), max(1, len(lines) // args.edits)):
+        if targets:
+            start = max(start, targets[-1] + 1)
+        i = next((j for j in range(start, len(lines)) if lines[j].startswith("    ")), None)
+        if i is None:
+            break
+        targets.append(i)
+    if not targets:
+        sys.exit(f"there is no line inside a function to edit in a program of {len(lines)} lines, "
+                f"so more --lines are needed")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_addr = os.path.join(work_dir, "input.txt")
+        with open(input_addr, "w") as f:
+            f.write("\n".join(lines))
+        start = time.perf_counter()
+        compile_program(input_addr, work_dir, grammar_addr, save_tree=False)
+        scratch = time.perf_counter() - start
+
+        compiler = IncrementalCompiler(work_dir, grammar_addr)
+        start = time.perf_counter()
+        compiler.compile("\n".join(lines))
+        first = time.perf_counter() - start
+
+        print(f"lines: {len(lines)}, regions: {compiler.stats['regions']}")
+        print(f"from scratch:               {scratch:8.3f} s")
+        print(f"first incremental compile:  {first:8.3f} s")
+
+        for name, edit in _EDITS.items():
+            latencies: List[float] = list()
+            for i in targets:
+                # edit a line, then keep typing on it
+                for _ in range(2):
+                    lines[i] = edit(lines[i])
+                    start = time.perf_counter()
+                    compiler.compile("\n".join(lines))
+                    latencies.append(time.perf_counter() - start)
+            print(f"{name + ':':27} {statistics.median(latencies):8.3f} s median, {max(latencies):8.3f} s max")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+""" reports how much the peephole optimizer shrinks the generated code and speeds up its execution
+
+usage: python -m benchmarks.optimizer_gain [--iterations 20000]
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.parser_scaling import REPO_DIR
+from benchmarks.programs import loop_program, synthetic_program
+
+
+def _compile_and_run(source: str, optimize: bool) -> Tuple[int, int, float, List[int]]:
+    """returns number of codes, executed instructions, seconds of execution and printed values"""
+
+    from compiler import compile_program
+    from modules.vm import VirtualMachine
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_addr = os.path.join(work_dir, "input.txt")
+        with open(input_addr, "w") as f:
+            f.write(source)
+        compile_program(input_addr, work_dir, str(REPO_DIR / "grammar_v2.txt"), save_tree=False, optimize=optimize)
+        vm = VirtualMachine.from_file(os.path.join(work_dir, "output.txt"))
+
+    start = time.perf_counter()
+    printed = vm.run()
+    return len(vm.program), vm.steps, time.perf_counter() - start, printed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=20000, help="iterations of the loop program")
+    args = arg_parser.parse_args()
+
+    corpus: Dict[str, str] = {
+        "loop": loop_program(args.iterations),
+        "functions 4KB": synthetic_program(4 * 1024),
+        "functions 32KB": synthetic_program(32 * 1024),
+    }
+
+    print(f"{'program':>16} {'codes':>14} {'executed':>20} {'vm seconds':>16}")
+    for name, source in corpus.items():
+        before = _compile_and_run(source, optimize=False)
+        after = _compile_and_run(source, optimize=True)
+        assert before[3] == after[3], f"optimized {name} prints {after[3]} instead of {before[3]}"
+        print(f"{name:>16} {before[0]:>6} -> {after[0]:<6} {before[1]:>9} -> {after[1]:<9} "
+              f"{before[2]:>7.3f} -> {after[2]:<7.3f}")
+
+
+if __name__ == "__main__":
+    main()
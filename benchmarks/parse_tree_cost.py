@@ -0,0 +1,35 @@
+""" compares time and memory of `Parser.parse` with and without building the parse tree
+
+usage: python -m benchmarks.parse_tree_cost [--sizes 4 16 64]  (sizes in KB)
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from benchmarks.parser_scaling import parse_once
+from benchmarks.programs import synthetic_program
+
+
+def _measure(source: str, save_tree: bool, trace_memory: bool) -> float:
+    """runs in a fresh process so measurements do not share a warmed-up heap"""
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        elapsed, peak = executor.submit(parse_once, source, save_tree, trace_memory).result()
+    return peak if trace_memory else elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[4, 16, 64], help="input sizes in KB")
+    args = arg_parser.parse_args()
+
+    print(f"{'bytes':>10} {'tree s':>10} {'no-tree s':>10} {'tree MB':>10} {'no-tree MB':>11}")
+    for size_kb in args.sizes:
+        source = synthetic_program(size_kb * 1024)
+        times = [_measure(source, save_tree, False) for save_tree in [True, False]]
+        peaks = [_measure(source, save_tree, True) / 2**20 for save_tree in [True, False]]
+        print(f"{len(source):>10} {times[0]:>10.3f} {times[1]:>10.3f} {peaks[0]:>10.2f} {peaks[1]:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+""" measures how `Parser.parse` scales with the size of the input program
+
+usage: python -m benchmarks.parser_scaling [--sizes 1 10 100 1000 10000]  (sizes in KB)
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import List, Tuple
+
+from benchmarks.programs import synthetic_program
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+KEYWORDS = ["break", "continue", "def", "else","if", "return", "while", "global", "print"]
+
+
+def parse_once(source: str, save_tree: bool = True, trace_memory: bool = False) -> Tuple[float, int]:
+    """compiles `source` inside a scratch directory
+
+    Returns:
+        Tuple[float, int]: seconds spent in `Parser.parse` and, if `trace_memory`, its peak of traced memory in bytes
+    """
+
+    from core.scanner import Scanner
+    from core.parser import Parser
+    from modules.context import CompilationContext
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_addr = os.path.join(work_dir, "input.txt")
+        with open(input_addr, "w") as f:
+            f.write(source)
+
+        with CompilationContext(KEYWORDS, work_dir) as ctx:
+            scanner = Scanner(ctx, input_addr)
+            parser = Parser(ctx, str(REPO_DIR / "grammar_v2.txt"), scanner.pass_next_token_to_parser, save_tree)
+            if trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            parser.parse()
+            elapsed = time.perf_counter() - start
+            peak = 0
+            if trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            parser.code_generator.fill_first_and_last()
+
+    return elapsed, peak
+
+
+def run(sizes_kb: List[int]) -> List[Tuple[int, float]]:
+    """parses one synthetic program per size, each in a fresh process so runs do not share a warmed-up heap"""
+
+    results: List[Tuple[int, float]] = list()
+    for size_kb in sizes_kb:
+        source = synthetic_program(size_kb * 1024)
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            elapsed, _ = executor.submit(parse_once, source).result()
+        results.append((len(source), elapsed))
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000], help="input sizes in KB")
+    args = arg_parser.parse_args()
+
+    print(f"{'bytes':>12} {'seconds':>10} {'us/byte':>10}")
+    for size, elapsed in run(args.sizes):
+        print(f"{size:>12} {elapsed:>10.3f} {elapsed / size * 1e6:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
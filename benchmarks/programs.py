@@ -0,0 +1,214 @@
+import random
+from typing import List, Optional, Tuple
+
+_FUNC_TEMPLATE = """def f{i}(a, b):
+    c = a + b * 2;
+    d = [a, b, c];
+    while (c < 10)
+        c = c + 1;
+        if c == 5:
+            break;
+        else:
+            d[0] = c - a;
+        ;
+    ;
+    return d[0];
+;
+"""
+
+_LOOP_PROGRAM = """def main():
+    i = 0;
+    s = 0;
+    a = [1, 2, 3];
+    while (i < {iterations})
+        s = s + i * 2 - a[1];
+        a[2] = s;
+        if s < 0:
+            s = 0;
+        else:
+            s = s - 1;
+        ;
+        i = i + 1;
+    ;
+    print(s);
+;
+"""
+
+_MAIN_TEMPLATE = """def main():
+    x = f{last}(1, 2);
+    print(x);
+;
+"""
+
+
+def synthetic_program(size: int, distinct_names: bool = True) -> str:
+    """builds a valid program of roughly `size` bytes by repeating a small function definition
+
+    Args:
+        size (int): approximate size of the generated source in bytes
+        distinct_names (bool): if false, every function is named `f0` (a scanner-only workload
+            which keeps the symbol table small)
+    """
+
+    chunks: List[str] = list()
+    total = 0
+    i = 0
+    while total < size or i == 0:
+        chunk = _FUNC_TEMPLATE.format(i=i if distinct_names else 0)
+        chunks.append(chunk)
+        total += len(chunk)
+        i += 1
+
+    chunks.append(_MAIN_TEMPLATE.format(last=i - 1 if distinct_names else 0))
+    return "".join(chunks)
+
+
+
+def loop_program(iterations: int) -> str:
+    """builds a program whose `main` runs a loop of arithmetic, array and branch code `iterations` times"""
+
+    return _LOOP_PROGRAM.format(iterations=iterations)
+
+
+_ERROR_KINDS = ["illegal_token", "extra_token", "invalid_input", "stray_comment_end", "invalid_number", 
+        "undefined_name", "wrong_args", "break_outside_loop"]
+""" mistakes put into broken programs, from the scanner to semantic routines (NOTE: only the ones which
+semantic routines survive after error recovery, e.g. not a missing ';') """
+
+
+class _ProgramWriter:
+    """writes lines of a random but valid program, see `generated_program`"""
+
+    def __init__(self, rng: random.Random, overloads: int, nesting: int, lists: bool, comment_density: float) -> None:
+        self.rng: random.Random = rng
+        self.overloads: int = overloads
+        self.nesting: int = nesting
+        self.lists: bool = lists
+        self.comment_density: float = comment_density
+        self.lines: List[str] = list()
+        self.size: int = 0
+        self.funcs: List[Tuple[str, int]] = list()
+        """ name and number of arguments of every function written so far """
+
+        self.statements: List[int] = list()
+        """ indices of lines which are simple statements inside functions """
+
+    def _num(self) -> int:
+        return self.rng.randint(1, 99)
+
+    def line(self, depth: int, text: str, statement: bool = False) -> None:
+        indent = "    " * depth
+        if self.comment_density and self.rng.random() < self.comment_density:
+            comment = f"# note {len(self.lines)}" if self.rng.random() < 0.5 else f"/* note {len(self.lines)} */"
+            self.lines.append(indent + comment)
+            self.size += len(indent) + len(comment) + 1
+        if statement:
+            self.statements.append(len(self.lines))
+        self.lines.append(indent + text)
+        self.size += len(indent) + len(text) + 1
+
+    def _loop(self, depth: int, levels: int) -> None:
+        self.line(depth, f"while (x < {self._num()})")
+        self.line(depth + 1, "x = x + 1;", True)
+        if levels > 1:
+            self._loop(depth + 1, levels - 1)
+            self.line(depth + 1, ";")
+        self.line(depth + 1, f"if x == {self._num()}:")
+        self.line(depth + 2, "break;", True)
+        self.line(depth + 1, "else:")
+        self.line(depth + 2, "y = y + x;", True)
+        self.line(depth + 1, ";")
+
+    def function(self, i: int) -> None:
+        name = f"f{i}"
+        for n_args in range(1, self.overloads + 1):
+            args = [f"a{k}" for k in range(n_args)]
+            self.line(0, f"def {name}({', '.join(args)}):")
+            self.line(1, f"x = {args[0]} + {self._num()} * {args[-1]};", True)
+            if self.lists:
+                self.line(1, f"d = [{args[0]}, x, {self._num()}];", True)
+                self.line(1, "d[1] = d[0] + x;", True)
+            if self.funcs:
+                callee, callee_args = self.rng.choice(self.funcs)
+                values = [self.rng.choice(["x", args[0], str(self._num())]) for _ in range(callee_args)]
+                self.line(1, f"y = {callee}({', '.join(values)});", True)
+            else:
+                self.line(1, "y = x - 1;", True)
+            self.line(1, "global g;", True)
+            self.line(1, "g = g + y;", True)
+            if self.nesting:
+                self._loop(1, self.nesting)
+                self.line(1, ";")
+            self.line(1, "return y;", True)
+            self.line(0, ";")
+        self.funcs += [(name, n_args) for n_args in range(1, self.overloads + 1)]
+
+    def main(self) -> None:
+        self.line(0, "def main():")
+        name, n_args = self.funcs[-1]
+        self.line(1, f"x = {name}({', '.join(str(self._num()) for _ in range(n_args))});", True)
+        self.line(1, "print(x);", True)
+        self.line(1, "print(g);", True)
+        self.line(0, ";")
+
+    def break_line(self, idx: int, kind: str) -> None:
+        """puts a mistake into a statement"""
+
+        line = self.lines[idx]
+        indent = line[:len(line) - len(line.lstrip())]
+        if kind == "illegal_token":
+            self.lines[idx] = line.replace(" = ", " = = ", 1)
+        elif kind == "extra_token":
+            self.lines[idx] = line[:-1] + " z;"
+        elif kind == "invalid_input":
+            self.lines[idx] = line + " / 1"
+        elif kind == "stray_comment_end":
+            self.lines[idx] = line + " */"
+        elif kind == "invalid_number":
+            self.lines[idx] = indent + f"z = {self._num()}ab;"
+        elif kind == "undefined_name":
+            self.lines.insert(idx, indent + f"z = missing{idx} + 1;")
+        elif kind == "wrong_args":
+            name, _ = self.rng.choice(self.funcs)
+            args = ", ".join(["1"] * (self.overloads + 1))
+            self.lines.insert(idx, indent + f"z = {name}({args});")
+        elif kind == "break_outside_loop":
+            self.lines.insert(idx, "    break;")
+
+
+def generated_program(size: int = 16 * 1024, functions: Optional[int] = None, overloads: int = 1, nesting: int = 1,
+        lists: bool = True, comment_density: float = 0.0, errors: int = 0, unclosed_comment: bool = False,
+        seed: int = 0) -> str:
+    """builds a random program of the language, which is valid unless mistakes are asked for
+
+    Every function reads its arguments, calls a function defined before it and updates a global,
+    then runs nested loops with an `if` inside.
+
+    Args:
+        size (int): approximate size of the generated source in bytes, if `functions` is not given
+        functions (Optional[int]): number of function names, besides `main`
+        overloads (int): number of definitions of every function name, with 1, 2, ... arguments
+        nesting (int): depth of nested `while` loops in every function (0 for no loops)
+        lists (bool): whether functions build and index list literals
+        comment_density (float): chance of a comment before every line
+        errors (int): number of lexical, syntax and semantic mistakes put into random statements
+        unclosed_comment (bool): whether the program ends inside an unclosed comment
+        seed (int): seed of the random choices, so the same arguments give the same program
+    """
+
+    rng = random.Random(seed)
+    writer = _ProgramWriter(rng, overloads, nesting, lists, comment_density)
+    writer.line(0, "g = 0;")
+    i = 0
+    while (i < functions) if functions is not None else (writer.size < size or i == 0):
+        writer.function(i)
+        i += 1
+    writer.main()
+
+    # lines are broken from the last one, so indices of the others are kept
+    broken = sorted(rng.sample(writer.statements, min(errors, len(writer.statements))), reverse=True)
+    for idx in broken:
+        writer.break_line(idx, rng.choice(_ERROR_KINDS))
+    if unclosed_comment:
+        writer.lines.append("/* never closed")
+    return "\n".join(writer.lines) + "\n"
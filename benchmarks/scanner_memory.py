@@ -0,0 +1,64 @@
+""" measures how much memory the scanner keeps as the input grows
+
+usage: python -m benchmarks.scanner_memory [--sizes 1 4 16] [--buffer-size 65536]  (sizes in MB)
+"""
+import argparse
+import os
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Optional, Tuple
+
+from benchmarks.parser_scaling import KEYWORDS
+from benchmarks.programs import synthetic_program
+
+
+def _scan_once(source: str, buffer_size: Optional[int]) -> Tuple[int, int]:
+    """scans `source` to the end and returns the largest number of characters buffered at once
+    and the peak of traced memory in bytes"""
+
+    from core.scanner import Scanner
+    from modules.context import CompilationContext
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_addr = os.path.join(work_dir, "input.txt")
+        with open(input_addr, "w") as f:
+            f.write(source)
+
+        peak_buffered = 0
+        ctx = CompilationContext(KEYWORDS, work_dir)
+        with ctx.semantic, ctx.symbol_table:
+            tracemalloc.start()
+            scanner = Scanner(ctx, input_addr, buffer_size)
+            for _ in scanner.tokens():
+                peak_buffered = max(peak_buffered, len(scanner._inp_file))
+            _, peak_traced = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    return peak_buffered, peak_traced
+
+
+def run(sizes_mb: List[int], buffer_size: Optional[int]) -> List[Tuple[int, int, int]]:
+    results: List[Tuple[int, int, int]] = list()
+    for size_mb in sizes_mb:
+        source = synthetic_program(size_mb * 1024 * 1024, distinct_names=False)
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            peak_buffered, peak_traced = executor.submit(_scan_once, source, buffer_size).result()
+        results.append((len(source), peak_buffered, peak_traced))
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16], help="input sizes in MB")
+    arg_parser.add_argument("--buffer-size", type=int, default=1 << 16, help="0 reads the whole input at once")
+    args = arg_parser.parse_args()
+
+    print(f"{'bytes':>12} {'peak buffered chars':>20} {'peak traced KB':>16}")
+    for size, peak_buffered, peak_traced in run(args.sizes, args.buffer_size or None):
+        print(f"{size:>12} {peak_buffered:>20} {peak_traced / 1024:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
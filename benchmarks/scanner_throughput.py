@@ -0,0 +1,64 @@
+""" measures scanner throughput (tokens and bytes per second) on multi-megabyte sources
+
+usage: python -m benchmarks.scanner_throughput [--sizes 1 4 16]  (sizes in MB)
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Tuple
+
+from benchmarks.parser_scaling import KEYWORDS
+from benchmarks.programs import synthetic_program
+
+
+def _scan_once(source: str) -> Tuple[int, float]:
+    """scans `source` to the end and returns the number of tokens and the seconds it took"""
+
+    from core.scanner import Scanner
+    from enums.token_type import TokenType
+    from modules.context import CompilationContext
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_addr = os.path.join(work_dir, "input.txt")
+        with open(input_addr, "w") as f:
+            f.write(source)
+
+        n_tokens = 0
+        ctx = CompilationContext(KEYWORDS, work_dir)
+        with ctx.semantic, ctx.symbol_table:
+            scanner = Scanner(ctx, input_addr)
+            start = time.perf_counter()
+            while scanner.pass_next_token_to_parser()[1] != TokenType.EOF:
+                n_tokens += 1
+            elapsed = time.perf_counter() - start
+
+    return n_tokens, elapsed
+
+
+def run(sizes_mb: List[int]) -> List[Tuple[int, int, float]]:
+    """scans one synthetic program per size, each in a fresh process so runs do not share a warmed-up heap"""
+
+    results: List[Tuple[int, int, float]] = list()
+    for size_mb in sizes_mb:
+        source = synthetic_program(size_mb * 1024 * 1024, distinct_names=False)
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            n_tokens, elapsed = executor.submit(_scan_once, source).result()
+        results.append((len(source), n_tokens, elapsed))
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16], help="input sizes in MB")
+    args = arg_parser.parse_args()
+
+    print(f"{'bytes':>12} {'tokens':>10} {'seconds':>10} {'MB/s':>8} {'tokens/s':>12}")
+    for size, n_tokens, elapsed in run(args.sizes):
+        print(f"{size:>12} {n_tokens:>10} {elapsed:>10.3f} {size / elapsed / 2**20:>8.3f} {n_tokens / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
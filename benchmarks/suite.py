@@ -0,0 +1,202 @@
+""" measures scanner-only, parser-only and end-to-end time and peak memory over generated programs,
+and saves them as a baseline or compares them with one
+
+usage: python -m benchmarks.suite [--scenarios small deep] [--repeat 3] [--save base.json] [--compare base.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.parser_scaling import KEYWORDS, REPO_DIR
+from benchmarks.programs import generated_program
+
+SCENARIOS: Dict[str, dict] = {
+    "small": dict(size=16 * 1024),
+    "large": dict(size=256 * 1024),
+    "deep": dict(size=64 * 1024, nesting=6),
+    "overloads": dict(size=64 * 1024, overloads=6),
+    "no_lists": dict(size=64 * 1024, lists=False),
+    "comments": dict(size=64 * 1024, comment_density=0.5),
+    "broken": dict(size=64 * 1024, errors=200, unclosed_comment=True),
+}
+""" arguments of `generated_program` for every scenario """
+
+_PHASES = ["scan", "parse", "compile"]
+
+
+def _scan(input_addr: str, work_dir: str) -> None:
+    """only scans the input, recording tokens in the symbol table as the parser would"""
+
+    from core.scanner import Scanner
+    from modules.context import CompilationContext
+
+    ctx = CompilationContext(KEYWORDS, work_dir)
+    with ctx.semantic, ctx.symbol_table:
+        for _ in Scanner(ctx, input_addr).tokens():
+            pass
+
+
+def _lex(input_addr: str, work_dir: str) -> list:
+    """tokens of the input with line numbers of semantic errors, so they can be passed to a parser without scanning"""
+
+    from core.scanner import Scanner
+    from modules.context import CompilationContext
+
+    scanner = Scanner(CompilationContext(KEYWORDS, work_dir), input_addr)
+    return [(token, scanner.lineno) for token in scanner.lex()]
+
+
+def _parse(tokens: list, work_dir: str) -> None:
+    """only parses tokens which are already scanned, without the parse tree"""
+
+    from core.parser import Parser
+    from data_class.token import Token
+    from enums.token_type import TokenType
+    from modules.context import CompilationContext
+    from utils.constants import EOF
+    from utils.sinks import ArtifactSink
+
+    with CompilationContext(KEYWORDS, work_dir, ArtifactSink(None)) as ctx:
+        semantic, symbol_table = ctx.semantic, ctx.symbol_table
+        stream = iter(tokens)
+        eof = Token(tokens[-1][0].line if tokens else 1, EOF, TokenType.EOF)
+
+        def _next_token() -> Tuple[Token, TokenType]:
+            for token, lineno in stream:
+                semantic.lineno = lineno
+                if token.type in [TokenType.ID, TokenType.KEYWORD]:
+                    symbol_table.add_row(token.lexeme, token.type)
+                return token, token.type
+            return eof, TokenType.EOF
+
+        Parser(ctx, str(REPO_DIR / "grammar_v2.txt"), _next_token, save_tree=False).parse()
+
+
+def _compile(input_addr: str, work_dir: str) -> None:
+    """compiles the input with all outputs, including the parse tree"""
+
+    from compiler import compile_program
+
+    compile_program(input_addr, work_dir, str(REPO_DIR / "grammar_v2.txt"))
+
+
+def _measure(phase: Callable[[], None], repeat: int) -> Tuple[float, int]:
+    """the least seconds of some runs of a phase and its peak of traced memory in bytes, in a separate run"""
+
+    seconds = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        phase()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    phase()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(seconds), peak
+
+
+def _run_scenario(source: str, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_addr = os.path.join(work_dir, "input.txt")
+        with open(input_addr, "w") as f:
+            f.write(source)
+
+        # the grammar is cached before anything is measured
+        from modules.grammar import load_grammar
+        load_grammar(str(REPO_DIR / "grammar_v2.txt"))
+
+        tokens = _lex(input_addr, work_dir)
+        phases = {
+            "scan": lambda: _scan(input_addr, work_dir),
+            "parse": lambda: _parse(tokens, work_dir),
+            "compile": lambda: _compile(input_addr, work_dir),
+        }
+        result = dict(bytes=len(source), tokens=len(tokens))
+        for name in _PHASES:
+            seconds, peak = _measure(phases[name], repeat)
+            result[f"{name}_seconds"] = round(seconds, 6)
+            result[f"{name}_peak_kb"] = round(peak / 1024, 1)
+    return result
+
+
+def run(scenarios: List[str], repeat: int, scale: float) -> Dict[str, dict]:
+    """measures every scenario in a fresh process, so runs do not share a warmed-up heap"""
+
+    results: Dict[str, dict] = dict()
+    for name in scenarios:
+        kwargs = dict(SCENARIOS[name])
+        kwargs["size"] = int(kwargs["size"] * scale)
+        source = generated_program(**kwargs)
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            results[name] = executor.submit(_run_scenario, source, repeat).result()
+    return results
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """measures of scenarios which are worse than their baseline by more than `threshold` (e.g. 0.1 for 10%)"""
+
+    regressions = list()
+    for name, result in results.items():
+        for measure, value in result.items():
+            old = baseline.get(name, {}).get(measure)
+            if not measure.endswith(("_seconds", "_peak_kb")) or not old:
+                continue
+            ratio = value / old
+            if ratio > 1 + threshold:
+                regressions.append(f"{name} {measure}: {old} -> {value} ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    arg_parser.add_argument("--repeat", type=int, default=3, help="number of timed runs of every phase")
+    arg_parser.add_argument("--scale", type=float, default=1.0, help="multiplies sizes of all programs")
+    arg_parser.add_argument("--save", default=None, help="saves results as a baseline in this JSON file")
+    arg_parser.add_argument("--compare", default=None, help="compares results with the baseline in this JSON file")
+    arg_parser.add_argument("--threshold", type=float, default=0.1, help="slowdown reported as a regression")
+    args = arg_parser.parse_args()
+
+    results = run(args.scenarios, args.repeat, args.scale)
+
+    print(f"{'scenario':>10} {'bytes':>8} {'tokens':>8}" + "".join(f" {phase + ' s':>10} {phase + ' KB':>11}" for phase in _PHASES))
+    for name, result in results.items():
+        print(f"{name:>10} {result['bytes']:>8} {result['tokens']:>8}" + "".join(
+                f" {result[phase + '_seconds']:>10.4f} {result[phase + '_peak_kb']:>11.1f}" for phase in _PHASES))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(dict(commit=_commit(), python=platform.python_version(), repeat=args.repeat, scale=args.scale,
+                    results=results), f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold)
+        print(f"compared with {baseline['commit']}: " + ("no regression" if not regressions else f"{len(regressions)} regressions"))
+        for regression in regressions:
+            print(f"  {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+""" measures `SymbolTable` insertions and lookups on a program-shaped workload of many identifiers
+
+usage: python -m benchmarks.symbol_table_lookup [--identifiers 100000] [--locals 8]
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.parser_scaling import KEYWORDS
+from core.scanner import TokenType
+from data_class.symbol_table import FuncAttribute
+from modules.context import CompilationContext
+
+
+def _compile_like(ctx: CompilationContext, n_identifiers: int, n_locals: int) -> int:
+    """replays the symbol table traffic of a program made of small functions, each one
+    with `n_locals` local variables which are all used twice and a call to the previous function.
+
+    Returns:
+        int: number of identifier occurrences replayed
+    """
+    table, semantic = ctx.symbol_table, ctx.semantic
+    occurrences = 0
+    func_no = 0
+    while occurrences < n_identifiers:
+        # def f<i>(...): seen by scanner, promoted by parser, then #CHG_SCOPE
+        func_name = f"f{func_no}"
+        table.add_row(func_name, TokenType.ID)
+        row = table.find_row(func_name, semantic.current_scope)
+        table.set_attribute(row, FuncAttribute(row.attribute.scope_no, row.attribute.mem_addr, [], None, None, None))
+        row = table.find_row(func_name, semantic.current_scope)
+        semantic.create_new_scope()
+        table.scope_boundary[semantic.current_scope] = (len(table.table), None)
+        row.attribute.mem_addr = row.attribute.ret_val_addr = row.attribute.jp_addr = 0
+        occurrences += 1
+
+        for j in range(n_locals):
+            # v<j> = ...; (#PID)
+            lexeme = f"v{j}"
+            table.add_row(lexeme, TokenType.ID)
+            row = table.find_row(lexeme, semantic.current_scope)
+            if row.attribute.mem_addr is None:
+                row.attribute.mem_addr = j
+                table.set_scope(row, semantic.current_scope)
+
+            # ... = v<j> (#PID2, #SCOPING)
+            table.add_row(lexeme, TokenType.ID)
+            table.find_row(lexeme, semantic.current_scope, force_mem_addr=True)
+            table.find_row(lexeme, semantic.current_scope, force_mem_addr=True)
+            occurrences += 2
+
+        if func_no > 0:
+            # f<i-1>(...) (#PID2, #SCOPING, #JP_FUNC)
+            callee = f"f{func_no - 1}"
+            table.add_row(callee, TokenType.ID)
+            table.find_row(callee, semantic.current_scope, force_mem_addr=True)
+            table.find_row(callee, semantic.current_scope, force_mem_addr=True)
+            table.find_func_scope(semantic.current_scope, callee, all=True)
+            occurrences += 1
+
+        # return ... (#SET_RET_VAL) and #END_FUNC
+        func_scope = semantic.scope_tree[semantic.current_scope].father.scope_no
+        table.find_func_scope(func_scope)
+        semantic.switch_scope(func_scope)
+        func_no += 1
+
+    return occurrences
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--identifiers", type=int, default=100000, help="identifier occurrences to replay")
+    arg_parser.add_argument("--locals", type=int, default=8, help="local variables per function")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        ctx = CompilationContext(KEYWORDS, work_dir)
+        with ctx.semantic, ctx.symbol_table:
+            start = time.perf_counter()
+            occurrences = _compile_like(ctx, args.identifiers, args.locals)
+            elapsed = time.perf_counter() - start
+            rows = len(ctx.symbol_table.table)
+
+    print(f"identifiers: {occurrences}, rows: {rows}, seconds: {elapsed:.3f}, identifiers/s: {occurrences / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+""" measures memory taken by every token kept by the scanner, and memory allocated per MB of scanned source
+
+usage: python -m benchmarks.token_memory [--size 4]  (size in MB)
+"""
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Tuple
+
+from benchmarks.parser_scaling import KEYWORDS
+from benchmarks.programs import generated_program
+
+
+def _scan_once(source: str) -> Tuple[int, int, int, int]:
+    """scans `source` keeping all its tokens
+
+    Returns:
+        Tuple[int, int, int, int]: number of tokens, bytes and memory blocks kept by them,
+            and the peak of traced memory in bytes
+    """
+
+    from core.scanner import Scanner
+    from modules.context import CompilationContext
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_addr = os.path.join(work_dir, "input.txt")
+        with open(input_addr, "w") as f:
+            f.write(source)
+
+        ctx = CompilationContext(KEYWORDS, work_dir)
+        with ctx.semantic, ctx.symbol_table:
+            scanner = Scanner(ctx, input_addr)
+            blocks = sys.getallocatedblocks()
+            tracemalloc.start()
+            tokens = list(scanner.lex())
+            kept, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            blocks = sys.getallocatedblocks() - blocks
+            del scanner
+
+    return len(tokens), kept, blocks, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=4, help="input size in MB")
+    args = arg_parser.parse_args()
+
+    source = generated_program(args.size * 1024 * 1024)
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        n_tokens, kept, blocks, peak = executor.submit(_scan_once, source).result()
+
+    mb = len(source) / (1024 * 1024)
+    print(f"tokens:              {n_tokens}")
+    print(f"bytes per token:     {kept / n_tokens:8.1f}")
+    print(f"blocks per token:    {blocks / n_tokens:8.2f}")
+    print(f"peak KB per MB:      {peak / 1024 / mb:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+""" measures how many instructions per second the virtual machine executes on a compiled loop
+
+usage: python -m benchmarks.vm_throughput [--iterations 200000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.parser_scaling import REPO_DIR
+from benchmarks.programs import loop_program
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=200000, help="iterations of the compiled loop")
+    args = arg_parser.parse_args()
+
+    from compiler import compile_program
+    from modules.vm import VirtualMachine
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_addr = os.path.join(work_dir, "input.txt")
+        with open(input_addr, "w") as f:
+            f.write(loop_program(args.iterations))
+        compile_program(input_addr, work_dir, str(REPO_DIR / "grammar_v2.txt"), save_tree=False)
+        vm = VirtualMachine.from_file(os.path.join(work_dir, "output.txt"))
+
+    start = time.perf_counter()
+    printed = vm.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"codes: {len(vm.program)}, printed: {printed}")
+    print(f"instructions: {vm.steps:,}, seconds: {elapsed:.3f}, instructions/s: {vm.steps / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,173 @@
 # Armin Moradi 96106077
 # Alireza Dizaji 96107545
 
+import argparse
+from typing import List, Optional
 
+from core.code_gen import CodeGenerator
 from core.scanner import Scanner
 from core.parser import Parser
 from data_class.symbol_table import FuncAttribute
-from modules.memory import Memory
-from modules.semantic import Semantic
-from modules.symbol_table import SymbolTable
+from modules.compile_cache import CompileCache
+from modules.context import CompilationContext
+from modules.optimizer import PeepholeOptimizer
+from modules.profiler import Profiler, phase
+from modules.temp_allocator import TempAllocator
+from utils.constants import DEAD_FUNC
 from utils.routines import MAIN_FUNC_DEF
+from utils.sinks import ArtifactSink
+
+KEYWORDS = ["break", "continue", "def", "else","if", "return", "while", "global", "print"]
+
+MEMORY_LAYOUT = dict(unit=4, prog_size=100, data_size=400)
+""" default layout of the runtime memory, where segments grow beyond their sizes if needed """
+
+OUTPUTS = ["parse_tree.txt", "syntax_errors.txt", "semantic_errors.txt", "output.txt", "memory_layout.txt", "temps.txt"]
+""" every file which may be saved by `compile_program` """
+
+
+def compile_program(input_addr: str, save_dir: str = ".", grammar_addr: str = "grammar_v2.txt", 
+        save_tree: bool = True, optimize: bool = False, pack_temps: bool = False, 
+        cache: Optional[CompileCache] = None, artifacts: Optional[ArtifactSink] = None, 
+        profiler: Optional[Profiler] = None, **memory_layout) -> None:
+    """compiles a program and saves all outputs of the compilation into a directory
+
+    Args:
+        input_addr (str): directory of the input code
+        save_dir (str): directory where outputs are saved
+        grammar_addr (str): directory of text file containing all rules of the language
+        save_tree (bool): whether to build and save the parse tree
+        optimize (bool): whether to run the peephole optimizer over the generated code
+        pack_temps (bool): whether to reuse temporaries which are no longer live. The peak number of live
+            temporaries of every function is saved in `temps.txt`
+        cache (Optional[CompileCache]): cache of outputs, which are copied from it if the same compilation is
+            already done. If None, the program is always compiled
+        artifacts (Optional[ArtifactSink]): where outputs are saved, e.g. to keep them in memory or leave some of
+            them out. If None, all of them are saved in `save_dir`
+        profiler (Optional[Profiler]): profiler which records time spent in every phase of the compilation
+        **memory_layout: arguments of the runtime memory, replacing the ones of `MEMORY_LAYOUT`
+    """
+
+    memory_layout = {**MEMORY_LAYOUT, **memory_layout}
+    if artifacts is None:
+        artifacts = ArtifactSink(save_dir)
+    compile_args = (input_addr, artifacts, grammar_addr, save_tree, optimize, pack_temps, memory_layout, profiler)
+    if cache is None:
+        with phase(profiler, "compile"):
+            _compile(*compile_args)
+        return
+
+    with phase(profiler, "compile"):
+        key = cache.key(input_addr, grammar_addr, KEYWORDS, memory_layout, save_tree=save_tree, optimize=optimize, 
+                pack_temps=pack_temps, disabled=sorted(artifacts.disabled))
+        with phase(profiler, "cache"):
+            files = cache.load(key)
+        if files is not None:
+            with artifacts:
+                # files of an earlier compilation, which were not saved by the cached one
+                for name in OUTPUTS:
+                    if name not in files:
+                        artifacts.remove(name)
+                for name, content in files.items():
+                    artifacts.put(name, content)
+            return
+
+        # outputs are kept, so only the ones of this compilation are cached
+        keep, artifacts.keep = artifacts.keep, True
+        try:
+            _compile(*compile_args)
+            files = dict(artifacts.buffers)
+        finally:
+            artifacts.keep = keep
+            if not keep:
+                artifacts.buffers.clear()
+        with phase(profiler, "cache"):
+            cache.store(key, files)
+
+
+def _compile(input_addr: str, artifacts: ArtifactSink, grammar_addr: str, save_tree: bool, optimize: bool, 
+        pack_temps: bool, memory_layout: dict, profiler: Optional[Profiler]) -> None:
+    with CompilationContext(KEYWORDS, artifacts.save_dir, artifacts, **memory_layout) as ctx:
+        my_scanner = Scanner(ctx, input_addr)
+        with phase(profiler, "load_grammar"):
+            my_parser = Parser(ctx, grammar_addr, my_scanner.pass_next_token_to_parser, save_tree=save_tree)
+        if profiler is not None:
+            profiler.attach(ctx, my_scanner, my_parser)
+        my_parser.parse()
+        finish_program(ctx, my_parser.code_generator, optimize, pack_temps, profiler)
+
+
+def finish_program(ctx: CompilationContext, code_generator: CodeGenerator, optimize: bool = False, 
+        pack_temps: bool = False, profiler: Optional[Profiler] = None) -> None:
+    """completes the generated code once the whole input is parsed
+
+    Args:
+        optimize (bool): whether to run the peephole optimizer over the generated code
+        pack_temps (bool): whether to reuse temporaries which are no longer live
+        profiler (Optional[Profiler]): profiler which records time spent in every phase
+    """
+
+    code_generator.fill_first_and_last()
+    origin = list(range(len(ctx.memory.program_block)))
+    if optimize:
+        with phase(profiler, "optimize"):
+            optimizer = PeepholeOptimizer(ctx.memory.start_tmp_p)
+            ctx.memory.program_block = optimizer.optimize(ctx.memory.program_block)
+            origin = optimizer.origin
+    if pack_temps:
+        with phase(profiler, "pack_temps"):
+            allocator = TempAllocator(ctx.memory.start_tmp_p, ctx.memory.unit)
+            ctx.memory.program_block = allocator.allocate(ctx.memory.program_block)
+            _save_temp_footprint(ctx, allocator, origin)
+    else:
+        ctx.artifacts.remove('temps.txt')
+
+    # check for `main` function definition
+    row = ctx.symbol_table.find_row('main', 0)
+    if row is None or not isinstance(row.attribute, FuncAttribute):
+        MAIN_FUNC_DEF(ctx)
+
+
+def _save_temp_footprint(ctx: CompilationContext, allocator: TempAllocator, origin: List[int]) -> None:
+    """saves the peak number of live temporaries of every function, where a function spans from its first code
+    to the first code of the next one
+
+    Args:
+        origin (List[int]): index of every code of the program block in the generated one, before optimization
+    """
+
+    index = {generated: i for i, generated in enumerate(origin)}
+    starts = sorted((index[row.attribute.start_addr_in_PB], f"{row.lexeme}/{len(row.attribute.args_addr)}") 
+            for row in ctx.symbol_table.table if isinstance(row.attribute, FuncAttribute) 
+            and row.lexeme != DEAD_FUNC and row.attribute.start_addr_in_PB in index)
+    ends = [start for start, _ in starts[1:]] + [len(origin)]
+
+    lines = list()
+    for (start, name), end in zip(starts, ends):
+        peak = allocator.peak(start, end)
+        lines.append(f"{name}\t{peak} temporaries\t{peak * ctx.memory.unit} bytes\n")
+    lines.append(f"total\t{allocator.slots} temporaries\t{allocator.slots * ctx.memory.unit} bytes\n")
+    ctx.artifacts.put('temps.txt', lines)
+
 
 if __name__ == "__main__":
-    keywords = ["break", "continue", "def", "else","if", "return", "while", "global", "print"]
-    
-    with Semantic():
-        with SymbolTable(keywords):
-            with Memory(unit=4, prog_size=100, data_size=400, capacity=900):
-                my_scanner = Scanner(f"./input.txt", f".")
-                my_parser = Parser('grammar_v2.txt', my_scanner.pass_next_token_to_parser)
-                my_parser.parse()
-                my_parser.code_generator.fill_first_and_last()
-                
-                # check for `main` function definition
-                row = SymbolTable().find_row('main', 0)
-                if row is None or not isinstance(row.attribute, FuncAttribute):
-                    MAIN_FUNC_DEF()
\ No newline at end of file
+    arg_parser = argparse.ArgumentParser(description="compiles `./input.txt` into `./output.txt`")
+    arg_parser.add_argument("--no-parse-tree", action="store_true", help="neither build nor save the parse tree")
+    arg_parser.add_argument("--optimize", action="store_true", help="run the peephole optimizer over the generated code")
+    arg_parser.add_argument("--pack-temps", action="store_true", help="reuse temporaries which are no longer live")
+    arg_parser.add_argument("--cache-dir", default=None, help="directory of cached outputs, shared by many compilers")
+    arg_parser.add_argument("--cache-size", type=int, default=256, help="size of the cache in MB")
+    arg_parser.add_argument("--profile", action="store_true", 
+            help="save time spent in every phase into `profile.json` and as collapsed stacks into `profile.folded`")
+    args = arg_parser.parse_args()
+
+    cache = CompileCache(args.cache_dir, args.cache_size << 20) if args.cache_dir else None
+    profiler = Profiler() if args.profile else None
+    try:
+        compile_program("./input.txt", save_tree=not args.no_parse_tree, optimize=args.optimize, 
+                pack_temps=args.pack_temps, cache=cache, profiler=profiler)
+        if cache is not None:
+            print("cache: " + ", ".join(f"{count} {name}" for name, count in cache.stats.items()))
+    finally:
+        if profiler is not None:
+            profiler.save("profile.json", "profile.folded")
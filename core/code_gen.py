@@ -1,4 +1,7 @@
+from functools import partial
 from importlib import import_module
+from typing import TYPE_CHECKING, Callable, Dict
+
 from data_class.symbol_table import FuncAttribute
 from enums.addressing import AddressType
 
@@ -6,33 +9,56 @@ from enums.command import Command
 from data_class.addressing_mode import AddressingMode, Arg
 
 from enums.semantic_action import Action
-from modules.memory import Memory
-from modules.symbol_table import SymbolTable
+
+if TYPE_CHECKING:
+    from modules.context import CompilationContext
+
+_MATH_ACTIONS: Dict[Action, Command] = {
+    Action.ADD: Command.ADD,
+    Action.SUB: Command.SUB,
+    Action.MULT: Command.MULT,
+}
+""" actions which are all handled by `MATH` routine with their own command """
+
+_LEXEME_ACTIONS = [Action.CALL, Action.CHG_SCOPE, Action.PID, Action.PID2, Action.PNUM, Action.NARG, Action.SCOPING]
+""" actions whose routine takes the last parsed token as argument """
 
 class CodeGenerator:
 
-    def __init__(self) -> None:
+    def __init__(self, ctx: 'CompilationContext') -> None:
+        self._ctx: 'CompilationContext' = ctx
         self.last_parsed_token: str = None
+        self._routines: Dict[str, Callable[[], None]] = self._build_dispatch_table()
+        """ maps each action symbol to a ready-to-call routine """
 
-    def code_gen(self, action:Action) -> None:
-        if action in [Action.ADD, Action.SUB, Action.MULT]:
-            prev_action = action
-            action = "#MATH"
-        
-        routines = import_module(f"utils.routines")
-        func = getattr(routines, action[1:])
+    def _build_dispatch_table(self) -> Dict[str, Callable[[], None]]:
+        """resolves the routine and the argument convention of every action once"""
+
+        routines = import_module("utils.routines")
+        table: Dict[str, Callable[[], None]] = dict()
 
-        if action in [Action.CALL, Action.CHG_SCOPE, Action.PID, Action.PID2, Action.PNUM, Action.NARG, Action.SCOPING]:
-            func(self.last_parsed_token)
-        elif action == "#MATH":
-            func(prev_action[1:])
-        else:
-            func()
+        for name, func in vars(routines).items():
+            if name.isupper() and callable(func):
+                table[f"#{name}"] = partial(func, self._ctx)
+
+        for action, command in _MATH_ACTIONS.items():
+            table[action] = partial(routines.MATH, self._ctx, command)
+
+        for action in _LEXEME_ACTIONS:
+            table[action] = partial(self._call_with_last_token, table[action])
+
+        return table
+
+    def _call_with_last_token(self, func: Callable[[str], None]) -> None:
+        func(self.last_parsed_token)
+
+    def code_gen(self, action:Action) -> None:
+        self._routines[action]()
 
 
     def fill_first_and_last(self):
         def _find_main_row():
-            for row in SymbolTable().table:
+            for row in self._ctx.symbol_table.table:
                 if row.lexeme == "main" and isinstance(row.attribute, FuncAttribute):
                     return row
 
@@ -40,28 +66,28 @@ class CodeGenerator:
         if main is None:
             return
             
-        Memory().set_new_command(
+        self._ctx.memory.set_new_command(
             AddressingMode(
                 Command.ASSIGN,
-                Arg(AddressType.NUM, Memory().prog_p + 2),
+                Arg(AddressType.NUM, self._ctx.memory.prog_p + 2),
                 Arg(AddressType.DIRECT, main.attribute.jp_addr),
                 None
             )
         )
 
         # fill first program block row (jumping to main())
-        # Memory().set_new_command(
+        # self._ctx.memory.set_new_command(
         #     AddressingMode(
         #         Command.JP,
-        #         Arg(AddressType.NUM, Memory().prog_p - 1),
+        #         Arg(AddressType.NUM, self._ctx.memory.prog_p - 1),
         #         None,
         #         None
         #     ),
-        #     idx=Memory().start_prog_p
+        #     idx=self._ctx.memory.start_prog_p
         # )
 
         # fill last program block row (running main())
-        Memory().set_new_command(
+        self._ctx.memory.set_new_command(
             AddressingMode(
                 Command.JP,
                 Arg(AddressType.NUM, main.attribute.start_addr_in_PB),
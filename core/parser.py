@@ -1,258 +1,208 @@
-from typing import Callable, List, Dict, Tuple
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
 
-from anytree import Node, RenderTree
 from core.code_gen import CodeGenerator
 
 from core.scanner import EOF, Token, TokenType
+from data_class.parse_node import ParseNode
 from data_class.symbol_table import FuncAttribute
-from modules.semantic import Semantic
-from modules.symbol_table import SymbolTable
-from utils.constants import EPSILON, SYNC, NULL
+from modules.grammar import SYNC_CELL, Grammar, load_grammar
+from modules.parse_tree import ParseTreeWriter
+from utils.constants import EPSILON, TOP
+
+if TYPE_CHECKING:
+    from modules.context import CompilationContext
 
 class Parser:
     """ parser module using LL(1) algorithm
 
     Args:
+        ctx (CompilationContext): state of the compilation, where parser outputs are saved too
         grammar_addr (str): directory of text file containing all rules of the language
         call_scanner(Callable[..., Token]): function from Scanner module for extracting the next token
+        save_tree (bool): whether to build the parse tree and save it. If False, only semantic actions 
+            and error recovery are run
     """
     def __init__(self, 
+            ctx: 'CompilationContext',
             grammar_addr: str,
-            call_scanner: Callable[..., Token]) -> None:
+            call_scanner: Callable[..., Token],
+            save_tree: bool = True) -> None:
         
+        self._ctx: 'CompilationContext' = ctx
+
         self._parsing_started: bool = False
         """ if true then parser has got the first token from scanner """
 
-        self._terminals: List[str] = list()
-        """ list of all terminals exist for the given grammar """
-        
-        self._non_terminals: List[str] = list()
-        """ list of all non-terminals existed for the given grammar """
-        
-        self._rules: List[List[str]] = [[]]
-        """ all rules existed for the given grammar. NOTE: to start indexing from one, a null list is added at first """
+        grammar: Grammar = load_grammar(grammar_addr)
+        if grammar.conflicts:
+            raise ValueError("grammar is not LL(1): " + "; ".join(c.all_in_one for c in grammar.conflicts))
 
-        self._parse_grammar_file(grammar_addr)
+        self._grammar: Grammar = grammar
+        """ rules and encoded parse table of the language (NOTE: grammar symbols are used by their ids) """
 
         self._call_scanner: Callable[..., Tuple[Token, TokenType]] = call_scanner
 
-        self._root = Node('Program')
+        # a tree which is not saved is not built either
+        save_tree = save_tree and ctx.artifacts.enabled('parse_tree.txt')
+        self._save_tree: bool = save_tree
+
+        self.stack: List[int] = [grammar.symbol_ids[EOF], grammar.symbol_ids[grammar.start]]
+        """ parser stack of grammar symbol ids (NOTE: top of the stack is the last element) """
 
-        self.stack: List[Node] = [self._root, Node('$', parent=self._root)]
-        """ parser stack """
+        self._node_stack: Optional[List[ParseNode]] = None
+        """ parse tree nodes of the symbols in parser stack, if the tree is built """
+
+        self._root: Optional[ParseNode] = None
+        if save_tree:
+            self._root = ParseNode(grammar.start)
+            eof_node = ParseNode(EOF)
+            self._root.children = [eof_node]
+            self._node_stack = [eof_node, self._root]
         
         self._errs: List[str] = list()
         """ all errors occured during parsing """
 
-        self._parse_table: Dict[Tuple[str, str], int] = {
-            'Program': {'break': 1, 'continue': 1, 'ID': 1, 'return': 1, 'global': 1, 'def': 1, 'if': 1, 'while': 1, 'print': 1, '$': 1},
-            'Statements': {'break': 2, 'continue': 2, 'ID': 2, 'return': 2, 'global': 2, 'def': 2, 'if': 2, 'while': 2, 'print': 2, ';': 3, 'else': 3, '$': 3},
-            'Statement': {'def': 4, 'if': 4, 'while': 4, 'break': 5, 'continue': 5, 'ID': 5, 'return': 5, 'global': 5, 'print': 5},
-            'Simple_stmt': {'ID': 6, 'return': 7, 'global': 8, 'break': 9, 'continue': 10, 'print': 11},
-            'Compound_stmt': {'def': 12, 'if': 13, 'while': 14},
-            'Assignment_Call': {'ID': 15},
-            'B': {'=': 16, '[': 17, '(': 18},
-            'C': {'ID': 19, 'NUM': 19, '[': 20},
-            'List_Rest': {',': 21, ']': 22},
-            'Return_stmt': {'return': 23},
-            'Return_Value': {'ID': 24, 'NUM': 24, ';': 25},
-            'Global_stmt': {'global': 26},
-            'Function_def': {'def': 27},
-            'Params': {'ID': 28, ')': 29},
-            'Params_Prime': {',': 30, ')': 31},
-            'If_stmt': {'if': 32},
-            'Else_block': {'else': 33, ';': 34},
-            'Iteration_stmt': {'while': 35},
-            'Relational_Expression': {'ID': 36, 'NUM': 36},
-            'Relop': {'==': 37, '<': 38},
-            'Expression': {'ID': 39, 'NUM': 39},
-            'Expression_Prime': {'+': 40, '-': 41, ';': 42, ']': 42, ')': 42, ',': 42, ':': 42, '==': 42, '<': 42},
-            'Term': {'ID': 43, 'NUM': 43},
-            'Term_Prime': {'*': 44, ';': 45, ']': 45, ')': 45, ',': 45, ':': 45, '==': 45, '<': 45, '+': 45, '-': 45},
-            'Factor': {'ID': 46, 'NUM': 46},
-            'Power': {'**': 47, ';': 48, '[': 48, '(': 48, ']': 48, ')': 48, ',': 48, ':': 48, '==': 48, '<': 48, '+': 48, '-': 48, '*': 48},
-            'Primary': {'[': 49, '(': 50, ';': 51, ']': 51, ')': 51, ',': 51, ':': 51, '==': 51, '<': 51, '+': 51, '-': 51, '*': 51},
-            'Arguments': {'ID': 52, 'NUM': 52, ')': 53},
-            'Arguments_Prime': {',': 54, ')': 55},
-            'Atom': {'ID': 56, 'NUM': 57},
-        }
-        """ maps a non-terminal and terminal to the rule number or 'SYNC' """
-
-        self._follow: Dict[str, List[str]] = {
-            'Program': ['$'],
-            'Statements': [';', 'else', '$'],
-            'Statement': [';'],
-            'Simple_stmt': [';'],
-            'Compound_stmt': [';'],
-            'Assignment_Call': [';'],
-            'B': [';'],
-            'C': [';'],
-            'List_Rest': [']'],
-            'Return_stmt': [';'],
-            'Return_Value': [';'],
-            'Global_stmt': [';'],
-            'Function_def': [';'],
-            'Params': [')'],
-            'Params_Prime': [')'],
-            'If_stmt': [']'],
-            'Else_block': [';'],
-            'Iteration_stmt': [';'],
-            'Relational_Expression': [')', ':'],
-            'Relop': ['ID', 'NUM'],
-            'Expression': [';', ')', ']', ',', ':', '==', '<'],
-            'Expression_Prime': [';', ')', ']', ',', ':', '==', '<'],
-            'Term': [';', ')', ']', ',', ':', '==', '<', '+', '-'],
-            'Term_Prime': [';', ')', ']', ',', ':', '==', '<', '+', '-'],
-            'Factor': [';', ')', ']', ',', ':', '==', '<', '+', '-', '*'],
-            'Power': [';', ')', ']', ',', ':', '==', '<', '+', '-', '*'],
-            'Primary': [';', ')', ']', ',', ':', '==', '<', '+', '-', '*'],
-            'Arguments': [')'],
-            'Arguments_Prime': [')'],
-            'Atom': [';', '[', '(', ')', ']', ',', ':', '==', '<', '+', '-', '*', '**'],
-        }
-        """ maps a non-terminal to its list of follow """
-
-        self.code_generator: CodeGenerator = CodeGenerator()
+        self.code_generator: CodeGenerator = CodeGenerator(ctx)
         self._record_func_lexeme: bool = False
 
-    def _parse_grammar_file(self,
-            grammar_addr: str):
-        """parses the grammar file to extract terminals and non terminals expression plus rules.
-        
-        Args:
-            grammar_addr (str): directory of text file containing all rules of the language
-        """
-        
-        T_NT = list()
-        with open(grammar_addr, 'r') as f:
-
-            for rule in f.read().split("\n"):
-                lhs_non_terminal, rhs = rule.split(" -> ")
-                self._non_terminals.append(lhs_non_terminal)
-                
-                rhs_exps = rhs.split()
-                self._rules.append(rhs_exps)
-                T_NT += [lhs_non_terminal] + rhs_exps
-            
-            T_NT = list(set(T_NT))
-            self._non_terminals = list(set(self._non_terminals))
-            self._terminals = [x for x in T_NT if x not in self._non_terminals and not x.startswith("#")]   
-
-
     def parse(self): 
 
-        root: Node = self.stack[0]
-
-        while self.stack[0].name != EOF:
-
-            if not self._parsing_started:
-                token, token_type = self._call_scanner()
-                self._parsing_started = True
-
-            line_no = token.line
-            X = self.stack[0].name
-
-            if X.startswith("#"):
-                node = self.stack.pop(0)
-                self.code_generator.code_gen(X)
-
-            # X is terminal
-            if X in self._terminals:
-                node = self.stack.pop(0)
-                
-                if X == EPSILON:
-                    node.name = node.name.lower()
-                
-                elif X == token.lexeme or X == token_type:
-                    node.name = token.all_in_one
-                    if token_type in [TokenType.ID, TokenType.NUMBER]:
-                        self.code_generator.last_parsed_token = token.lexeme
+        grammar = self._grammar
+        symbols, symbol_ids = grammar.symbols, grammar.symbol_ids
+        n_terminals, first_action, n_columns = grammar.n_terminals, grammar.first_action, grammar.n_columns
+        table, encoded_rules = grammar.table, grammar.encoded_rules
+        eof, epsilon = symbol_ids[EOF], symbol_ids[EPSILON]
+        function_def = symbol_ids.get("Function_def")
+        # column of tokens out of the grammar, which are only errors
+        other = n_columns - 1
+
+        stack = self.stack
+        node_stack = self._node_stack
+        # the buffer of the tree is closed even if parsing fails
+        with ExitStack() as exit_stack:
+            tree: Optional[ParseTreeWriter] = exit_stack.enter_context(ParseTreeWriter(self._ctx.artifacts, self._root)) \
+                    if self._save_tree else None
+
+            while stack[TOP] != eof:
+
+                if not self._parsing_started:
                     token, token_type = self._call_scanner()
-                else:
-                    node.parent = None
-                    self._errs.append(f'#{line_no} : syntax error, missing {X}')
+                    self._parsing_started = True
+                    lexeme_id, type_id = symbol_ids.get(token.lexeme, other), symbol_ids.get(token_type, other)
+
+                line_no = token.line
+                X = stack[TOP]
+
+                # X is action
+                if X >= first_action:
+                    stack.pop()
+                    if tree is not None:
+                        tree.keep(node_stack.pop())
+                    self.code_generator.code_gen(symbols[X])
+
+                # X is terminal
+                elif X < n_terminals:
+                    stack.pop()
+                    node = node_stack.pop() if tree is not None else None
                 
-                if self._record_func_lexeme and token.lexeme != "def":
-                    row = SymbolTable().find_row(token.lexeme, Semantic().current_scope)
-                    row.attribute = FuncAttribute(row.attribute.scope_no, row.attribute.mem_addr, [], None, None, None)
-                    self._record_func_lexeme = False
-
-            # X is non-terminal
-            elif X in self._non_terminals:
-                T = token_type if token_type in [TokenType.ID, TokenType.NUMBER] else token.lexeme
-                try:
-                    rule_no = self._parse_table[X][T]
-                except:
-                    rule_no = SYNC if T in self._follow[X] else NULL
-
-                if isinstance(rule_no, int):
-                    lhs = self.stack.pop(0)
-                    rhs = self._rules[rule_no]
-
-                    if rhs[0] == "Function_def":
-                        self._record_func_lexeme = True
-
-                    self.stack = [Node(r, parent=lhs) for r in rhs] + self.stack          
-
-                elif rule_no == SYNC:
-                    # drop from parse tree
-                    node = self.stack.pop(0)
-                    node.parent = None
-
-                    self._errs.append(f'#{line_no} : syntax error, missing {X}')
+                    if X == epsilon:
+                        if tree is not None:
+                            tree.keep(node, node.name.lower())
                 
-                else:
-                    if token.lexeme == EOF:
-                        self._errs.append(f'#{line_no} : syntax error, Unexpected EOF') 
-                        break                   
+                    elif X == lexeme_id or X == type_id:
+                        if tree is not None:
+                            tree.keep(node, token.all_in_one)
+                        if token_type in [TokenType.ID, TokenType.NUMBER]:
+                            self.code_generator.last_parsed_token = token.lexeme
+                        token, token_type = self._call_scanner()
+                        lexeme_id, type_id = symbol_ids.get(token.lexeme, other), symbol_ids.get(token_type, other)
                     else:
-                        self._errs.append(f'#{line_no} : syntax error, illegal {T}')
-                    token, token_type = self._call_scanner()
-
-        # Unexpected EOF occured then remove all nodes remained in stack tree
-        if len(self.stack) > 1:
-            
-            # remove all nodes remained in stack from tree
-            while self.stack:
-                node = self.stack.pop(0)
-                node.parent = None
+                        if tree is not None:
+                            tree.drop(node)
+                        self._errs.append(f'#{line_no} : syntax error, missing {symbols[X]}')
+                
+                    if self._record_func_lexeme and token.lexeme != "def":
+                        row = self._ctx.symbol_table.find_row(token.lexeme, self._ctx.semantic.current_scope)
+                        self._ctx.symbol_table.set_attribute(row, FuncAttribute(row.attribute.scope_no, row.attribute.mem_addr, [], None, None, None))
+                        self._record_func_lexeme = False
 
-        # O.W. reorder eof sign in parser tree to the right most side            
-        else:
-            eof_node = self.stack.pop(0)
-            eof_node.parent = None
-            Node("$", parent=root)
+                # X is non-terminal
+                else:
+                    T = type_id if token_type in [TokenType.ID, TokenType.NUMBER] else lexeme_id
+                    # ids out of terminals are not columns of the table
+                    rule_no = table[(X - n_terminals) * n_columns + (T if T < n_terminals else other)]
+
+                    if rule_no > 0:
+                        stack.pop()
+                        rhs = encoded_rules[rule_no]
+
+                        if rhs[TOP] == function_def:
+                            self._record_func_lexeme = True
+
+                        # already reversed so the leftmost symbol is on top
+                        stack.extend(rhs)
+                        if tree is not None:
+                            children = tree.expand(node_stack.pop(), grammar.rules[rule_no])
+                            node_stack.extend(reversed(children))
+
+                    elif rule_no == SYNC_CELL:
+                        # drop from parse tree
+                        stack.pop()
+                        if tree is not None:
+                            tree.drop(node_stack.pop())
+
+                        self._errs.append(f'#{line_no} : syntax error, missing {symbols[X]}')
+                
+                    else:
+                        T = token_type if token_type in [TokenType.ID, TokenType.NUMBER] else token.lexeme
+                        if token.lexeme == EOF:
+                            self._errs.append(f'#{line_no} : syntax error, Unexpected EOF') 
+                            break                   
+                        else:
+                            self._errs.append(f'#{line_no} : syntax error, illegal {T}')
+                        token, token_type = self._call_scanner()
+                        lexeme_id, type_id = symbol_ids.get(token.lexeme, other), symbol_ids.get(token_type, other)
+
+            stack.clear()
+            if tree is not None:
+
+                # Unexpected EOF occured then remove all nodes remained in stack from tree,
+                # O.W. eof sign is kept as the right most child of the root
+                if len(node_stack) == 1:
+                    tree.keep(node_stack.pop())
+                tree.close(node_stack)
+                node_stack.clear()
     
         self._save()
 
 
-    def _save_errs(self):
-        """ saves occured errors within a text file """
+    def snapshot(self) -> tuple:
+        """state of the parser while it is waiting for the next token, e.g. inside `call_scanner`
+        (NOTE: parse tree is not kept, so parsing is resumed only if it is not built)"""
 
-        with open('syntax_errors.txt', 'w') as f:
-            if not self._errs:
-                f.write('There is no syntax error.')
-            else:
-                for err in self._errs:
-                    f.write(err)
-                    f.write('\n')
+        return list(self.stack), list(self._errs), self._record_func_lexeme, self.code_generator.last_parsed_token
 
+    def resume(self, state: tuple) -> None:
+        """puts the parser in the state of a snapshot, so `parse` goes on from the next token"""
 
-    def _save_parser_tree(self):
-        """ saves the parser tree within a text file """
+        stack, errs, self._record_func_lexeme, self.code_generator.last_parsed_token = state
+        self.stack[:] = stack
+        self._errs = list(errs)
+        self._parsing_started = False
 
-        with open('parse_tree.txt', 'w') as f:
-            for pre, _, node in RenderTree(self._root):
-                
-                # skip symbol actions
-                if node.name.startswith("#"):
-                    continue
+    def _save_errs(self):
+        """ saves occured errors within a text file """
+
+        if not self._errs:
+            self._ctx.artifacts.put('syntax_errors.txt', 'There is no syntax error.')
+        else:
+            self._ctx.artifacts.put('syntax_errors.txt', [f"{err}\n" for err in self._errs])
 
-                f.write(f"{pre}{node.name}\n")
-    
 
     def _save(self):
-        """ save parse tree and errors """
+        """ saves errors (NOTE: parse tree is written by `ParseTreeWriter` while parsing) """
 
         self._save_errs()
-        self._save_parser_tree()
\ No newline at end of file
+        if not self._save_tree:
+            self._ctx.artifacts.remove('parse_tree.txt')
\ No newline at end of file
@@ -1,66 +1,139 @@
-from typing import List, Optional, Tuple
+import re
+import sys
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, Optional, Tuple, Type
 from enums.error import ScannerErrorType as SEType
 
 from enums.token_type import TokenType
 from data_class.error import ScannerError as SError
 from data_class.token import Token
-from modules.semantic import Semantic
-from modules.symbol_table import SymbolTable
 from modules.dfa import *
 from utils.constants import EOF
+from utils.sinks import LineGroupedSink
+
+if TYPE_CHECKING:
+    from modules.context import CompilationContext
+
+PRELUDE = "def output(x):\n\tprint(x);\n\treturn 0;\n;\n\n"
+""" definition of `output` function put in front of every input code """
+
+_BUFFER_SIZE = 1 << 16
+""" number of characters read from the input at once """
+
+_KEPT_COMMENT_LEN = 10
+""" characters of a comment kept in the buffer, enough for reporting an unclosed one """
+
+_DFA_TABLE = DFATable([NumberDFA, WhitespaceDFA, SymbolDFA, IDDFA, CommentDFA])
+""" transition table of all DFAs, compiled once for every scanner """
+
+_COMMENT_STOPS: Dict[int, str] = {
+    _DFA_TABLE.state(CommentDFA, 2): "*",
+    _DFA_TABLE.state(CommentDFA, 5): "\n",
+}
+""" maps a state inside a comment to the only character which leaves it, so characters before it are skipped at once """
+
+_WHITESPACES = re.compile("[" + "".join(WhitespaceDFA.whitespace_chars) + "]+")
+""" run of whitespaces, each one of which is a token of its own with no output """
+
+_TOKEN_TYPES: Dict[Type[DFA], TokenType] = {
+    NumberDFA: TokenType.NUMBER,
+    WhitespaceDFA: TokenType.WHITESPACE,
+    SymbolDFA: TokenType.SYMBOL,
+    IDDFA: TokenType.ID, # a final check on being a keyword while creating the lexeme
+    CommentDFA: TokenType.COMMENT,
+}
 
 class Scanner:
     """scanner module
 
     Args:
+        ctx (CompilationContext): state of the compilation, where scanner outputs are saved too
         input_dir (str): directory of the input code to be scanned
-        save_dir (str): directory where scanner outputs are saved
+        buffer_size (Optional[int]): number of characters read from the input at once. If None, 
+            the whole input is read into memory at the beginning
     """
-    def __init__(self, input_dir: str, save_dir: str) -> None:
-        self._inp_file: str = "def output(x):\n\tprint(x);\n\treturn 0;\n;\n\n" + open(input_dir).read() + " "
-        self._save_dir: str = save_dir
+    def __init__(self, ctx: 'CompilationContext', input_dir: str, buffer_size: Optional[int] = _BUFFER_SIZE) -> None:
+        self._ctx: 'CompilationContext' = ctx
+        self._chunks: Iterator[str] = self._read_chunks(input_dir, buffer_size)
+        """ remaining parts of the input """
+
+        self._inp_file: str = ""
+        """ buffered part of the input, starting from the current token """
+
+        self._skipped: int = 0
+        """ characters of the current comment dropped from the buffer """
 
         self._current_line_num: int = -4
+        self.lineno: int = self._current_line_num
+        """ line number of semantic errors, which is that of the last token found, except after an unclosed `/` """
         self._current_token_type: TokenType = None
         self._p1: int = 0
         self._p2: int = self._p1
 
         self._multiline_comment_start_line = None
 
-        self._tokens: List[Token] = list()
-        self._errs: List[SError] = list()
+        self._token_stream: Optional[Iterator[Token]] = None
+        """ tokens passed to parser one by one """
 
 
-    def _select_dfa(self):
-        """specifies suitable DFA for the current token based on its first character
+    @classmethod
+    def from_text(cls, ctx: 'CompilationContext', text: str) -> 'Scanner':
+        """scanner of a piece of code as it is, i.e. without the prelude, whose lines are counted from zero"""
 
-        Args:
-            first_char (str): first character of the current token
+        scanner = cls(ctx, None)
+        scanner._chunks = iter([text])
+        scanner._current_line_num = scanner.lineno = 0
+        return scanner
+
+    @staticmethod
+    def _read_chunks(input_dir: str, buffer_size: Optional[int]) -> Iterator[str]:
+        """reads the input code piece by piece, surrounded by the prelude and a trailing space"""
+
+        yield PRELUDE
+        with open(input_dir) as f:
+            if buffer_size is None:
+                yield f.read()
+            else:
+                for chunk in iter(lambda: f.read(buffer_size), ""):
+                    yield chunk
+        yield " "
+
+    def _fill(self) -> bool:
+        """appends the next part of the input to the buffer and drops what is before the current token.
+
+        Returns:
+            bool: False if there is nothing left in the input
         """
-        self._current_token_type = None
-        first_char = self._inp_file[self._p1]
-        
-        if first_char.isdigit():
-            self._current_token_type = TokenType.NUMBER
-            return NumberDFA
-        
-        elif first_char in WhitespaceDFA.whitespace_chars:
-            self._current_token_type = TokenType.WHITESPACE
-            return WhitespaceDFA
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+
+        p1, p2 = self._p1, self._p2
+        if self._current_token_type == TokenType.COMMENT and p2 - p1 > _KEPT_COMMENT_LEN:
+            # only the beginning of a comment is ever reported
+            self._skipped += p2 - p1 - _KEPT_COMMENT_LEN
+            self._inp_file = self._inp_file[p1: p1 + _KEPT_COMMENT_LEN] + self._inp_file[p2:] + chunk
+            self._p2 = _KEPT_COMMENT_LEN
+        else:
+            self._inp_file = self._inp_file[p1:] + chunk
+            self._p2 = p2 - p1
+        self._p1 = 0
+        return True
 
-        elif first_char in SymbolDFA.chars:
-            self._current_token_type = TokenType.SYMBOL
-            return SymbolDFA
-        
-        elif first_char.isalpha():
-            self._current_token_type = TokenType.ID # a final check on being a keyword while creating the lexeme
-            return IDDFA
-        
-        elif first_char in CommentDFA.chars:
-            self._current_token_type = TokenType.COMMENT
-            return CommentDFA
+    def _has_input(self) -> bool:
+        """whether any character is left to be scanned"""
 
-        return None
+        while self._p1 >= len(self._inp_file):
+            if not self._fill():
+                return False
+        return True
+
+    def _select_dfa(self) -> Optional[Type[DFA]]:
+        """specifies suitable DFA for the current token based on its first character"""
+
+        dfa = _DFA_TABLE.selected[_DFA_TABLE.char_class[self._inp_file[self._p1]]]
+        self._current_token_type = _TOKEN_TYPES.get(dfa)
+        return dfa
 
 
     def _get_err_type(self, lexeme: str) -> SEType:
@@ -76,60 +149,86 @@ class Scanner:
             return SEType.INVALID_INPUT
 
 
-    def _get_next_token(self):
+    def _get_next_token(self) -> Tuple[Optional[Token], Optional[SError]]:
         """extracts next existing token, O.W. finds its error"""
 
-        dfa: Optional[DFA] = self._select_dfa()
+        dfa: Optional[Type[DFA]] = self._select_dfa()
+        state: Optional[int] = None
         new_token: Optional[Token] = None
         new_err: Optional[SError] = None
+        self._skipped = 0
         
         if dfa is not None:
             if dfa is CommentDFA:
                 self._multiline_comment_start_line = self._current_line_num # exactly when each '/' character is seen
-            dfa.reset(dfa)
 
-            while self._p2 < len(self._inp_file):
-                ch = self._inp_file[self._p2]
+            inp_file = self._inp_file
+            inp_len = len(inp_file)
+            char_class = _DFA_TABLE.char_class
+            transitions = _DFA_TABLE.transitions
+            state = _DFA_TABLE.start_state[dfa]
+            lookahead = False
+            new_lines = 0
+            p2 = self._p2
+            comment_stops = _COMMENT_STOPS if dfa is CommentDFA else None
+
+            while True:
+                if p2 >= inp_len:
+                    self._p2 = p2
+                    if not self._fill():
+                        break
+                    inp_file = self._inp_file
+                    inp_len = len(inp_file)
+                    p2 = self._p2
+
+                if comment_stops is not None and state in comment_stops:
+                    stop = inp_file.find(comment_stops[state], p2)
+                    if stop < 0:
+                        stop = inp_len
+                    new_lines += inp_file.count("\n", p2, stop)
+                    p2 = stop
+                    if p2 >= inp_len:
+                        continue
+
+                ch = inp_file[p2]
             
                 # handle new line
                 if ch=="\n":
-                    self._current_line_num += 1
-                    Semantic().lineno += 1
+                    new_lines += 1
 
-                dfa.move(dfa, ch)
-                if dfa.state in [FINAL_STATE, UNKNOWN]:
+                state, lookahead = transitions[char_class[ch]][state]
+                if state < 0: # FINAL_STATE or UNKNOWN
                     break
-                self._p2 += 1
+                p2 += 1
 
-            if dfa.lookahead and dfa.state == FINAL_STATE:
-                self._p2 -= 1
+            if lookahead and state == FINAL_STATE:
+                p2 -= 1
                 if ch=="\n":
-                    self._current_line_num -= 1
-                    Semantic().lineno -= 1
+                    new_lines -= 1
+
+            self._p2 = p2
+            if new_lines:
+                self._current_line_num += new_lines
+                self.lineno += new_lines
 
             # process new token
-            if dfa.state == FINAL_STATE and self._current_token_type not in \
+            if state == FINAL_STATE and self._current_token_type not in \
                     [TokenType.WHITESPACE, TokenType.COMMENT]:
-                lexeme = self._inp_file[self._p1: self._p2 + 1]
+                # a name is kept once however many times it is used
+                lexeme = sys.intern(self._inp_file[self._p1: self._p2 + 1])
                 
-                if lexeme in SymbolTable().keywords:
+                if lexeme in self._ctx.symbol_table.keyword_set:
                     self._current_token_type = TokenType.KEYWORD
                 
                 token_type = self._current_token_type
                 new_token = Token(self._current_line_num, lexeme, token_type)
 
-                if self._current_token_type in [TokenType.ID, TokenType.KEYWORD, TokenType.KEYWORD]:
-                    SymbolTable().add_row(lexeme, self._current_token_type)
-                
-                self._tokens.append(new_token)
-
         # process error caused by the lexeme
-        if dfa is None or (dfa is not None and dfa.state == UNKNOWN) or \
-                self._p2 == len(self._inp_file):
+        if dfa is None or state == UNKNOWN or self._p2 == len(self._inp_file):
 
             if self._current_token_type == TokenType.COMMENT:
                 # comment opened only by character '/'
-                if dfa.state == UNKNOWN:
+                if state == UNKNOWN:
                     self._current_token_type = None
                     lexeme = self._inp_file[self._p1: self._p1 + 1]
 
@@ -141,7 +240,7 @@ class Scanner:
                 # comment opened by '/*' and not closed
                 else:
                     lexeme = self._inp_file[self._p1: self._p1+10]
-                    if self._p2 > self._p1 + 9:
+                    if self._p2 + self._skipped > self._p1 + 9:
                         lexeme += "..."
             else:
                 lexeme = self._inp_file[self._p1: self._p2 + 1]
@@ -153,101 +252,96 @@ class Scanner:
             else:
                 new_err = SError(self._multiline_comment_start_line, lexeme, err_type)
 
-            self._errs.append(new_err)
-
         # update attributes for extracting the next token
         self._p2 += 1
         self._p1 = self._p2
 
-        return new_token
+        return new_token, new_err
 
     
-    def _save_tokens(self) -> None:
-        """save tokens into a text file"""
-        
-        line_num = 1
-        tokens_in_line: List[Token] = list()
-        save_dir = 'tokens.txt'
-        
-        with open(save_dir, 'w') as f:
-            for token in self._tokens:
-                if token.line > line_num:
-                    if tokens_in_line:
-                        tokens = f"{line_num}.\t" + " ".join(tokens_in_line)
-                        f.write(tokens)
-                        f.write("\n")
-                        
-                    line_num = token.line
-                    tokens_in_line.clear()
-                
-                tokens_in_line.append(token.all_in_one)
+    def _save_symbol_table(self) -> None:
+        """saves symbol table into a text file"""
 
-            tokens = f"{line_num}.\t" + " ".join(tokens_in_line)
-            f.write(tokens)
-            f.write("\n")
+        self._ctx.artifacts.put('symbol_table.txt', 
+                [f"{ix + 1}.\t{row.lexeme}\n" for ix, row in enumerate(self._ctx.symbol_table.table)])
 
-    
-    def _save_errs(self) -> None:
-        """saves all errors found in a text file"""
+    def lex(self, on_error: Optional[Callable[[SError], None]] = None) -> Iterator[Token]:
+        """lazily extracts tokens of the input (EXCEPT for comments and whitespaces), 
+        neither recording them in the symbol table nor moving the line number of semantic errors
 
-        line_num = 1
-        errs_in_line: List[Token] = list()
-        save_dir = 'lexical_errors.txt'
-        
-        with open(save_dir, 'w') as f:
-            if len(self._errs) == 0:
-                f.write("There is no lexical error.")
-            else:
-                for err in self._errs:
-                    if err.line > line_num:
-                        if errs_in_line:
-                            errs = f"{line_num}.\t" + " ".join(errs_in_line)
-                            f.write(errs)
-                            f.write("\n")
-
-                        line_num = err.line                        
-                        errs_in_line.clear()
-                    
-                    errs_in_line.append(err.all_in_one)
+        Args:
+            on_error (Optional[Callable[[SError], None]]): called with every lexical error, in order of appearance
+        """
 
-                errs = f"{line_num}.\t" + " ".join(errs_in_line)
-                f.write(errs)
-                f.write("\n")
+        whitespaces = _WHITESPACES.match
+        while self._has_input():
+            run = whitespaces(self._inp_file, self._p1)
+            if run is not None:
+                # a run of whitespaces is dropped at once, as its tokens would be
+                new_lines = self._inp_file.count("\n", self._p1, run.end())
+                self._current_line_num += new_lines
+                self.lineno += new_lines
+                self._p1 = self._p2 = run.end()
+                continue
 
-    
-    def _save_symbol_table(self) -> None:
-        """saves symbol table into a text file"""
+            token, err = self._get_next_token()
+            if err is not None and on_error is not None:
+                on_error(err)
+            if token is not None:
+                yield token
 
-        save_dir = 'symbol_table.txt'
-        with open(save_dir, 'w') as f:
-            for ix, row in enumerate(SymbolTable().table):
-                f.write(f"{ix + 1}.\t{row.lexeme}\n")
+    def tokens(self, on_error: Optional[Callable[[SError], None]] = None) -> Iterator[Token]:
+        """lazily extracts tokens of the input (EXCEPT for comments and whitespaces) without keeping them,
+        where IDs and keywords are recorded in the symbol table as they are passed on
 
-    def _save(self):
-        """saves tokens, errors and the symbol table in separate text files"""
+        Args:
+            on_error (Optional[Callable[[SError], None]]): called with every lexical error, in order of appearance
+        """
 
-        self._save_tokens()
-        self._save_errs()
-        self._save_symbol_table()
+        semantic, symbol_table = self._ctx.semantic, self._ctx.symbol_table
+        for token in self.lex(on_error):
+            semantic.lineno = self.lineno
+            if token.type in [TokenType.ID, TokenType.KEYWORD]:
+                symbol_table.add_row(token.lexeme, token.type)
+            yield token
+        semantic.lineno = self.lineno
 
-    def scan(self):                
-        """scans the whole input file to extract all tokens, errors and a single symbol table"""
+    def scan(self, save_tokens: bool = True, save_errs: bool = True):                
+        """scans the whole input file to extract all tokens, errors and a single symbol table.
+        Tokens and errors are written into their text files as they are found.
+
+        Args:
+            save_tokens (bool): whether to save tokens in `tokens.txt`
+            save_errs (bool): whether to save errors in `lexical_errors.txt`
+        """
 
-        while self._p1 < len(self._inp_file):
-            self._get_next_token()
+        artifacts = self._ctx.artifacts
+        save_tokens = save_tokens and artifacts.enabled('tokens.txt')
+        save_errs = save_errs and artifacts.enabled('lexical_errors.txt')
+        with ExitStack() as stack:
+            token_sink = LineGroupedSink(stack.enter_context(artifacts.open('tokens.txt'))) if save_tokens else None
+            err_sink = LineGroupedSink(stack.enter_context(artifacts.open('lexical_errors.txt')),
+                    "There is no lexical error.") if save_errs else None
 
-        self._save()
+            for token in self.tokens(on_error=err_sink.write if err_sink is not None else None):
+                if token_sink is not None:
+                    token_sink.write(token)
+
+            for sink in [token_sink, err_sink]:
+                if sink is not None:
+                    sink.close()
+
+        self._save_symbol_table()
 
     
     def pass_next_token_to_parser(self) -> Tuple[Token, TokenType]:
         """ passes the next next token to parser (EXCEPT for comments and whitespaces) """
 
-        while self._p1 < len(self._inp_file):
-            token = self._get_next_token()
-            if token is None or self._current_token_type in [TokenType.COMMENT, TokenType.WHITESPACE]:
-                continue
-            
-            return token, self._current_token_type
+        if self._token_stream is None:
+            self._token_stream = self.tokens()
+
+        for token in self._token_stream:
+            return token, token.type
         
         self._current_token_type = TokenType.EOF
         token_eof = Token(self._current_line_num, EOF, self._current_token_type)
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class GrammarConflict:
+    non_terminal: str
+    terminal: str
+    rules: List[int]
+
+    @property
+    def all_in_one(self):
+        return f"({self.non_terminal}, {self.terminal}) -> rules {', '.join(map(str, self.rules))}"
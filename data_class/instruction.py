@@ -0,0 +1,36 @@
+from typing import Optional, Tuple, Union
+
+from data_class.addressing_mode import AddressingMode
+
+Operand = Optional[Tuple[str, Union[int, str]]]
+""" addressing type and value of an operand, if any """
+
+
+class Instruction:
+    """compact record of a three address code, formatted only when the program block is written.
+    Operands are copied out of `Arg`s, so later changes of the semantic stack do not leak into the code.
+    """
+
+    __slots__ = ("command", "first", "second", "third")
+
+    def __init__(self, command: str, first: Operand, second: Operand = None, third: Operand = None) -> None:
+        self.command: str = command
+        self.first: Operand = first
+        self.second: Operand = second
+        self.third: Operand = third
+
+    @classmethod
+    def from_addressing(cls, addressing: AddressingMode) -> 'Instruction':
+        first, second, third = addressing.first, addressing.second, addressing.third
+        return cls(addressing.command, (first.type, first.val), 
+                None if second is None else (second.type, second.val), 
+                None if third is None else (third.type, third.val))
+
+    @property
+    def three_mode(self) -> str:
+        parts = [self.command] + ["" if operand is None else operand[0] + str(operand[1]) 
+                for operand in (self.first, self.second, self.third)]
+        return f"({', '.join(parts)})"
+
+    def __str__(self) -> str:
+        return self.three_mode
@@ -0,0 +1,21 @@
+from typing import List, Optional
+
+PENDING = 0
+""" state of a node still in the parser stack """
+
+ALIVE = 1
+""" state of a node derived and kept in the parse tree """
+
+DEAD = 2
+""" state of a node dropped from the parse tree """
+
+
+class ParseNode:
+    """compact record of a parse tree node"""
+
+    __slots__ = ("name", "children", "state")
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.children: Optional[List[Optional['ParseNode']]] = None
+        self.state: int = PENDING
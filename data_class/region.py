@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import List
+
+from data_class.token import Token
+
+
+@dataclass
+class ScannedRegion:
+    """tokens of a piece of a program, whose lines are counted from the start of the piece"""
+    tokens: List[Token]
+    linenos: List[int]
+    """ line number of semantic errors when each token is passed on """
+    lines: int
+    end_lineno: int
+    """ line number of semantic errors after the whole piece is scanned """
+    open_comment: bool
+    """ if true then the piece ends inside a comment, so it cannot be scanned on its own """
@@ -1,16 +1,31 @@
-from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from enums.token_type import TokenType
 
 
-@dataclass
 class Token:
-    line: int
-    lexeme: str
-    type: 'TokenType'
+    """compact record of a token, formatted only when it is written.
+    Lexemes are interned by the scanner, so tokens of the same name share their lexeme.
+    """
+
+    __slots__ = ("line", "lexeme", "type")
+
+    def __init__(self, line: int, lexeme: str, type: 'TokenType') -> None:
+        self.line: int = line
+        self.lexeme: str = lexeme
+        self.type: 'TokenType' = type
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not Token:
+            return NotImplemented
+        return self.line == other.line and self.lexeme == other.lexeme and self.type == other.type
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Token(line={self.line!r}, lexeme={self.lexeme!r}, type={self.type!r})"
 
     @property
     def all_in_one(self):
-        return f"({self.type}, {self.lexeme})"
\ No newline at end of file
+        return f"({self.type}, {self.lexeme})"
@@ -0,0 +1,250 @@
+import hashlib
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from compiler import KEYWORDS, MEMORY_LAYOUT, finish_program
+from core.code_gen import CodeGenerator
+from core.parser import Parser
+from core.scanner import PRELUDE, Scanner
+from data_class.error import ScannerError
+from data_class.region import ScannedRegion
+from data_class.token import Token
+from enums.error import ScannerErrorType
+from enums.token_type import TokenType
+from modules.context import CompilationContext
+from utils.constants import EOF
+
+_REGION_START = re.compile(r"^def\b", re.MULTILINE)
+""" a top-level function definition, where a region of the program starts """
+
+_FIRST_LINE = -4
+""" line number of the prelude, so the input starts from line 1 """
+
+
+class _Converged(Exception):
+    """ the compilation reached the state of the last one, so the rest of it is the same """
+
+
+class IncrementalCompiler:
+    """compiles versions of a program one after another, e.g. on every edit in an editor, where each
+    compilation reuses what is unchanged since the last one. Outputs are the same as `compile_program`
+    without the parse tree.
+
+    Program is split into regions, each starting from a top-level `def` (the first one is the prelude):
+        - tokens of every region are cached by its text, so only edited regions are scanned
+        - snapshots of the compilation are taken before some regions, so the compilation is resumed from
+          the last one before the first edited region, reusing symbol table rows and codes of functions before it
+        - regions after the edited ones are parsed from their cached tokens, unless the compilation reaches
+          the snapshot of the last compilation before one of them, which means the rest of it is unchanged
+
+    Regions after an edit are parsed again rather than moved, since their data addresses may be used as `#NUM`s.
+
+    Args:
+        save_dir (str): directory where outputs are saved
+        grammar_addr (str): directory of text file containing all rules of the language
+        optimize (bool): whether to run the peephole optimizer over the generated code
+        pack_temps (bool): whether to reuse temporaries which are no longer live
+        checkpoints (int): number of evenly spaced regions before which snapshots are kept
+        **memory_layout: arguments of the runtime memory, replacing the ones of `MEMORY_LAYOUT`
+    """
+    def __init__(self, save_dir: str = ".", grammar_addr: str = "grammar_v2.txt", optimize: bool = False,
+            pack_temps: bool = False, checkpoints: int = 8, **memory_layout) -> None:
+        self._save_dir: str = save_dir
+        self._grammar_addr: str = grammar_addr
+        self._optimize: bool = optimize
+        self._pack_temps: bool = pack_temps
+        self._checkpoints: int = checkpoints
+        self._memory_layout: dict = {**MEMORY_LAYOUT, **memory_layout}
+
+        self._scan_ctx: CompilationContext = CompilationContext(KEYWORDS, save_dir)
+        """ context of scanners of regions, which only read keywords from it """
+
+        self._scanned: Dict[bytes, ScannedRegion] = dict()
+        """ tokens of regions of the last compilation by digest of their text """
+
+        self._digests: List[bytes] = list()
+        """ digest of every region of the last compilation """
+
+        self._snapshots: Dict[int, list] = dict()
+        """ state of the last compilation right before some of its regions, as states of its context and parser,
+        line number, line number of semantic errors and digest of the state of the context, if it is found """
+
+        self._final: Optional[tuple] = None
+        """ state of the context of the last compilation once the whole input is parsed """
+
+        self._complete: bool = False
+        """ if true then outputs of the last compilation are saved """
+
+        self.stats: Dict[str, Optional[int]] = dict()
+        """ number of regions and scanned regions, and the regions where the last compilation is resumed and converged """
+
+    def _scan(self, text: str) -> ScannedRegion:
+        scanner = Scanner.from_text(self._scan_ctx, text)
+        open_comment = False
+
+        def _on_error(err: ScannerError) -> None:
+            nonlocal open_comment
+            open_comment = open_comment or err.type == ScannerErrorType.UNCLOSED_COMMENT
+
+        tokens, linenos = list(), list()
+        for token in scanner.lex(_on_error):
+            tokens.append(token)
+            linenos.append(scanner.lineno)
+        return ScannedRegion(tokens, linenos, text.count("\n"), scanner.lineno, open_comment)
+
+    def _regions(self, source: str) -> Tuple[List[ScannedRegion], List[bytes]]:
+        """tokens and digest of every region of the input, where a region ending inside a comment
+        is joined to the next one"""
+
+        text = PRELUDE + source + " "
+        starts = [match.start() for match in _REGION_START.finditer(text)]
+        texts = [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])]
+
+        regions, digests = list(), list()
+        scanned = dict()
+        self.stats["scanned"] = 0
+        i = 0
+        while i < len(texts):
+            digest = hashlib.blake2b(texts[i].encode(), digest_size=16).digest()
+            region = scanned.get(digest) or self._scanned.get(digest)
+            if region is None:
+                region = self._scan(texts[i])
+                self.stats["scanned"] += 1
+            if region.open_comment and i + 1 < len(texts):
+                texts[i:i + 2] = [texts[i] + texts[i + 1]]
+                continue
+            scanned[digest] = region
+            regions.append(region)
+            digests.append(digest)
+            i += 1
+
+        self._scanned = scanned
+        return regions, digests
+
+    def _tokens(self, ctx: CompilationContext, regions: List[ScannedRegion], first: int, line: int, lineno: int,
+            before_region: Callable[[int, int, int], None]) -> Iterator[Token]:
+        """passes tokens from a region on, as the scanner would (NOTE: EOF is passed on forever)
+
+        Args:
+            first (int): index of the first region
+            line (int): line number of the first region
+            lineno (int): line number of semantic errors at the start of the first region
+            before_region (Callable[[int, int, int], None]): called with index, line and line number of semantic errors
+                of every region, right before its first token is asked for
+        """
+
+        semantic, symbol_table = ctx.semantic, ctx.symbol_table
+        for i in range(first, len(regions)):
+            before_region(i, line, lineno)
+            region = regions[i]
+            for token, token_lineno in zip(region.tokens, region.linenos):
+                semantic.lineno = lineno + token_lineno
+                if token.type in [TokenType.ID, TokenType.KEYWORD]:
+                    symbol_table.add_row(token.lexeme, token.type)
+                yield Token(token.line + line, token.lexeme, token.type)
+            line += region.lines
+            lineno += region.end_lineno
+
+        semantic.lineno = lineno
+        eof = Token(line, EOF, TokenType.EOF)
+        while True:
+            yield eof
+
+    @staticmethod
+    def _splice(new: tuple, old: tuple, later: tuple) -> tuple:
+        """state of a context after `later`, if it had passed by `new` rather than `old`, where `new` and `old`
+        differ only in codes of the program block. Since codes are never read while compiling, codes of `new`
+        are taken unless they are written again after `old`.
+        """
+
+        new_rows, new_patches = new[1], new[2]
+        later_modules, later_rows, later_patches = later
+        rewritten = set(later_patches[len(old[2]):])
+        rows = [later_rows[r] if r in rewritten else row for r, row in enumerate(new_rows)] + later_rows[len(new_rows):]
+        return later_modules, rows, new_patches + later_patches[len(old[2]):]
+
+    def compile(self, source: str) -> None:
+        """compiles a version of the program and saves its outputs
+
+        Args:
+            source (str): input code
+        """
+
+        regions, digests = self._regions(source)
+        old_digests, old_snapshots, old_final = self._digests, self._snapshots, self._final
+        n = len(regions)
+        self.stats.update(regions=n, resumed_at=None, converged_at=None)
+
+        # first edited region
+        edited = next((i for i, (new, old) in enumerate(zip(digests, old_digests)) if new != old),
+                min(n, len(old_digests)))
+        if edited == n == len(old_digests) and self._complete:
+            self.stats["converged_at"] = n
+            return
+
+        interval = max(1, n // self._checkpoints)
+        snapshots: Dict[int, list] = {i: snapshot for i, snapshot in old_snapshots.items()
+                if i <= edited and (i % interval == 0 or i == edited)}
+        resume_at = max(snapshots, default=None)
+        kept = {edited, edited + 1} | set(range(interval, n, interval))
+        converge_at = {i for i in old_snapshots if i > edited and old_digests[i:] == digests[i:]} if self._complete else set()
+
+        self._digests, self._snapshots, self._final, self._complete = digests, snapshots, None, False
+
+        if resume_at is None:
+            ctx = CompilationContext(KEYWORDS, self._save_dir, **self._memory_layout)
+            parser_state, first, line, lineno = None, 0, _FIRST_LINE, _FIRST_LINE
+        else:
+            ctx_state, parser_state, line, lineno, _ = snapshots[resume_at]
+            ctx = CompilationContext.resume(ctx_state)
+            first = resume_at
+            self.stats["resumed_at"] = resume_at
+        parser: Optional[Parser] = None
+
+        def _before_region(i: int, region_line: int, region_lineno: int) -> None:
+            if i == resume_at or (i not in kept and i not in converge_at) or i == 0:
+                return
+            snapshot = [ctx.snapshot(), parser.snapshot(), region_line, region_lineno, None]
+            old = old_snapshots.get(i)
+            # states of contexts are compared only if cheaper parts of them are the same
+            if i in converge_at and snapshot[1:4] == old[1:4] and len(snapshot[0][1]) == len(old[0][1]):
+                snapshot[4] = ctx.digest()
+                if old[4] is None:
+                    old[4] = CompilationContext.resume(old[0]).digest()
+                if snapshot[4] == old[4]:
+                    # the rest of the compilation is the same as the last one, except for codes before this region
+                    for j in [j for j in old_snapshots if j > i]:
+                        snapshots[j] = [self._splice(snapshot[0], old[0], old_snapshots[j][0])] + old_snapshots[j][1:]
+                    snapshots[i] = snapshot
+                    self._final = self._splice(snapshot[0], old[0], old_final)
+                    self.stats["converged_at"] = i
+                    raise _Converged()
+            if i in kept:
+                snapshots[i] = snapshot
+
+        tokens = self._tokens(ctx, regions, first, line, lineno, _before_region)
+
+        def _next_token() -> Tuple[Token, TokenType]:
+            token = next(tokens)
+            return token, token.type
+
+        parser = Parser(ctx, self._grammar_addr, _next_token, save_tree=False)
+        if parser_state is not None:
+            parser.resume(parser_state)
+
+        ctx.__enter__()
+        try:
+            try:
+                parser.parse()
+                self._final = ctx.snapshot()
+            except _Converged:
+                # syntax errors are the same as the last compilation too, so they are not saved again
+                ctx = CompilationContext.resume(self._final)
+                ctx.__enter__()
+            finish_program(ctx, CodeGenerator(ctx), self._optimize, self._pack_temps)
+        except BaseException as e:
+            self._digests, self._snapshots, self._final = list(), dict(), None
+            ctx.__exit__(type(e), e, e.__traceback__)
+            raise
+        ctx.__exit__(None, None, None)
+        self._complete = True
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+_CACHE_VERSION = 3
+""" bumped whenever outputs of the compiler for the same input, or the format of entries, change """
+
+_ENTRY_SUFFIX = ".entry"
+
+
+class CompileCache:
+    """content-addressed cache of compilation outputs on disk, shared by many compilers at once.
+
+    An entry holds all files saved by a compilation as JSON, keyed by the hash of everything the outputs depend on.
+    Once the cache outgrows its size, entries used least recently (by modification time, which is renewed on every hit)
+    are removed.
+
+    Args:
+        cache_dir (str): directory of cached entries
+        max_bytes (int): size of all entries, beyond which old ones are removed
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = 256 << 20) -> None:
+        self.cache_dir: str = cache_dir
+        self.max_bytes: int = max_bytes
+
+        self.stats: Dict[str, int] = dict(hits=0, misses=0, stores=0, evictions=0)
+        """ what happened to lookups and entries of this cache object """
+
+    @staticmethod
+    def key(input_addr: str, grammar_addr: str, keywords: List[str], memory_layout: dict, **options) -> str:
+        """hash of the input code, grammar file, keywords, memory layout and options of a compilation"""
+
+        digest = hashlib.sha256()
+        for addr in [input_addr, grammar_addr]:
+            with open(addr, 'rb') as f:
+                content = f.read()
+            digest.update(len(content).to_bytes(8, "little"))
+            digest.update(content)
+        config = dict(version=_CACHE_VERSION, keywords=keywords, memory_layout=memory_layout, options=options)
+        digest.update(json.dumps(config, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _addr(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _ENTRY_SUFFIX)
+
+    def load(self, key: str) -> Optional[Dict[str, str]]:
+        """content of every output file of an entry by its name, None if there is no such entry"""
+
+        addr = self._addr(key)
+        try:
+            with open(addr, 'rb') as f:
+                content = f.read()
+        except OSError:
+            self.stats["misses"] += 1
+            return None
+
+        # never unpickled, since every compiler sharing the directory can write into it
+        try:
+            files = json.loads(content)
+        except ValueError: # including `json.JSONDecodeError` and `UnicodeDecodeError`
+            files = None
+        if not isinstance(files, dict) or not all(isinstance(name, str) and isinstance(text, str) 
+                for name, text in files.items()):
+            # a corrupt entry is never read again
+            self.stats["misses"] += 1
+            try:
+                os.remove(addr)
+            except OSError:
+                pass
+            return None
+        self.stats["hits"] += 1
+        try:
+            os.utime(addr)
+        except OSError:
+            pass # removed by another compiler, or the cache is read-only
+        return files
+
+    def store(self, key: str, files: Dict[str, str]) -> None:
+        """adds an entry, then removes old ones if the cache is too large
+
+        Args:
+            files (Dict[str, str]): content of every output file by its name
+        """
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # renamed into place, so a compiler loading this entry meanwhile never reads half of it
+            fd, tmp_addr = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(files, f)
+                os.replace(tmp_addr, self._addr(key))
+            except BaseException:
+                os.unlink(tmp_addr)
+                raise
+        except OSError:
+            return # e.g. a full disk, so the outputs are only saved in their directory
+        self.stats["stores"] += 1
+        self._evict()
+
+    def _evict(self) -> None:
+        """removes least recently used entries until all of them fit in the size"""
+
+        entries = list()
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(_ENTRY_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue # removed by another compiler
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, addr in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(addr)
+                self.stats["evictions"] += 1
+            except OSError:
+                pass
+            size -= entry_size
+
@@ -0,0 +1,88 @@
+import hashlib
+import io
+import pickle
+from contextlib import ExitStack
+from typing import List, Optional, Tuple
+
+from data_class.instruction import Instruction
+from modules.memory import Memory
+from modules.semantic import Semantic
+from modules.symbol_table import SymbolTable
+from utils.sinks import ArtifactSink
+
+
+class CompilationContext:
+    """state of a single compilation, shared by scanner, parser, code generator and semantic routines.
+    Contexts are independent of each other, so many compilations can run side by side in one process.
+
+    Args:
+        keywords (List[str]): keywords of the language, put in the symbol table at first
+        save_dir (str): directory where outputs of the compilation are saved
+        artifacts (Optional[ArtifactSink]): where outputs are saved. If None, they are saved in `save_dir`
+        **memory_layout: arguments of the runtime memory (`unit`, `prog_size` and `data_size`)
+    """
+    def __init__(self, keywords: List[str], save_dir: str = ".", artifacts: Optional[ArtifactSink] = None, 
+            **memory_layout) -> None:
+        self.save_dir: str = save_dir
+        self.artifacts: ArtifactSink = artifacts if artifacts is not None else ArtifactSink(save_dir)
+        self.semantic: Semantic = Semantic(self.artifacts)
+        self.symbol_table: SymbolTable = SymbolTable(self.semantic, keywords)
+        self.memory: Memory = Memory(artifacts=self.artifacts, **memory_layout)
+        self._exit_stack: ExitStack = ExitStack()
+        self._resumed: bool = False
+        """ if true then modules are already started, so they are only exited """
+
+    def __enter__(self) -> 'CompilationContext':
+        # outputs are held until all modules are exited, so every file is written once
+        self._exit_stack.enter_context(self.artifacts)
+        # exited in reverse, so semantic errors may override the generated code
+        for module in [self.semantic, self.symbol_table, self.memory]:
+            if self._resumed:
+                self._exit_stack.push(module)
+            else:
+                self._exit_stack.enter_context(module)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._exit_stack.__exit__(exc_type, exc_val, exc_tb)
+
+    def snapshot(self) -> Tuple[bytes, List[Optional[Instruction]], List[int]]:
+        """state of an entered context in the middle of the compilation, to be resumed by `resume`
+
+        Returns:
+            Tuple[bytes, List[Optional[Instruction]], List[int]]: serialized modules except for the program block,
+                then the program block and indices of its rows written after they were reserved
+        """
+
+        modules = pickle.dumps((self.save_dir, self.semantic, self.symbol_table, self.memory), pickle.HIGHEST_PROTOCOL)
+        return modules, self.memory.program_block, list(self.memory.patches)
+
+    def digest(self) -> bytes:
+        """digest of the state of modules, which is the same for equal states however their objects are shared"""
+
+        buffer = io.BytesIO()
+        pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+        # objects are written as many times as they are referred to, rather than once
+        pickler.fast = True
+        pickler.dump((self.semantic, self.symbol_table, self.memory))
+        return hashlib.blake2b(buffer.getvalue(), digest_size=16).digest()
+
+    @classmethod
+    def resume(cls, snapshot: Tuple[bytes, List[Optional[Instruction]], List[int]], 
+            artifacts: Optional[ArtifactSink] = None) -> 'CompilationContext':
+        """context in the state of a snapshot, which is to be entered to continue the compilation
+
+        Args:
+            artifacts (Optional[ArtifactSink]): where outputs are saved. If None, they are saved in the directory of the snapshot
+        """
+
+        modules, program_block, patches = snapshot
+        ctx = cls.__new__(cls)
+        ctx.save_dir, ctx.semantic, ctx.symbol_table, ctx.memory = pickle.loads(modules)
+        ctx.artifacts = artifacts if artifacts is not None else ArtifactSink(ctx.save_dir)
+        ctx.semantic.artifacts = ctx.memory.artifacts = ctx.artifacts
+        ctx.memory.program_block = program_block
+        ctx.memory.patches = list(patches)
+        ctx._exit_stack = ExitStack()
+        ctx._resumed = True
+        return ctx
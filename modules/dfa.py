@@ -1,3 +1,4 @@
+from typing import Dict, List, Optional, Tuple, Type
 
 from utils.constants import UNKNOWN, ASCII_LOWERCASE, ASCII_UPPERCASE, DIGIT, FINAL_STATE
 
@@ -169,4 +170,118 @@ class IDDFA(DFA):
                 cls.lookahead = True
                 
         cls.state = next_state
-        return next_state
\ No newline at end of file
+        return next_state
+
+def select_dfa(first_char: str) -> Optional[Type[DFA]]:
+    """specifies suitable DFA for a token based on its first character"""
+
+    if first_char.isdigit():
+        return NumberDFA
+    elif first_char in WhitespaceDFA.whitespace_chars:
+        return WhitespaceDFA
+    elif first_char in SymbolDFA.chars:
+        return SymbolDFA
+    elif first_char.isalpha():
+        return IDDFA
+    elif first_char in CommentDFA.chars:
+        return CommentDFA
+    return None
+
+
+class _CharClasses(dict):
+    """maps a character to its class, classifying unseen characters on first use"""
+
+    def __init__(self, table: 'DFATable') -> None:
+        super().__init__()
+        self._table = table
+
+    def __missing__(self, ch: str) -> int:
+        cls = self._table._classify(ch)
+        self[ch] = cls
+        return cls
+
+
+class DFATable:
+    """all DFAs compiled into one transition table indexed by state and character class
+
+    Transitions are taken from the `move()` of each DFA, so the table accepts exactly what
+    the DFAs accept. States of all DFAs are renumbered into one space, while `FINAL_STATE`
+    and `UNKNOWN` keep their values. Two characters are in the same class when every DFA
+    state and the DFA selection treat them alike.
+
+    Args:
+        dfas (List[Type[DFA]]): DFAs to be compiled
+    """
+    def __init__(self, dfas: List[Type[DFA]]) -> None:
+        self.dfas: List[Type[DFA]] = dfas
+
+        self._states: List[Tuple[Type[DFA], int]] = list()
+        """ (DFA, its own state) for every state of the table """
+
+        self._state_ids: Dict[Tuple[Type[DFA], int], int] = dict()
+
+        self.start_state: Dict[Type[DFA], int] = {dfa: self._state_id(dfa, 0) for dfa in dfas}
+        """ state of the table where each DFA starts """
+
+        self.transitions: List[List[Tuple[int, bool]]] = list()
+        """ maps a character class and a state to the next state and whether lookahead occured """
+
+        self.selected: List[Optional[Type[DFA]]] = list()
+        """ maps a character class to the DFA selected by a token starting with it """
+
+        self._signatures: Dict[tuple, int] = dict()
+        self.char_class: Dict[str, int] = _CharClasses(self)
+        """ maps a character to its class """
+
+        # discover every state of the DFAs by walking them over ASCII characters
+        ascii_chars = [chr(i) for i in range(128)]
+        explored = 0
+        while explored < len(self._states):
+            dfa, state = self._states[explored]
+            for ch in ascii_chars:
+                next_state, _ = self._move(dfa, state, ch)
+                if next_state >= 0:
+                    self._state_id(dfa, next_state)
+            explored += 1
+        
+        for ch in ascii_chars:
+            self.char_class[ch]
+
+    def state(self, dfa: Type[DFA], state: int) -> int:
+        """state of the table for a state of a DFA"""
+        return self._state_ids[(dfa, state)]
+
+    def _state_id(self, dfa: Type[DFA], state: int) -> int:
+        key = (dfa, state)
+        if key not in self._state_ids:
+            self._state_ids[key] = len(self._states)
+            self._states.append(key)
+        return self._state_ids[key]
+
+    @staticmethod
+    def _move(dfa: Type[DFA], state: int, ch: str) -> Tuple[int, bool]:
+        """runs a single move of the DFA from the given state"""
+
+        dfa.reset(dfa)
+        dfa.state = state
+        next_state = dfa.move(dfa, ch)
+        lookahead = dfa.lookahead
+        dfa.reset(dfa)
+        return next_state, lookahead
+
+    def _classify(self, ch: str) -> int:
+        """finds the class of a character, adding a new class if none behaves the same"""
+
+        row: List[Tuple[int, bool]] = list()
+        for dfa, state in self._states:
+            next_state, lookahead = self._move(dfa, state, ch)
+            if next_state >= 0:
+                next_state = self._state_ids[(dfa, next_state)]
+            row.append((next_state, lookahead))
+
+        signature = (select_dfa(ch), tuple(row))
+        if signature not in self._signatures:
+            self._signatures[signature] = len(self.selected)
+            self.selected.append(signature[0])
+            self.transitions.append(row)
+        return self._signatures[signature]
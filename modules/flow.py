@@ -0,0 +1,62 @@
+from typing import Dict, List, Optional, Set
+
+from data_class.instruction import Instruction
+from enums.addressing import AddressType
+from enums.command import Command
+
+
+def dest_pos(command: str) -> Optional[int]:
+    """position of the operand written by a command"""
+
+    if command == Command.ASSIGN:
+        return 2
+    if command in [Command.ADD, Command.SUB, Command.MULT, Command.EQ, Command.LT]:
+        return 3
+    return None
+
+
+def label_pos(command: str) -> Optional[int]:
+    """position of the jump target of a command"""
+
+    if command == Command.JP:
+        return 1
+    if command == Command.JPF:
+        return 2
+    return None
+
+
+def return_addresses(codes: List[Instruction]) -> Dict[str, List[int]]:
+    """maps every word which some `JP @word` jumps through to the code indices assigned to it as `#NUM`"""
+
+    addresses: Dict[str, List[int]] = {str(code.first[1]): [] for code in codes
+            if code.command == Command.JP and code.first[0] == AddressType.INDIRECT}
+    for code in codes:
+        if code.command == Command.ASSIGN and code.first[0] == AddressType.NUM \
+                and code.second[0] == AddressType.DIRECT and str(code.second[1]) in addresses:
+            addresses[str(code.second[1])].append(int(code.first[1]))
+    return addresses
+
+
+def successors(codes: List[Instruction]) -> List[List[int]]:
+    """indices of the codes which may run right after each code (NOTE: indices past the end halt)
+
+    A return (`JP @word`) goes to the return addresses assigned to its word, or to all of them if there is none.
+    """
+
+    addresses = return_addresses(codes)
+    all_addresses: Set[int] = {address for word in addresses.values() for address in word}
+
+    def targets(operand) -> List[int]:
+        if operand[0] != AddressType.INDIRECT:
+            return [int(operand[1])]
+        return addresses.get(str(operand[1])) or sorted(all_addresses)
+
+    succs: List[List[int]] = list()
+    for i, code in enumerate(codes):
+        if code.command == Command.JP:
+            succs.append(targets(code.first))
+        elif code.command == Command.JPF:
+            succs.append(targets(code.second) + [i + 1])
+        else:
+            succs.append([i + 1])
+    return succs
@@ -0,0 +1,275 @@
+import hashlib
+import json
+import os
+import tempfile
+from array import array
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from data_class.grammar import GrammarConflict
+from utils.constants import EOF, EPSILON, SYNC
+
+ERROR_CELL = 0
+""" cell of the encoded parse table with neither a rule nor 'SYNC' """
+
+SYNC_CELL = -1
+""" cell of the encoded parse table set to 'SYNC' """
+
+
+class Grammar:
+    """LL(1) grammar with its FIRST and FOLLOW sets and parse table, all generated from a grammar file.
+
+    Each line of the file is a rule like `A -> x #ACTION B`. Action symbols (starting with '#') derive nothing, 
+    so they are transparent while computing FIRST and FOLLOW sets. Lhs of the first rule is the start symbol.
+
+    Args:
+        text (str): content of the grammar file
+    """
+    def __init__(self, text: str) -> None:
+        self.rules: List[List[str]] = [[]]
+        """ rhs of all rules. NOTE: to start indexing from one, a null list is added at first """
+
+        self.lhs: List[Optional[str]] = [None]
+        """ lhs of all rules, with the same indexing """
+
+        self.non_terminals: List[str] = list()
+        """ non-terminals in order of appearance """
+
+        self.terminals: List[str] = list()
+        """ terminals in order of appearance (NOTE: includes EPSILON) """
+
+        self.first: Dict[str, Set[str]] = dict()
+        """ maps a grammar symbol to its FIRST set, containing EPSILON if the symbol is nullable """
+
+        self.follow: Dict[str, Set[str]] = dict()
+        """ maps a non-terminal to its FOLLOW set """
+
+        self.parse_table: Dict[str, Dict[str, Union[int, str]]] = dict()
+        """ maps a non-terminal and terminal to the rule number or 'SYNC' """
+
+        self.conflicts: List[GrammarConflict] = list()
+        """ cells of the parse table claimed by more than one rule. The first rule is kept in the table """
+
+        self._read_rules(text)
+        self._build_first()
+        self._build_follow()
+        self._build_parse_table()
+        self._encode()
+
+    def to_data(self) -> dict:
+        """rules, FIRST and FOLLOW sets, parse table and conflicts as plain data, to be saved as JSON"""
+
+        return dict(rules=self.rules, lhs=self.lhs, non_terminals=self.non_terminals, terminals=self.terminals,
+                first={symbol: sorted(first) for symbol, first in self.first.items()},
+                follow={symbol: sorted(follow) for symbol, follow in self.follow.items()},
+                parse_table=self.parse_table,
+                conflicts=[[c.non_terminal, c.terminal, c.rules] for c in self.conflicts])
+
+    @classmethod
+    def from_data(cls, data: dict) -> 'Grammar':
+        """grammar made of what `to_data` returns, without generating its sets and table again"""
+
+        grammar = cls.__new__(cls)
+        grammar.rules, grammar.lhs = data["rules"], data["lhs"]
+        grammar.non_terminals, grammar.terminals = data["non_terminals"], data["terminals"]
+        grammar.first = {symbol: set(first) for symbol, first in data["first"].items()}
+        grammar.follow = {symbol: set(follow) for symbol, follow in data["follow"].items()}
+        grammar.parse_table = data["parse_table"]
+        grammar.conflicts = [GrammarConflict(*conflict) for conflict in data["conflicts"]]
+        grammar._encode()
+        return grammar
+
+    @property
+    def start(self) -> str:
+        """start symbol of the grammar"""
+        return self.lhs[1]
+
+    def _read_rules(self, text: str) -> None:
+        """extracts rules, terminals and non-terminals of the grammar"""
+
+        symbols = list()
+        for rule in text.split("\n"):
+            if not rule.strip():
+                continue
+            lhs, rhs = rule.split(" -> ")
+            self.lhs.append(lhs)
+            self.rules.append(rhs.split())
+            symbols += [lhs] + self.rules[-1]
+            if lhs not in self.non_terminals:
+                self.non_terminals.append(lhs)
+
+        for symbol in symbols:
+            if symbol not in self.non_terminals and symbol not in self.terminals and not symbol.startswith("#"):
+                self.terminals.append(symbol)
+
+    def first_of(self, symbols: List[str]) -> Set[str]:
+        """FIRST set of a sequence of grammar symbols, containing EPSILON if all of them are nullable"""
+
+        first = set()
+        for symbol in symbols:
+            if symbol.startswith("#") or symbol == EPSILON:
+                continue
+            symbol_first = self.first[symbol]
+            first |= symbol_first - {EPSILON}
+            if EPSILON not in symbol_first:
+                return first
+        first.add(EPSILON)
+        return first
+
+    def _build_first(self) -> None:
+        """computes FIRST sets by iterating to a fixed point"""
+
+        for terminal in self.terminals:
+            self.first[terminal] = {terminal}
+        for non_terminal in self.non_terminals:
+            self.first[non_terminal] = set()
+
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in zip(self.lhs[1:], self.rules[1:]):
+                first = self.first_of(rhs)
+                if not first <= self.first[lhs]:
+                    self.first[lhs] |= first
+                    changed = True
+
+    def _build_follow(self) -> None:
+        """computes FOLLOW sets by iterating to a fixed point"""
+
+        for non_terminal in self.non_terminals:
+            self.follow[non_terminal] = set()
+        self.follow[self.start].add(EOF)
+
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in zip(self.lhs[1:], self.rules[1:]):
+                for ix, symbol in enumerate(rhs):
+                    if symbol not in self.follow:
+                        continue
+                    follow = self.first_of(rhs[ix + 1:])
+                    if EPSILON in follow:
+                        follow = (follow - {EPSILON}) | self.follow[lhs]
+                    if not follow <= self.follow[symbol]:
+                        self.follow[symbol] |= follow
+                        changed = True
+
+    def _build_parse_table(self) -> None:
+        """fills the parse table from FIRST and FOLLOW sets and records conflicts.
+        Empty cells on FOLLOW of a non-terminal are set to 'SYNC' for panic mode recovery
+        """
+
+        cells: Dict[str, Dict[str, List[int]]] = {non_terminal: dict() for non_terminal in self.non_terminals}
+        for rule_no in range(1, len(self.rules)):
+            lhs = self.lhs[rule_no]
+            lookaheads = self.first_of(self.rules[rule_no])
+            if EPSILON in lookaheads:
+                lookaheads = (lookaheads - {EPSILON}) | self.follow[lhs]
+            for terminal in sorted(lookaheads):
+                cells[lhs].setdefault(terminal, []).append(rule_no)
+
+        for non_terminal in self.non_terminals:
+            row = self.parse_table[non_terminal] = dict()
+            for terminal, rule_nos in cells[non_terminal].items():
+                row[terminal] = rule_nos[0]
+                if len(rule_nos) > 1:
+                    self.conflicts.append(GrammarConflict(non_terminal, terminal, rule_nos))
+            for terminal in self.follow[non_terminal]:
+                row.setdefault(terminal, SYNC)
+
+    def _encode(self) -> None:
+        """interns grammar symbols to small integers and flattens the parse table into an array.
+
+        Ids of terminals (starting with the end sign) come first, then non-terminals and then actions, 
+        so the kind of a symbol is known by comparing its id with `n_terminals` and `first_action`.
+        The table has a row per non-terminal and a column per terminal, plus a last column of errors 
+        for tokens out of the grammar.
+        """
+
+        self.symbols: List[str] = [EOF] + self.terminals + self.non_terminals
+        """ maps id of a grammar symbol to its name """
+
+        self.n_terminals: int = len(self.terminals) + 1
+        self.first_action: int = len(self.symbols)
+        self.symbols += dict.fromkeys(symbol for rhs in self.rules for symbol in rhs if symbol.startswith("#"))
+
+        self.symbol_ids: Dict[str, int] = {symbol: ix for ix, symbol in enumerate(self.symbols)}
+
+        self.encoded_rules: List[Tuple[int, ...]] = [tuple(self.symbol_ids[symbol] for symbol in reversed(rhs)) 
+                for rhs in self.rules]
+        """ ids of rhs of all rules, reversed to be pushed into the parser stack """
+
+        self.n_columns: int = self.n_terminals + 1
+        self.table: array = array('h', [ERROR_CELL] * (len(self.non_terminals) * self.n_columns))
+        """ encoded parse table, where the cell of non-terminal X and terminal t is at 
+        `(X - n_terminals) * n_columns + t`, holding a rule number, `SYNC_CELL` or `ERROR_CELL` """
+
+        for non_terminal, row in self.parse_table.items():
+            offset = (self.symbol_ids[non_terminal] - self.n_terminals) * self.n_columns
+            for terminal, rule_no in row.items():
+                self.table[offset + self.symbol_ids[terminal]] = SYNC_CELL if rule_no == SYNC else rule_no
+
+
+def _generator_digest() -> bytes:
+    """digest of this module, so grammars cached by an older generator are not used"""
+
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def load_grammar(grammar_addr: str, cache_dir: Optional[str] = None) -> Grammar:
+    """loads the grammar of a file, from the cache if the same file content is already processed
+    by the same generator
+
+    Args:
+        grammar_addr (str): directory of text file containing all rules of the language
+        cache_dir (Optional[str]): directory of cached grammars. If None, `__pycache__` next to the grammar file is used
+    """
+
+    with open(grammar_addr, 'rb') as f:
+        content = f.read()
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(grammar_addr)), "__pycache__")
+    key = hashlib.sha256(_generator_digest() + content).hexdigest()
+    cache_addr = os.path.join(cache_dir, f"grammar-{key}.json")
+
+    try:
+        with open(cache_addr, 'rb') as f:
+            return Grammar.from_data(json.load(f))
+    except Exception:
+        pass # missing or unreadable, so it is generated again
+
+    grammar = Grammar(content.decode())
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # renamed once complete, since other compilers may load it meanwhile
+        fd, tmp_addr = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(grammar.to_data(), f)
+            os.replace(tmp_addr, cache_addr)
+        except BaseException:
+            os.unlink(tmp_addr)
+            raise
+    except OSError:
+        pass # e.g. a read-only directory, where the grammar is generated every time
+    return grammar
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="prints FIRST and FOLLOW sets and conflicts of an LL(1) grammar")
+    arg_parser.add_argument("grammar", nargs="?", default="grammar_v2.txt")
+    args = arg_parser.parse_args()
+
+    grammar = Grammar(open(args.grammar).read())
+    for non_terminal in grammar.non_terminals:
+        print(f"{non_terminal}\n\tFIRST: {' '.join(sorted(grammar.first[non_terminal]))}"
+              f"\n\tFOLLOW: {' '.join(sorted(grammar.follow[non_terminal]))}")
+    if grammar.conflicts:
+        print("\nconflicts:")
+        for conflict in grammar.conflicts:
+            print(f"\t{conflict.all_in_one}")
+    else:
+        print("\nthe grammar is LL(1)")
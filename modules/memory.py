@@ -1,53 +1,171 @@
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple
 from enums.addressing import AddressType
 from data_class.addressing_mode import AddressingMode
+from data_class.instruction import Instruction
 from enums.command import Command
+from utils.sinks import ArtifactSink
 
-from utils.patterns.singleton import Singleton
+_TMP_BASE = 1 << 40
+""" address of the first temporary while compiling, far beyond any data (NOTE: moved to its final place at emit time) """
 
 
-class Memory(metaclass=Singleton):
-    """ Runtime memory """
+class Memory:
+    """ Runtime memory, made of program, data and temporary segments which grow independently.
 
-    def __init__(self, unit: int=4, prog_size: int = 100, data_size: int = 400, capacity=1000) -> None:
-        
+    Sizes are only where segments start by default. Data addresses are final as soon as they are given out,
+    since they may be used as `#NUM`s, but temporaries are placed right after the data at emit time
+    if the data outgrows its size. If any segment grows beyond its size, the layout is saved in `memory_layout.txt`.
+
+    Args:
+        unit (int): size of a word
+        prog_size (int): number of words reserved for the program block, where the data starts
+        data_size (int): number of words reserved for the data, after which temporaries are placed
+        artifacts (Optional[ArtifactSink]): where the generated code is saved. If None, it is saved in the current directory
+    """
+
+    def __init__(self, unit: int=4, prog_size: int = 100, data_size: int = 400, 
+            artifacts: Optional[ArtifactSink] = None) -> None:
+
+        self.artifacts: ArtifactSink = artifacts if artifacts is not None else ArtifactSink()
         self.start_prog_p: int = 0
         self._start_data_p: int = prog_size
-        self.start_tmp_p: int = prog_size + data_size
-        self._capacity: int = capacity
+        self._final_tmp_p: int = prog_size + data_size
+        """ address of the first temporary in the emitted code, if the data fits in its size """
+
+        self.start_tmp_p: int = _TMP_BASE
+        """ address of the first temporary while compiling """
+
         self.unit: int = unit
         self.pow_idx: int = 0
-        self.prog_p: int = self.start_prog_p
-        r""" program block pointer (NOTE: first one is reserved for jumping into `main()`) """
 
-        self.data_p: int = self._start_data_p
-        """ data block pointer """
-        
+        self._program: List[Optional[Instruction]] = list()
+        """ program block codes, where reserved rows not filled yet are None """
+
+        self.patches: List[int] = list()
+        """ indices of rows written after they were reserved, in order """
+
+        self._data_p: int = self._start_data_p
+        self._data_end: int = self._start_data_p
+        """ highest data pointer so far (NOTE: data pointer goes back when overloaded functions are dropped) """
+
         self._tmp_p: int = self.start_tmp_p
         """ temporary block pointer """
 
-        self._space: List[Union[str, int, None]] = None
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # codes are records which are never changed, so they are copied without being serialized
+        del state['_program'], state['patches'], state['artifacts']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._program, self.patches = list(), list()
 
     def __enter__(self) -> 'Memory':
-        self._create_empty_space()
         return self
-    
-    def _create_empty_space(self) -> None:
-        self._space = [None] * self._capacity
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         self._write_commands()
-        self._reset_space()
-    
+        self._write_layout()
+
     def _write_commands(self):
-        
-        with open('output.txt', 'w') as f:   
-            for i, command in enumerate(self._space[:self.prog_p]):
-                f.write(f"{i}\t{command}\n")
+        if self.artifacts.enabled('output.txt'):
+            # rows never filled are written as `None`
+            self.artifacts.put('output.txt', [f"{i}\t{command}\n" for i, command in enumerate(self.emit())])
 
-    def _reset_space(self):
-        for i in range(self._capacity):
-            self._space[i] = None
+    def _write_layout(self):
+        """saves where every segment is placed, followed by segments grown beyond their sizes, if there is any"""
+
+        if not self.artifacts.enabled('memory_layout.txt'):
+            return
+        overflows = self.overflows()
+        if not overflows:
+            # the report of an earlier compilation is no longer true
+            self.artifacts.remove('memory_layout.txt')
+        else:
+            self.artifacts.put('memory_layout.txt', [f"{segment}\t{start}\t{end}\n" for segment, start, end in self.segments()]
+                    + [f"overflow: {overflow}\n" for overflow in overflows])
+
+    @property
+    def prog_p(self) -> int:
+        r""" program block pointer (NOTE: moving it forward reserves empty rows) """
+        return self.start_prog_p + len(self._program)
+
+    @prog_p.setter
+    def prog_p(self, value: int) -> None:
+        size = value - self.start_prog_p
+        if size > len(self._program):
+            self._program.extend([None] * (size - len(self._program)))
+        else:
+            del self._program[size:]
+
+    @property
+    def data_p(self) -> int:
+        """ data block pointer """
+        return self._data_p
+
+    @data_p.setter
+    def data_p(self, value: int) -> None:
+        self._data_p = value
+        self._data_end = max(self._data_end, value)
+
+    @property
+    def program_block(self) -> List[Optional[Instruction]]:
+        """ codes of the program block generated so far, where temporaries are not in their final place yet """
+        return list(self._program)
+
+    @program_block.setter
+    def program_block(self, instructions: List[Optional[Instruction]]) -> None:
+        """ replaces the whole program block, e.g. by an optimized one """
+        self._program = list(instructions)
+
+    def _tmp_offset(self) -> int:
+        """ distance which temporaries are moved by at emit time """
+        final_tmp_p = max(self._final_tmp_p, self._data_end)
+        return final_tmp_p - self.start_tmp_p
+
+    def emit(self) -> List[Optional[Instruction]]:
+        """ program block with final addresses of temporaries (NOTE: codes without temporaries are kept as they are) """
+
+        offset, tmp_start, num = self._tmp_offset(), self.start_tmp_p, AddressType.NUM
+        emitted = list()
+        for code in self._program:
+            # code indices and data addresses are all below temporaries
+            if code is not None and any(operand is not None and operand[0] != num and int(operand[1]) >= tmp_start
+                    for operand in (code.first, code.second, code.third)):
+                code = Instruction(code.command, *(operand if operand is None or operand[0] == num or int(operand[1]) < tmp_start
+                        else (operand[0], int(operand[1]) + offset) for operand in (code.first, code.second, code.third)))
+            emitted.append(code)
+        return emitted
+
+    def segments(self) -> List[Tuple[str, int, int]]:
+        """ (name, first address, address after the last word) of every segment, as emitted """
+
+        # temporaries may have been packed after they were given out
+        tmp_end = self.start_tmp_p
+        for code in self._program:
+            if code is not None:
+                for operand in (code.first, code.second, code.third):
+                    if operand is not None and operand[0] != AddressType.NUM and int(operand[1]) >= tmp_end:
+                        tmp_end = int(operand[1]) + self.unit
+        offset = self._tmp_offset()
+        return [
+            ("program", self.start_prog_p, self.prog_p),
+            ("data", self._start_data_p, self._data_end),
+            ("temporaries", self.start_tmp_p + offset, tmp_end + offset),
+        ]
+
+    def overflows(self) -> List[str]:
+        """ segments grown beyond their sizes """
+
+        overflows = list()
+        if self.prog_p > self._start_data_p:
+            overflows.append(f"program block has {self.prog_p - self.start_prog_p} codes, "
+                    f"beyond {self._start_data_p - self.start_prog_p} words before the data")
+        if self._data_end > self._final_tmp_p:
+            overflows.append(f"data ends at {self._data_end}, beyond {self._final_tmp_p}, "
+                    f"so temporaries are moved to start from {self._data_end}")
+        return overflows
 
     def set_new_command(self, addressing: AddressingMode, idx: Optional[int] = None) -> None:
         if addressing.command == Command.JP and addressing.first.type == AddressType.NUM:
@@ -55,10 +173,10 @@ class Memory(metaclass=Singleton):
         elif addressing.command == Command.JPF and addressing.second.type == AddressType.NUM:
             addressing.second.type = AddressType.DIRECT
         if idx is not None:
-            self._space[idx] = addressing.three_mode
+            self._program[idx - self.start_prog_p] = Instruction.from_addressing(addressing)
+            self.patches.append(idx)
         else:
-            self._space[self.prog_p] = addressing.three_mode
-            self.prog_p += 1
+            self._program.append(Instruction.from_addressing(addressing))
 
     def get_new_data_addr(self) -> int:
         p = self.data_p
@@ -68,4 +186,4 @@ class Memory(metaclass=Singleton):
     def get_new_tmp(self) -> int:
         p = self._tmp_p
         self._tmp_p += self.unit
-        return p
\ No newline at end of file
+        return p
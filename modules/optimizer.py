@@ -0,0 +1,297 @@
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from data_class.instruction import Instruction, Operand
+from enums.addressing import AddressType
+from enums.command import Command
+from modules.flow import dest_pos, label_pos
+
+_ARITHMETIC = {
+    Command.ADD: lambda a, b: a + b,
+    Command.SUB: lambda a, b: a - b,
+    Command.MULT: lambda a, b: a * b,
+    Command.EQ: lambda a, b: int(a == b),
+    Command.LT: lambda a, b: int(a < b),
+}
+""" commands computing their third operand from the first two """
+
+
+def _number(value: Union[int, str]) -> Optional[Union[int, float]]:
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+
+class PeepholeOptimizer:
+    """optimizes the program block in place of the code generator output.
+
+    Passes are repeated until nothing changes:
+        - constant folding of commands whose operands are all `#NUM`, including `JPF` on a constant
+        - copy propagation of `ASSIGN`s into temporaries, whose single use is in the same basic block
+        - coalescing of a temporary result and the `ASSIGN` right after it which copies it out
+        - jump threading of jumps to jumps, and removing jumps to the next code
+        - removing codes which are unreachable from the first one
+    
+    Removed codes are dropped from the block and jump targets are fixed up, including return addresses, 
+    i.e. `#NUM`s assigned to a word that some `JP @word` jumps through.
+
+    Args:
+        tmp_start (int): address of the first temporary. Only temporaries are assumed to be dead after their uses
+    """
+    def __init__(self, tmp_start: int) -> None:
+        self._tmp_start: int = tmp_start
+        self._code: List[Optional[list]] = list()
+        """ codes as mutable `[command, first, second, third]`, where removed ones are None """
+
+        self.origin: List[int] = list()
+        """ index of every code of the last optimized block in the block it was optimized from """
+
+    def optimize(self, instructions: List[Optional[Instruction]]) -> List[Optional[Instruction]]:
+        """optimized version of a program block (NOTE: a block with unfilled rows is returned unchanged)"""
+
+        if any(instruction is None for instruction in instructions):
+            self.origin = list(range(len(instructions)))
+            return instructions
+
+        self.origin = list(range(len(instructions)))
+        self._code = [[ins.command, ins.first, ins.second, ins.third] for ins in instructions]
+        changed = True
+        while changed:
+            changed = False
+            for optimization in [self._fold_constants, self._propagate_copies, self._coalesce_results, 
+                    self._thread_jumps, self._remove_unreachable]:
+                if optimization():
+                    self._compact()
+                    changed = True
+
+        return [Instruction(*code) for code in self._code]
+
+    # ---------------- analysis ----------------
+
+    def _is_tmp(self, operand: Operand) -> bool:
+        return operand is not None and operand[0] != AddressType.NUM and int(operand[1]) >= self._tmp_start
+
+    def _jump_words(self) -> Set[str]:
+        """words of memory which some indirect jump goes through"""
+
+        return {str(code[1][1]) for code in self._code 
+                if code is not None and code[0] == Command.JP and code[1][0] == AddressType.INDIRECT}
+
+    def _label_refs(self) -> List[Tuple[int, int]]:
+        """(index, operand position) of every operand holding a code index"""
+
+        jump_words = self._jump_words()
+        refs = list()
+        for i, code in enumerate(self._code):
+            if code is None:
+                continue
+            command = code[0]
+            if command == Command.JP and code[1][0] != AddressType.INDIRECT:
+                refs.append((i, 1))
+            elif command == Command.JPF and code[2][0] != AddressType.INDIRECT:
+                refs.append((i, 2))
+            elif command == Command.ASSIGN and code[1][0] == AddressType.NUM and code[2][0] == AddressType.DIRECT \
+                    and str(code[2][1]) in jump_words:
+                refs.append((i, 1))
+        return refs
+
+    def _leaders(self) -> Set[int]:
+        """first codes of basic blocks"""
+
+        leaders = {0}
+        for i, pos in self._label_refs():
+            leaders.add(int(self._code[i][pos][1]))
+        for i, code in enumerate(self._code):
+            if code is not None and code[0] in [Command.JP, Command.JPF]:
+                leaders.add(i + 1)
+        return leaders
+
+    def _tmp_counts(self) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """static number of writes and reads of every temporary"""
+
+        defs: Dict[int, int] = dict()
+        uses: Dict[int, int] = dict()
+        for code in self._code:
+            if code is None:
+                continue
+            dest, label = dest_pos(code[0]), label_pos(code[0])
+            for pos in range(1, 4):
+                operand = code[pos]
+                if not self._is_tmp(operand) or (pos == label and operand[0] == AddressType.DIRECT):
+                    continue
+                counts = defs if pos == dest and operand[0] == AddressType.DIRECT else uses
+                counts[int(operand[1])] = counts.get(int(operand[1]), 0) + 1
+        return defs, uses
+
+    def _writes(self, code: list, operand: Operand) -> bool:
+        """whether a code may change the value of an operand"""
+
+        dest = dest_pos(code[0])
+        if dest is None or operand[0] == AddressType.NUM:
+            return False
+        written = code[dest]
+        # an indirect write may hit any word
+        return written[0] == AddressType.INDIRECT or int(written[1]) == int(operand[1])
+
+    # ---------------- passes ----------------
+
+    def _fold_constants(self) -> bool:
+        changed = False
+        for i, code in enumerate(self._code):
+            if code is None:
+                continue
+            command = code[0]
+            if command in _ARITHMETIC and code[1][0] == code[2][0] == AddressType.NUM:
+                a, b = _number(code[1][1]), _number(code[2][1])
+                if a is not None and b is not None:
+                    self._code[i] = [Command.ASSIGN, (AddressType.NUM, _ARITHMETIC[command](a, b)), code[3], None]
+                    changed = True
+            elif command == Command.JPF and code[1][0] == AddressType.NUM and _number(code[1][1]) is not None:
+                # never jumps or always jumps
+                self._code[i] = None if _number(code[1][1]) else [Command.JP, code[2], None, None]
+                changed = True
+        return changed
+
+    def _propagate_copies(self) -> bool:
+        """`ASSIGN s, t` ... `(OP t, ...)` becomes `(OP s, ...)`"""
+
+        defs, uses = self._tmp_counts()
+        leaders = self._leaders()
+        changed = False
+        for i, code in enumerate(self._code):
+            if code is None or code[0] != Command.ASSIGN or code[1][0] == AddressType.INDIRECT \
+                    or code[2][0] != AddressType.DIRECT or not self._is_tmp(code[2]):
+                continue
+            src, tmp = code[1], int(code[2][1])
+            if defs.get(tmp) != 1 or uses.get(tmp) != 1:
+                continue
+
+            for j in range(i + 1, len(self._code)):
+                user = self._code[j]
+                if j in leaders or user is None:
+                    break
+                if self._replace_use(user, tmp, src):
+                    self._code[i] = None
+                    changed = True
+                    break
+                if self._writes(user, src):
+                    break
+        return changed
+
+    def _replace_use(self, code: list, tmp: int, src: Operand) -> bool:
+        """replaces the read of a temporary by the operand it is copied from, if it is expressible"""
+
+        if code[0] == Command.JP:
+            return False
+        dest, label = dest_pos(code[0]), label_pos(code[0])
+        for pos in range(1, 4):
+            operand = code[pos]
+            if operand is None or operand[0] == AddressType.NUM or pos == label or int(operand[1]) != tmp:
+                continue
+            if operand[0] == AddressType.DIRECT:
+                if pos == dest:
+                    return False
+                code[pos] = src
+                return True
+            # @t refers to the word whose address is in t
+            if src[0] == AddressType.NUM and _number(src[1]) is not None:
+                code[pos] = (AddressType.DIRECT, int(_number(src[1])))
+                return True
+            if src[0] == AddressType.DIRECT:
+                code[pos] = (AddressType.INDIRECT, src[1])
+                return True
+            return False
+        return False
+
+    def _coalesce_results(self) -> bool:
+        """`(OP a, b, t)` `ASSIGN t, x` becomes `(OP a, b, x)`"""
+
+        defs, uses = self._tmp_counts()
+        leaders = self._leaders()
+        changed = False
+        for i in range(len(self._code) - 1):
+            code, next_code = self._code[i], self._code[i + 1]
+            if code is None or next_code is None or i + 1 in leaders:
+                continue
+            dest = dest_pos(code[0])
+            if dest is None or code[dest][0] != AddressType.DIRECT or not self._is_tmp(code[dest]):
+                continue
+            tmp = int(code[dest][1])
+            if defs.get(tmp) != 1 or uses.get(tmp) != 1:
+                continue
+            if next_code[0] == Command.ASSIGN and next_code[1] == code[dest] and next_code[2][0] != AddressType.NUM:
+                code[dest] = next_code[2]
+                self._code[i + 1] = None
+                changed = True
+        return changed
+
+    def _thread_jumps(self) -> bool:
+        changed = False
+        n = len(self._code)
+        for i, code in enumerate(self._code):
+            if code is None or code[0] not in [Command.JP, Command.JPF]:
+                continue
+            pos = 1 if code[0] == Command.JP else 2
+            if code[pos][0] == AddressType.INDIRECT:
+                continue
+
+            target, seen = int(code[pos][1]), {i}
+            while target < n and target not in seen and self._code[target] is not None \
+                    and self._code[target][0] == Command.JP and self._code[target][1][0] != AddressType.INDIRECT:
+                seen.add(target)
+                target = int(self._code[target][1][1])
+            if target != int(code[pos][1]):
+                code[pos] = (code[pos][0], target)
+                changed = True
+            if target == i + 1:
+                self._code[i] = None
+                changed = True
+        return changed
+
+    def _remove_unreachable(self) -> bool:
+        n = len(self._code)
+        label_targets = [int(self._code[i][pos][1]) for i, pos in self._label_refs() if self._code[i][0] == Command.ASSIGN]
+        reached = [False] * n
+        todo = [0]
+        while todo:
+            i = todo.pop()
+            if i >= n or reached[i]:
+                continue
+            reached[i] = True
+            command, first, second = self._code[i][:3]
+            if command == Command.JP:
+                # returns may go back to any return address
+                todo.extend(label_targets if first[0] == AddressType.INDIRECT else [int(first[1])])
+                continue
+            if command == Command.JPF:
+                todo.extend(label_targets if second[0] == AddressType.INDIRECT else [int(second[1])])
+            todo.append(i + 1)
+
+        changed = False
+        for i in range(n):
+            if not reached[i]:
+                self._code[i] = None
+                changed = True
+        return changed
+
+    def _compact(self) -> None:
+        """drops removed codes and fixes up code indices, where a removed code is replaced by the next kept one"""
+
+        refs = [(i, pos) for i, pos in self._label_refs() if self._code[i] is not None]
+        new_index: List[int] = list()
+        kept = 0
+        for code in self._code:
+            new_index.append(kept)
+            if code is not None:
+                kept += 1
+        new_index.append(kept) # jumping past the end halts
+
+        for i, pos in refs:
+            operand = self._code[i][pos]
+            target = int(operand[1])
+            self._code[i][pos] = (operand[0], new_index[target] if target < len(new_index) else kept)
+        self.origin = [origin for origin, code in zip(self.origin, self._code) if code is not None]
+        self._code = [code for code in self._code if code is not None]
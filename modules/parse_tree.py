@@ -0,0 +1,149 @@
+import tempfile
+from typing import List, Optional, TextIO
+
+from data_class.parse_node import ALIVE, DEAD, PENDING, ParseNode
+from utils.sinks import ArtifactSink
+
+_VERTICAL = "│   "
+_EMPTY = "    "
+_CONT = "├── "
+_END = "└── "
+
+_HEAD_LINE = "0"
+_BODY_LINE = "1"
+
+
+class ParseTreeWriter:
+    """writes the parse tree while it is being derived, in the same format as `anytree.RenderTree`
+
+    Lines are written in pre-order. A node is written once it is derived and it is known whether it is
+    the last kept child of its parent, i.e. once one of its later siblings is kept or all of them are dropped.
+    So each subtree is written as soon as its derivation is finished and its written nodes are released.
+
+    Children of the root are the only exception, since whether the last one is kept is known only at the end 
+    of parsing. So lines are written into a temporary file without the root level indentation and copied into 
+    the tree file when the writer is closed.
+
+    Args:
+        artifacts (ArtifactSink): where the parse tree is saved
+        root (ParseNode): root of the parse tree, whose children are the already existing ones
+    """
+    def __init__(self, artifacts: ArtifactSink, root: ParseNode) -> None:
+        self._artifacts: ArtifactSink = artifacts
+        self._root: ParseNode = root
+        self._body: TextIO = tempfile.TemporaryFile("w+")
+        """ lines below the root, each one marked as head of a root child or a body line """
+
+        self._path: List[list] = list()
+        """ [node, index of its next child to write, prefix of its children lines] from the root to the current node """
+
+    def __enter__(self) -> 'ParseTreeWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        # closing the buffer again does nothing
+        self._body.close()
+
+    def expand(self, node: ParseNode, rhs: List[str]) -> List[ParseNode]:
+        """derives a node by a rule and returns its new children in order"""
+
+        children = [ParseNode(r) for r in rhs]
+        # the root already has the end sign as its last child
+        node.children = children + (node.children or [])
+        self.keep(node)
+        return children
+
+    def keep(self, node: ParseNode, name: Optional[str] = None) -> None:
+        """marks a node as derived and kept in the tree, possibly with a new name"""
+
+        if name is not None:
+            node.name = name
+        node.state = ALIVE
+
+        if node is self._root:
+            self._path.append([node, 0, ""])
+        self._advance()
+
+    def drop(self, node: ParseNode) -> None:
+        """removes a node from the tree"""
+
+        node.state = DEAD
+        self._advance()
+
+    @staticmethod
+    def _is_last(siblings: List[Optional[ParseNode]], idx: int) -> Optional[bool]:
+        """whether the child at `idx` is the last kept one, or None if it is not known yet"""
+
+        for sibling in siblings[idx + 1:]:
+            if sibling.state == ALIVE:
+                return False
+            if sibling.state == PENDING:
+                return None
+        return True
+
+    def _advance(self) -> None:
+        """writes lines of the nodes which have become ready, in pre-order"""
+
+        path = self._path
+        while path:
+            frame = path[-1]
+            parent, idx, prefix = frame
+            children = parent.children
+
+            if idx == len(children):
+                # release the whole written subtree (children of the root are needed until closing the writer)
+                if len(path) > 1:
+                    parent.children = None
+                path.pop()
+                continue
+
+            child = children[idx]
+            if child.state == PENDING:
+                return
+
+            is_root_child = len(path) == 1
+            if child.state == ALIVE:
+                is_last = None if is_root_child else self._is_last(children, idx)
+                if is_last is None and not is_root_child:
+                    return
+                
+                # skip symbol actions
+                if not child.name.startswith("#"):
+                    if is_root_child:
+                        self._body.write(f"{_HEAD_LINE}{child.name}\n")
+                    else:
+                        self._body.write(f"{_BODY_LINE}{prefix}{_END if is_last else _CONT}{child.name}\n")
+
+                if child.children:
+                    child_prefix = "" if is_root_child else prefix + (_EMPTY if is_last else _VERTICAL)
+                    path.append([child, 0, child_prefix])
+
+            if not is_root_child:
+                children[idx] = None
+            frame[1] = idx + 1
+
+    def close(self, remained: List[ParseNode]) -> None:
+        """drops the nodes remained in parser stack, writes what is left and the lines below the root"""
+
+        for node in remained:
+            node.state = DEAD
+
+        root_children = self._root.children
+        root_children_last = [self._is_last(root_children, i)
+            for i, child in enumerate(root_children) if child.state == ALIVE and not child.name.startswith("#")]
+        
+        self._advance()
+
+        self._body.seek(0)
+        root_children_last.reverse()
+        is_last = False
+        with self._artifacts.open('parse_tree.txt') as f:
+            f.write(f"{self._root.name}\n")
+            for line in self._body:
+                if line[0] == _HEAD_LINE:
+                    is_last = root_children_last.pop()
+                    f.write(_END if is_last else _CONT)
+                else:
+                    f.write(_EMPTY if is_last else _VERTICAL)
+                f.write(line[1:])
+        self._body.close()
@@ -0,0 +1,185 @@
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import TYPE_CHECKING, Callable, ContextManager, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from core.parser import Parser
+    from core.scanner import Scanner
+    from modules.context import CompilationContext
+
+
+class Profiler:
+    """records wall time and number of calls of phases of a compilation, as a tree of frames.
+
+    Hot methods are timed by wrapping them on their objects in `attach`, so nothing is changed
+    unless a profiler is attached. Each frame is named after a phase (e.g. `parse`), a hot method (e.g. `find_row`)
+    or a semantic action (e.g. `#PID`), and its own time is the time spent in it but not in its child frames.
+    """
+    def __init__(self) -> None:
+        self._stack: List[list] = list()
+        """ [name, start time, time of child frames] of the open frames, from the outermost one """
+
+        self.self_ns: Counter = Counter()
+        """ own time of every path of frames, like `compile;parse;scan` """
+
+        self.total_ns: Counter = Counter()
+        """ time of every frame name including its children, counted once if the frame is open inside itself """
+
+        self.calls: Counter = Counter()
+        """ number of times every frame is opened """
+
+        self.tokens: int = 0
+        """ number of tokens passed by the scanner """
+
+        self.probes: Counter = Counter()
+        """ number of symbol table lookups by the number of scopes searched """
+
+        self.commands: Counter = Counter()
+        """ number of codes written into the program block by their commands """
+
+    def _enter(self, name: str) -> None:
+        self._stack.append([name, time.perf_counter_ns(), 0])
+
+    def _exit(self) -> None:
+        now = time.perf_counter_ns()
+        name, start, children = self._stack.pop()
+        elapsed = now - start
+        path = ";".join([frame[0] for frame in self._stack] + [name])
+        self.self_ns[path] += elapsed - children
+        self.calls[name] += 1
+        if all(frame[0] != name for frame in self._stack):
+            self.total_ns[name] += elapsed
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    @contextmanager
+    def frame(self, name: str) -> Iterator[None]:
+        """times a block of code as a frame"""
+
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def wrap(self, func: Callable, name: str) -> Callable:
+        """function which is timed as a frame whenever it is called"""
+
+        @wraps(func)
+        def _timed(*args, **kwargs):
+            self._enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit()
+        return _timed
+
+    def attach(self, ctx: 'CompilationContext', scanner: 'Scanner', parser: 'Parser') -> None:
+        """times hot methods of a compilation, which is not started yet"""
+
+        parser.parse = self.wrap(parser.parse, "parse")
+
+        tokens = scanner.tokens
+
+        # the generator is timed rather than its helpers, so skipped whitespaces and comments are counted too
+        def _tokens(*args, **kwargs):
+            stream = tokens(*args, **kwargs)
+            while True:
+                self._enter("scan")
+                try:
+                    token = next(stream, None)
+                finally:
+                    self._exit()
+                if token is None:
+                    return
+                self.tokens += 1
+                yield token
+        scanner.tokens = _tokens
+
+        code_generator = parser.code_generator
+        code_generator.code_gen = self.wrap(code_generator.code_gen, "code_gen")
+        routines = code_generator._routines
+        for action, routine in routines.items():
+            routines[action] = self.wrap(routine, action)
+        code_generator.fill_first_and_last = self.wrap(code_generator.fill_first_and_last, "fill_first_and_last")
+
+        symbol_table = ctx.symbol_table
+        symbol_table.add_row = self.wrap(symbol_table.add_row, "add_row")
+        find_row = symbol_table.find_row
+        depth, probes = 0, 0
+
+        def _find_row(*args, **kwargs):
+            nonlocal depth, probes
+            if depth:
+                # searching a parent scope, as a part of the same lookup
+                probes += 1
+                return find_row(*args, **kwargs)
+            depth, probes = 1, 1
+            self._enter("find_row")
+            try:
+                return find_row(*args, **kwargs)
+            finally:
+                self._exit()
+                self.probes[probes] += 1
+                depth = 0
+        symbol_table.find_row = _find_row
+
+        memory = ctx.memory
+        set_new_command = self.wrap(memory.set_new_command, "set_new_command")
+
+        def _set_new_command(addressing, idx=None):
+            self.commands[addressing.command] += 1
+            set_new_command(addressing, idx)
+        memory.set_new_command = _set_new_command
+        memory._write_commands = self.wrap(memory._write_commands, "save")
+        memory._write_layout = self.wrap(memory._write_layout, "save")
+
+    def report(self) -> dict:
+        """what is recorded, with times in seconds"""
+
+        def _seconds(ns: int) -> float:
+            return round(ns / 1e9, 6)
+
+        own_ns: Counter = Counter()
+        for path, ns in self.self_ns.items():
+            own_ns[path.rsplit(";", 1)[-1]] += ns
+        frames = {name: dict(calls=self.calls[name], seconds=_seconds(self.total_ns[name]),
+                self_seconds=_seconds(own_ns[name])) for name in self.calls}
+        scan_seconds = self.total_ns["scan"] / 1e9
+        lookups = sum(self.probes.values())
+
+        return {
+            "seconds": _seconds(sum(self.self_ns.values())),
+            "phases": {name: frame for name, frame in frames.items() if not name.startswith("#")},
+            "actions": {name: frame for name, frame in sorted(frames.items()) if name.startswith("#")},
+            "scanner": dict(tokens=self.tokens, tokens_per_second=round(self.tokens / scan_seconds) if scan_seconds else None),
+            "symbol_table": dict(lookups=lookups,
+                    mean_probes=round(sum(n * count for n, count in self.probes.items()) / lookups, 3) if lookups else None,
+                    max_probes=max(self.probes, default=None),
+                    probes={str(n): self.probes[n] for n in sorted(self.probes)}),
+            "memory": dict(commands=sum(self.commands.values()),
+                    by_command={command: self.commands[command] for command in sorted(self.commands)}),
+        }
+
+    def save(self, json_addr: str, collapsed_addr: Optional[str] = None) -> None:
+        """saves the report as JSON, and own times of frames in microseconds as collapsed stacks,
+        which are read by flame graph tools
+
+        Args:
+            json_addr (str): path of the JSON file
+            collapsed_addr (Optional[str]): path of the collapsed stacks file. If None, it is not saved
+        """
+
+        with open(json_addr, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        if collapsed_addr is not None:
+            with open(collapsed_addr, 'w') as f:
+                f.writelines(f"{path} {ns // 1000}\n" for path, ns in sorted(self.self_ns.items()))
+
+
+def phase(profiler: Optional[Profiler], name: str) -> ContextManager:
+    """frame of a profiler, or nothing if there is no profiler"""
+    return profiler.frame(name) if profiler is not None else nullcontext()
@@ -2,7 +2,7 @@ from typing import Dict, List
 from data_class.addressing_mode import Arg
 from data_class.node import Node
 from enums.error import SemanticErrorType
-from utils.patterns.singleton import Singleton
+from utils.sinks import ArtifactSink
 
 _semantic_error_msg: Dict[SemanticErrorType, str] = {
     SemanticErrorType.SCOPING: "#{} : Semantic Error! '{}' is not defined appropriately.",
@@ -14,9 +14,10 @@ _semantic_error_msg: Dict[SemanticErrorType, str] = {
     SemanticErrorType.OVERLOADING: "#{} : Semantic Error! Function '{}' has already been defined with this number of arguments."
 }  
 
-class Semantic(metaclass=Singleton):
+class Semantic:
 
-    def __init__(self) -> None:
+    def __init__(self, artifacts: ArtifactSink) -> None:
+        self.artifacts: ArtifactSink = artifacts
         self.stack: List[Arg] = None
         self.errs: List[str] = None
         self.stack_recorder: List[int] = list()
@@ -30,17 +31,19 @@ class Semantic(metaclass=Singleton):
         self._start()
         return self
     
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['artifacts']
+        return state
+
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        with open('semantic_errors.txt', 'w') as f:
-            if not self.errs:
-                f.write('The input program is semantically correct.')
-            else:
-                errs = "\n".join(self.errs)
-                f.write(errs)
+        if not self.errs:
+            self.artifacts.put('semantic_errors.txt', 'The input program is semantically correct.')
+        else:
+            self.artifacts.put('semantic_errors.txt', "\n".join(self.errs))
 
-                # override output of code generator
-                with open('output.txt', 'w') as f2:
-                    f2.write('The output code has not been generated.')
+            # override output of code generator
+            self.artifacts.put('output.txt', 'The output code has not been generated.')
 
         self.errs.clear()
         self.stack.clear()
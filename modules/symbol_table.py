@@ -1,19 +1,47 @@
-from typing import List, Tuple, Dict, Optional, Union
+from bisect import insort
+from typing import FrozenSet, List, Set, Tuple, Dict, Optional, Union
 
 
 from core.scanner import TokenType
 from data_class.symbol_table import Attribute, FuncAttribute, ItmtAttribute, Row
 from modules.semantic import Semantic
-from utils.patterns.singleton import Singleton
 
         
-class SymbolTable(metaclass=Singleton):
+class SymbolTable:
     
-    def __init__(self, keywords: List[str]=list()) -> None:
+    def __init__(self, semantic: Semantic, keywords: List[str]=list()) -> None:
+        self._semantic: Semantic = semantic
         self.keywords = keywords
+        self.keyword_set: FrozenSet[str] = frozenset(keywords)
+        """ keywords for checking whether a lexeme is one of them """
+
         self.table: List[Row] = list()
         self.scope_boundary: Dict[int, Tuple[int, int]] = dict()
 
+        self._rows_idx: Dict[Tuple[str, int], List[int]] = dict()
+        """ maps a lexeme and a scope number to indices of its rows in ascending order """
+
+        self._funcs_idx: Dict[Optional[str], List[int]] = dict()
+        """ maps a lexeme to indices of its function rows in ascending order (`None` key holds all of them) """
+
+        self._row_pos: Dict[int, int] = dict()
+        """ maps id of a row to its index in the table """
+
+        self._seen: Dict[int, Set[str]] = dict()
+        """ maps a scope number to lexemes whose last row in it is not a function, so `add_row` skips them 
+        (NOTE: a lexeme is dropped whenever one of its rows in the scope is changed) """
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # ids of rows are not kept by copies, and seen lexemes depend on the order of insertions rather than the table
+        del state['_row_pos'], state['_seen']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._row_pos = {id(row): idx for idx, row in enumerate(self.table)}
+        self._seen = dict()
+
     def __enter__(self) -> 'SymbolTable':
         self._put_keywords_in_table()
         return self
@@ -22,28 +50,89 @@ class SymbolTable(metaclass=Singleton):
         self._reset()
         
     def _put_keywords_in_table(self) -> None:
-        self.table = [Row(lexeme, TokenType.KEYWORD, Attribute(Semantic().current_scope, None)) 
+        self.table = [Row(lexeme, TokenType.KEYWORD, Attribute(self._semantic.current_scope, None)) 
                 for lexeme in self.keywords]
-        self.scope_boundary[Semantic().current_scope] = (0, None)
+        self.scope_boundary[self._semantic.current_scope] = (0, None)
+        for i in range(len(self.table)):
+            self._index_row(i)
         
 
     def _reset(self) -> None:
         self.table.clear()
         self.scope_boundary.clear()
+        self._rows_idx.clear()
+        self._funcs_idx.clear()
+        self._row_pos.clear()
+        self._seen.clear()
+
+    def _index_row(self, idx: int) -> None:
+        row = self.table[idx]
+        insort(self._rows_idx.setdefault((row.lexeme, row.attribute.scope_no), []), idx)
+        if isinstance(row.attribute, FuncAttribute):
+            insort(self._funcs_idx.setdefault(row.lexeme, []), idx)
+            insort(self._funcs_idx.setdefault(None, []), idx)
+        self._row_pos[id(row)] = idx
+        seen = self._seen.get(row.attribute.scope_no)
+        if seen:
+            seen.discard(row.lexeme)
+
+    def _unindex_row(self, idx: int) -> None:
+        row = self.table[idx]
+        self._rows_idx[(row.lexeme, row.attribute.scope_no)].remove(idx)
+        if isinstance(row.attribute, FuncAttribute):
+            self._funcs_idx[row.lexeme].remove(idx)
+            self._funcs_idx[None].remove(idx)
+        del self._row_pos[id(row)]
+        seen = self._seen.get(row.attribute.scope_no)
+        if seen:
+            seen.discard(row.lexeme)
 
     def add_row(self, lexeme: str, token_type: TokenType) -> None:
+        scope_no = self._semantic.current_scope
+        seen = self._seen.get(scope_no)
+        if seen is None:
+            seen = self._seen[scope_no] = set()
+        elif lexeme in seen:
+            return
+
         recursive = True
-        if lexeme in self.keywords:
+        if lexeme in self.keyword_set:
             recursive = False
-        existed = self.find_row(lexeme, Semantic().current_scope, recursive=recursive)
+        existed = self.find_row(lexeme, scope_no, recursive=recursive)
 
         if existed is not None:
-            if not isinstance(existed.attribute, FuncAttribute) and existed.attribute.scope_no == Semantic().current_scope:
+            if not isinstance(existed.attribute, FuncAttribute) and existed.attribute.scope_no == scope_no:
+                seen.add(lexeme)
                 return
 
-        SymbolTable().table.append(
-            Row(lexeme, token_type, Attribute(Semantic().current_scope, None))
+        self.table.append(
+            Row(lexeme, token_type, Attribute(scope_no, None))
         )
+        self._index_row(len(self.table) - 1)
+        seen.add(lexeme)
+
+    def replace_row(self, idx: int, row: Row) -> None:
+        """ puts a new row in place of the row at index `idx` """
+
+        self._unindex_row(idx)
+        self.table[idx] = row
+        self._index_row(idx)
+
+    def set_attribute(self, row: Row, attribute: Union[Attribute, FuncAttribute, ItmtAttribute]) -> None:
+        """ replaces attribute of a row which is already in the table """
+
+        idx = self._row_pos[id(row)]
+        self._unindex_row(idx)
+        row.attribute = attribute
+        self._index_row(idx)
+
+    def set_scope(self, row: Row, scope_no: int) -> None:
+        """ moves a row which is already in the table into another scope """
+
+        idx = self._row_pos[id(row)]
+        self._unindex_row(idx)
+        row.attribute.scope_no = scope_no
+        self._index_row(idx)
 
     def find_row(self, lexeme: str, scope_no: int, force_mem_addr: bool = False, all: bool = False, recursive: bool=True) -> Optional[Row]:
         start, end = self.scope_boundary[scope_no]
@@ -51,9 +140,11 @@ class SymbolTable(metaclass=Singleton):
             end = len(self.table) - 1
 
         all_vals: List[Row] = []
-        for i in range(end, start - 1, -1):
-            if self.table[i].lexeme != lexeme or self.table[i].attribute.scope_no != scope_no:
+        for i in reversed(self._rows_idx.get((lexeme, scope_no), ())):
+            if i > end:
                 continue
+            if i < start:
+                break
             if force_mem_addr and self.table[i].attribute.mem_addr is None:
                 continue
 
@@ -67,7 +158,7 @@ class SymbolTable(metaclass=Singleton):
             return None
 
         if recursive:
-            return self.find_row(lexeme, Semantic().scope_tree[scope_no].father.scope_no, force_mem_addr)
+            return self.find_row(lexeme, self._semantic.scope_tree[scope_no].father.scope_no, force_mem_addr)
         else:
             return None if not all else all_vals
 
@@ -76,21 +167,22 @@ class SymbolTable(metaclass=Singleton):
         if end is None:
             end = len(self.table) - 1
         all_funcs: List[Row] = list()
-        for i in range(end, start - 1, -1):
-            if isinstance(self.table[i].attribute, FuncAttribute):
-                row = self.table[i]
-                if lexeme is not None and row.lexeme != lexeme:
-                    continue
+        for i in reversed(self._funcs_idx.get(lexeme, ())):
+            if i > end:
+                continue
+            if i < start:
+                break
 
-                if not all:
-                    return row
-                all_funcs.append(row)
+            row = self.table[i]
+            if not all:
+                return row
+            all_funcs.append(row)
 
         if len(all_funcs) == 0:
             try:
-                father_scope = Semantic().scope_tree[scope_no].father.scope_no
+                father_scope = self._semantic.scope_tree[scope_no].father.scope_no
                 return self.find_func_scope(father_scope, lexeme, all)
             except:
                 return all_funcs
         else:
-            return all_funcs
\ No newline at end of file
+            return all_funcs
@@ -0,0 +1,147 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from data_class.instruction import Instruction, Operand
+from enums.addressing import AddressType
+from modules.flow import dest_pos, label_pos, successors
+
+
+class TempAllocator:
+    """packs temporaries of a program block into the fewest slots, based on their liveness.
+
+    Code generator gives a new temporary to every intermediate result, which is never reused. Here, two
+    temporaries share a slot unless one of them is written while the other one is still live. Liveness
+    is found over the control flow of the whole block, including calls and returns, so a temporary
+    kept over a call never shares a slot with the ones of the callee.
+
+    Args:
+        tmp_start (int): address of the first temporary, where slots start from
+        unit (int): size of a temporary
+    """
+    def __init__(self, tmp_start: int, unit: int) -> None:
+        self._tmp_start: int = tmp_start
+        self._unit: int = unit
+
+        self.pressure: List[int] = list()
+        """ number of temporaries live while running every code of the last allocated block """
+
+        self.slots: int = 0
+        """ number of slots used by the last allocated block """
+
+    def _is_tmp(self, operand: Operand) -> bool:
+        return operand is not None and operand[0] != AddressType.NUM and int(operand[1]) >= self._tmp_start
+
+    def _uses_and_defs(self, code: Instruction) -> Tuple[List[int], List[int]]:
+        """temporaries read and written by a code (NOTE: `@t` reads `t`)"""
+
+        uses, defs = list(), list()
+        dest, label = dest_pos(code.command), label_pos(code.command)
+        for pos, operand in enumerate([code.first, code.second, code.third], start=1):
+            if not self._is_tmp(operand) or (pos == label and operand[0] == AddressType.DIRECT):
+                continue
+            if pos == dest and operand[0] == AddressType.DIRECT:
+                defs.append(int(operand[1]))
+            else:
+                uses.append(int(operand[1]))
+        return uses, defs
+
+    def allocate(self, instructions: List[Optional[Instruction]]) -> List[Optional[Instruction]]:
+        """program block whose temporaries are replaced by their slots
+        (NOTE: a block with unfilled rows is returned unchanged)"""
+
+        n = len(instructions)
+        self.pressure = [0] * n
+        self.slots = 0
+        if any(instruction is None for instruction in instructions):
+            return instructions
+
+        uses, defs = zip(*map(self._uses_and_defs, instructions)) if n else ((), ())
+        succs = successors(instructions)
+
+        # basic blocks, as [start, end) of code indices
+        leaders = {0}
+        for i, code in enumerate(instructions):
+            if len(succs[i]) != 1 or succs[i][0] != i + 1:
+                leaders.update(succs[i])
+                leaders.add(i + 1)
+        starts = sorted(leader for leader in leaders if leader < n)
+        block_of = dict(zip(starts, range(len(starts))))
+        bounds = list(zip(starts, starts[1:] + [n]))
+
+        # temporaries read before being written in a block, and the ones written in it
+        block_uses: List[Set[int]] = list()
+        block_defs: List[Set[int]] = list()
+        for start, end in bounds:
+            used, defined = set(), set()
+            for i in range(start, end):
+                used.update(t for t in uses[i] if t not in defined)
+                defined.update(defs[i])
+            block_uses.append(used)
+            block_defs.append(defined)
+
+        block_succs = [[block_of[s] for s in succs[end - 1] if s < n] for _, end in bounds]
+        preds: List[List[int]] = [list() for _ in bounds]
+        for b, next_blocks in enumerate(block_succs):
+            for s in next_blocks:
+                preds[s].append(b)
+
+        live_in: List[Set[int]] = [set(used) for used in block_uses]
+        live_out: List[Set[int]] = [set() for _ in bounds]
+        todo, queued = list(range(len(bounds))), [True] * len(bounds)
+        while todo:
+            b = todo.pop()
+            queued[b] = False
+            out = set().union(*(live_in[s] for s in block_succs[b]))
+            live_out[b] = out
+            new_in = block_uses[b] | (out - block_defs[b])
+            if new_in != live_in[b]:
+                live_in[b] = new_in
+                for p in preds[b]:
+                    if not queued[p]:
+                        queued[p] = True
+                        todo.append(p)
+
+        # a written temporary interferes with all the others live after the write
+        neighbors: Dict[int, Set[int]] = dict()
+        order: Dict[int, int] = dict()
+        for i in range(n):
+            for t in defs[i] + uses[i]:
+                order.setdefault(t, i)
+                neighbors.setdefault(t, set())
+        for b, (start, end) in enumerate(bounds):
+            live = set(live_out[b])
+            for i in range(end - 1, start - 1, -1):
+                self.pressure[i] = len(live.union(defs[i]))
+                for t in defs[i]:
+                    for u in live:
+                        if u != t:
+                            neighbors[t].add(u)
+                            neighbors[u].add(t)
+                live.difference_update(defs[i])
+                live.update(uses[i])
+
+        # greedy coloring in order of appearance
+        slot_of: Dict[int, int] = dict()
+        for t in sorted(order, key=order.get):
+            taken = {slot_of[u] for u in neighbors[t] if u in slot_of}
+            slot = 0
+            while slot in taken:
+                slot += 1
+            slot_of[t] = slot
+        self.slots = max(slot_of.values(), default=-1) + 1
+
+        def _packed(operand: Operand, pos: int, label: Optional[int]) -> Operand:
+            if not self._is_tmp(operand) or (pos == label and operand[0] == AddressType.DIRECT):
+                return operand
+            return (operand[0], self._tmp_start + slot_of[int(operand[1])] * self._unit)
+
+        packed = list()
+        for code in instructions:
+            label = label_pos(code.command)
+            packed.append(Instruction(code.command, _packed(code.first, 1, label),
+                    _packed(code.second, 2, label), _packed(code.third, 3, label)))
+        return packed
+
+    def peak(self, start: int, end: int) -> int:
+        """largest number of temporaries live at once while running codes of [start, end) of the last allocated block"""
+
+        return max(self.pressure[start:end], default=0)
@@ -0,0 +1,168 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from data_class.instruction import Instruction, Operand
+from enums.addressing import AddressType
+from enums.command import Command
+from modules.memory import Memory
+
+_OPCODES: Dict[str, int] = {command: opcode for opcode, command in enumerate([
+    Command.ASSIGN, Command.ADD, Command.SUB, Command.MULT, Command.EQ, Command.LT, Command.JPF, Command.JP, Command.PRINT,
+])}
+ASSIGN, ADD, SUB, MULT, EQ, LT, JPF, JP, PRINT = range(len(_OPCODES))
+
+NUM, DIRECT, INDIRECT = range(3)
+""" operand modes, respectively `#` (immediate), direct address and `@` (indirect address) """
+
+_MODES: Dict[str, int] = {AddressType.NUM: NUM, AddressType.INDIRECT: INDIRECT}
+
+DecodedInstruction = Tuple[int, int, int, int, int, int, int]
+""" opcode and (mode, value) of its three operands """
+
+
+def _number(value: Union[int, str]) -> Union[int, float]:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _parse_operand(operand: str) -> Operand:
+    operand = operand.strip()
+    if not operand:
+        return None
+    type = operand[0] if operand[0] in _MODES else AddressType.DIRECT
+    return type, operand[len(type):]
+
+
+def decode(command: Union[Instruction, str]) -> DecodedInstruction:
+    """decodes a three address code, given as a record or a text like `(ADD, 500, #4, @504)`"""
+
+    if isinstance(command, str):
+        name, *operands = command.strip()[1:-1].split(",")
+        if len(operands) != 3:
+            raise ValueError(f"invalid three address code: {command}")
+        command = Instruction(name.strip(), *map(_parse_operand, operands))
+
+    if command.command not in _OPCODES:
+        raise ValueError(f"invalid three address code: {command}")
+
+    decoded = [_OPCODES[command.command]]
+    for operand in (command.first, command.second, command.third):
+        decoded += [NUM, 0] if operand is None else [_MODES.get(operand[0], DIRECT), _number(operand[1])]
+    return tuple(decoded)
+
+
+class VirtualMachine:
+    """runs three address codes of the program block, decoded once into a compact instruction list.
+
+    Data memory is word addressed by the same addresses as the codes, where unset words are zero. 
+    Targets of jumps are program block indices, given directly or (`@`) through a word of memory. 
+    The program halts by jumping past its last code.
+
+    Args:
+        commands (Iterable[Union[Instruction, str]]): three address codes of the program block in order
+    """
+    def __init__(self, commands: Iterable[Union[Instruction, str]]) -> None:
+        self.program: List[DecodedInstruction] = list()
+        for i, command in enumerate(commands):
+            if command is None:
+                raise ValueError(f"program block row {i} is empty")
+            self.program.append(decode(command))
+
+        self.memory: Dict[int, int] = dict()
+        self.steps: int = 0
+        """ number of executed instructions """
+
+    @classmethod
+    def from_file(cls, output_addr: str) -> 'VirtualMachine':
+        """loads the program block from a file written by `Memory`, like `0\t(JP, 7, , )` per line"""
+
+        with open(output_addr) as f:
+            lines = [line for line in f if line.strip()]
+        if any("\t" not in line for line in lines):
+            raise ValueError(f"{output_addr} holds no program block")
+        return cls(line.split("\t", 1)[1] for line in lines)
+
+    @classmethod
+    def from_memory(cls, memory: Memory) -> 'VirtualMachine':
+        """loads the program block generated so far, as it is emitted"""
+
+        return cls(memory.emit())
+
+    def run(self, max_steps: Optional[int] = None) -> List[int]:
+        """executes the program from its first code until it halts
+
+        Args:
+            max_steps (Optional[int]): if given, an infinite loop is stopped after this number of instructions
+
+        Returns:
+            List[int]: printed values in order
+        """
+
+        program = self.program
+        n = len(program)
+        mem = self.memory
+        get = mem.get
+        printed: List[int] = list()
+        pc = 0
+        steps = 0
+        limit = -1 if max_steps is None else max_steps
+
+        while 0 <= pc < n:
+            if steps == limit:
+                self.steps = steps
+                raise RuntimeError(f"program did not halt after {max_steps} instructions")
+            steps += 1
+
+            op, m1, v1, m2, v2, m3, v3 = program[pc]
+            pc += 1
+
+            if op == JP:
+                pc = v1 if m1 != INDIRECT else get(v1, 0)
+                continue
+
+            a = v1 if m1 == NUM else get(v1, 0) if m1 == DIRECT else get(get(v1, 0), 0)
+
+            if op == JPF:
+                if not a:
+                    pc = v2 if m2 != INDIRECT else get(v2, 0)
+                continue
+            if op == PRINT:
+                printed.append(a)
+                continue
+
+            b = v2 if m2 == NUM else get(v2, 0) if m2 == DIRECT else get(get(v2, 0), 0)
+            if op == ASSIGN:
+                result, m3, v3 = a, m2, v2
+            elif op == ADD:
+                result = a + b
+            elif op == SUB:
+                result = a - b
+            elif op == MULT:
+                result = a * b
+            elif op == EQ:
+                result = int(a == b)
+            else:
+                result = int(a < b)
+
+            if m3 == DIRECT:
+                mem[v3] = result
+            elif m3 == INDIRECT:
+                mem[get(v3, 0)] = result
+            else:
+                raise ValueError(f"cannot write into an immediate operand at {pc - 1}")
+
+        self.steps = steps
+        return printed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="runs a compiled program and prints its outputs")
+    arg_parser.add_argument("output", nargs="?", default="output.txt", help="compiled program written by the compiler")
+    arg_parser.add_argument("--max-steps", type=int, default=None)
+    args = arg_parser.parse_args()
+
+    for value in VirtualMachine.from_file(args.output).run(args.max_steps):
+        print(f"PRINT\t{value}")
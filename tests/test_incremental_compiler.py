@@ -0,0 +1,72 @@
+""" outputs of the incremental compiler after an edit are the same as a fresh compilation of the edited program """
+from pathlib import Path
+from typing import Dict
+
+from compiler import compile_program
+from incremental_compiler import IncrementalCompiler
+
+GRAMMAR_ADDR = str(Path(__file__).resolve().parents[1] / "grammar_v2.txt")
+
+REST = """def twice(a):
+    b = a + a;
+    return b;
+;
+def count(n):
+    x = 0;
+    s = 0;
+    while (x < n)
+        x = x + 1;
+        s = s + x * 2;
+    ;
+    return s;
+;
+def main():
+    s = count(10);
+    print(s);
+    print(twice(s));
+;
+"""
+
+
+def _program(n_statements: int, step: int = 1) -> str:
+    """a function of some statements, followed by the rest of the program"""
+
+    statements = "".join(f"    a = a + {step * i};\n" for i in range(n_statements))
+    return f"def grow(a):\n{statements}    return a;\n;\n" + REST
+
+
+def _outputs(save_dir: Path) -> Dict[str, bytes]:
+    return {path.name: path.read_bytes() for path in save_dir.iterdir() if path.name != "input.txt"}
+
+
+def _compile_fresh(save_dir: Path, source: str) -> Dict[str, bytes]:
+    save_dir.mkdir()
+    input_addr = save_dir / "input.txt"
+    input_addr.write_text(source)
+    compile_program(str(input_addr), str(save_dir), GRAMMAR_ADDR, save_tree=False)
+    return _outputs(save_dir)
+
+
+def test_edit_one_function(tmp_path: Path) -> None:
+    save_dir = tmp_path / "incremental"
+    save_dir.mkdir()
+    compiler = IncrementalCompiler(str(save_dir), GRAMMAR_ADDR)
+    compiler.compile(_program(3))
+
+    edited = _program(3, step=2)
+    compiler.compile(edited)
+    assert compiler.stats["scanned"] == 1
+    assert _outputs(save_dir) == _compile_fresh(tmp_path / "fresh", edited)
+
+
+def test_overflow_report_follows_edits(tmp_path: Path) -> None:
+    """the memory layout is reported while the program block overflows, and not left behind once it fits"""
+
+    save_dir = tmp_path / "incremental"
+    save_dir.mkdir()
+    compiler = IncrementalCompiler(str(save_dir), GRAMMAR_ADDR)
+    for i, source in enumerate([_program(40), _program(1), _program(40)]):
+        compiler.compile(source)
+        fresh = _compile_fresh(tmp_path / f"fresh{i}", source)
+        assert ("memory_layout.txt" in fresh) == (i != 1)
+        assert _outputs(save_dir) == fresh
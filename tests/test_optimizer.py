@@ -0,0 +1,53 @@
+""" the optimizer and the temporary allocator change the generated code, but not what it prints """
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from compiler import compile_program
+from modules.vm import VirtualMachine
+
+GRAMMAR_ADDR = str(Path(__file__).resolve().parents[1] / "grammar_v2.txt")
+
+SAMPLE = """def twice(a):
+    b = a + a;
+    return b;
+;
+def main():
+    x = 0;
+    s = 0;
+    p = 1;
+    while (x < 10)
+        x = x + 1;
+        s = s + x * 2;
+        if x == 5:
+            p = p * s;
+        else:
+            p = p + 1;
+        ;
+    ;
+    print(s);
+    print(p);
+    print(twice(s));
+    t = s - p * 3 + x;
+    print(t);
+;
+"""
+
+
+def _run(save_dir: Path, **options) -> List[int]:
+    """compiles the sample with some options and runs it, returning what it prints"""
+
+    save_dir.mkdir()
+    input_addr = save_dir / "input.txt"
+    input_addr.write_text(SAMPLE)
+    compile_program(str(input_addr), str(save_dir), GRAMMAR_ADDR, save_tree=False, **options)
+    assert (save_dir / "semantic_errors.txt").read_text() == "The input program is semantically correct."
+    return VirtualMachine.from_file(str(save_dir / "output.txt")).run(max_steps=10 ** 6)
+
+
+@pytest.mark.parametrize("options", [dict(optimize=True), dict(pack_temps=True), dict(optimize=True, pack_temps=True)])
+def test_same_outputs(tmp_path: Path, options: dict) -> None:
+    printed = _run(tmp_path / "plain")
+    assert printed[:2] == [110, 155]
+    assert _run(tmp_path / "optimized", **options) == printed
@@ -1,96 +1,96 @@
-from typing import Literal, Optional
+from typing import TYPE_CHECKING, Literal, Optional
 
 from data_class.addressing_mode import AddressingMode, Arg
 from data_class.symbol_table import FuncAttribute, ItmtAttribute, Row
 from enums.addressing import AddressType
 from enums.command import Command
 from enums.error import SemanticErrorType
-from modules.semantic import Semantic
-from modules.memory import Memory
-from modules.symbol_table import SymbolTable
 from utils.constants import DEAD_FUNC, TOP
 
-def RECORD_STACK():
-    Semantic().stack_recorder.append(len(Semantic().stack))
+if TYPE_CHECKING:
+    from modules.context import CompilationContext
 
-def PRUNE_STACK():
-    recorder = Semantic().stack_recorder.pop()
-    while len(Semantic().stack) > recorder:
-        POP()
+def RECORD_STACK(ctx: 'CompilationContext'):
+    ctx.semantic.stack_recorder.append(len(ctx.semantic.stack))
 
-def APPEND_BREAK_PB():
-    row = SymbolTable().find_row('while', Semantic().current_scope, recursive=False)
+def PRUNE_STACK(ctx: 'CompilationContext'):
+    recorder = ctx.semantic.stack_recorder.pop()
+    while len(ctx.semantic.stack) > recorder:
+        POP(ctx)
+
+def APPEND_BREAK_PB(ctx: 'CompilationContext'):
+    row = ctx.symbol_table.find_row('while', ctx.semantic.current_scope, recursive=False)
     
     if row is not None and len(row.attribute.start_addr_in_PBs) > 0:
-        row.attribute.breaks_PB.append(Memory().prog_p)
-        SAVE()
-        POP()
+        row.attribute.breaks_PB.append(ctx.memory.prog_p)
+        SAVE(ctx)
+        POP(ctx)
     else:
-        Semantic().error_handler(SemanticErrorType.BREAK_STMT)
+        ctx.semantic.error_handler(SemanticErrorType.BREAK_STMT)
 
-def APPEND_CONT_PB():
-    row = SymbolTable().find_row('while', Semantic().current_scope, recursive=False)
+def APPEND_CONT_PB(ctx: 'CompilationContext'):
+    row = ctx.symbol_table.find_row('while', ctx.semantic.current_scope, recursive=False)
 
     if row is not None and len(row.attribute.start_addr_in_PBs) > 0:
-        row.attribute.continues_PB.append(Memory().prog_p)
-        SAVE()
-        POP()
+        row.attribute.continues_PB.append(ctx.memory.prog_p)
+        SAVE(ctx)
+        POP(ctx)
     else:
-        Semantic().error_handler(SemanticErrorType.CONT_STMT)
+        ctx.semantic.error_handler(SemanticErrorType.CONT_STMT)
 
-def SET_PT():
-    arg2 = Arg(AddressType.DIRECT, Memory().get_new_tmp())
-    Memory().set_new_command(
+def SET_PT(ctx: 'CompilationContext'):
+    arg2 = Arg(AddressType.DIRECT, ctx.memory.get_new_tmp())
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.ASSIGN,
-            Semantic().stack[TOP],
+            ctx.semantic.stack[TOP],
             arg2,
             None,
         )
     )
-    POP()
-    Semantic().stack.append(arg2)
-
-def MOVE_PT():
-    Semantic().stack.append(Arg(AddressType.NUM, Memory().unit))
-    MATH(Command.MULT)
-    MATH(Command.ADD)
-    arg = POP()
-    Semantic().stack.append(Arg(AddressType.INDIRECT, arg.val))
-
-def MATH(command: Literal[Command.ADD, Command.MULT, Command.SUB]):
-    arg = Arg(AddressType.DIRECT, Memory().get_new_tmp())
-    Memory().set_new_command(
+    POP(ctx)
+    ctx.semantic.stack.append(arg2)
+
+def MOVE_PT(ctx: 'CompilationContext'):
+    ctx.semantic.stack.append(Arg(AddressType.NUM, ctx.memory.unit))
+    MATH(ctx, Command.MULT)
+    MATH(ctx, Command.ADD)
+    arg = POP(ctx)
+    ctx.semantic.stack.append(Arg(AddressType.INDIRECT, arg.val))
+
+def MATH(ctx: 'CompilationContext', command: Literal[Command.ADD, Command.MULT, Command.SUB]):
+    arg = Arg(AddressType.DIRECT, ctx.memory.get_new_tmp())
+    ctx.memory.set_new_command(
         AddressingMode(
             command,
-            Semantic().stack[TOP-1],
-            Semantic().stack[TOP],
+            ctx.semantic.stack[TOP-1],
+            ctx.semantic.stack[TOP],
             arg
         )
     )
-    POP()
-    POP()
-    Semantic().stack.append(arg)
+    POP(ctx)
+    POP(ctx)
+    ctx.semantic.stack.append(arg)
 
-def CALL(lexeme: str):
+def CALL(ctx: 'CompilationContext', lexeme: str):
     # due to `PID` call
-    POP()
+    POP(ctx)
 
     nargs = Arg(AddressType.DIRECT, 0)
-    Semantic().stack.append(Arg(AddressType.DIRECT, lexeme))
-    Semantic().stack.append(nargs)
+    ctx.semantic.stack.append(Arg(AddressType.DIRECT, lexeme))
+    ctx.semantic.stack.append(nargs)
 
-def TAKE_ARG():
-    narg = POP(-2)
+def TAKE_ARG(ctx: 'CompilationContext'):
+    narg = POP(ctx, -2)
     narg.val = int(narg.val) + 1
-    Semantic().stack.append(narg)
+    ctx.semantic.stack.append(narg)
 
-def JP_FUNC():
-    narg = int(POP().comb)
-    args = [POP() for _ in range(narg)]
-    func_name = POP().comb
+def JP_FUNC(ctx: 'CompilationContext'):
+    narg = int(POP(ctx).comb)
+    args = [POP(ctx) for _ in range(narg)]
+    func_name = POP(ctx).comb
 
-    all_funcs = SymbolTable().find_func_scope(Semantic().current_scope, func_name, all=True)
+    all_funcs = ctx.symbol_table.find_func_scope(ctx.semantic.current_scope, func_name, all=True)
     target_func: Optional[Row] = None
 
     for func in all_funcs:
@@ -99,7 +99,7 @@ def JP_FUNC():
 
     if target_func is None:
         if len(all_funcs) == 0:
-            Semantic().stack.append(Arg(AddressType.DIRECT, 0))
+            ctx.semantic.stack.append(Arg(AddressType.DIRECT, 0))
             return
         else:
             target_func = all_funcs[0]
@@ -111,14 +111,14 @@ def JP_FUNC():
     mismatch_err: bool = len(target_func.attribute.args_addr) != narg
     
     if mismatch_err:
-        Semantic().error_handler(SemanticErrorType.MISMATCH_PARAM_FUNC, func_name)
+        ctx.semantic.error_handler(SemanticErrorType.MISMATCH_PARAM_FUNC, func_name)
 
-    if not target_func.attribute.have_returned_stmt and Semantic().no_op:
-        Semantic().error_handler(SemanticErrorType.TYPE_MISMATCH)
+    if not target_func.attribute.have_returned_stmt and ctx.semantic.no_op:
+        ctx.semantic.error_handler(SemanticErrorType.TYPE_MISMATCH)
     
     if not mismatch_err:
         for i, arg in enumerate(args[::-1]):
-            Memory().set_new_command(
+            ctx.memory.set_new_command(
                 AddressingMode(
                     Command.ASSIGN,
                     arg,
@@ -127,24 +127,24 @@ def JP_FUNC():
                 )
             )
 
-    Memory().set_new_command(
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.ASSIGN,
-            Arg(AddressType.NUM, Memory().prog_p + 2),
+            Arg(AddressType.NUM, ctx.memory.prog_p + 2),
             Arg(AddressType.DIRECT, target_func.attribute.jp_addr),
             None
         )
     )
 
-    Memory().set_new_command(
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.JP,
             Arg(AddressType.DIRECT, target_func.attribute.start_addr_in_PB),
             None,
             None))
 
-    arg = Arg(AddressType.DIRECT, Memory().get_new_tmp())
-    Memory().set_new_command(
+    arg = Arg(AddressType.DIRECT, ctx.memory.get_new_tmp())
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.ASSIGN,
             Arg(AddressType.DIRECT, target_func.attribute.ret_val_addr),
@@ -152,79 +152,79 @@ def JP_FUNC():
             None,
         )
     )
-    Semantic().stack.append(arg)
+    ctx.semantic.stack.append(arg)
 
 
-def ASSIGN():
-    Memory().set_new_command(
+def ASSIGN(ctx: 'CompilationContext'):
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.ASSIGN,
-            Semantic().stack[TOP],
-            Semantic().stack[TOP-1],
+            ctx.semantic.stack[TOP],
+            ctx.semantic.stack[TOP-1],
             None))
-    POP()
-    POP()
+    POP(ctx)
+    POP(ctx)
     
-def ASSIGN2():
-    Memory().set_new_command(
+def ASSIGN2(ctx: 'CompilationContext'):
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.ASSIGN,
-            Semantic().stack[TOP],
-            Semantic().stack[TOP-1],
+            ctx.semantic.stack[TOP],
+            ctx.semantic.stack[TOP-1],
             None))
-    POP()
+    POP(ctx)
 
-    arg = Semantic().stack[TOP]
-    POP()
+    arg = ctx.semantic.stack[TOP]
+    POP(ctx)
 
-    Semantic().stack.append(Arg(AddressType.DIRECT, Memory().get_new_data_addr()))
+    ctx.semantic.stack.append(Arg(AddressType.DIRECT, ctx.memory.get_new_data_addr()))
 
-def CREATE_P():
-    pointer_addr = Memory().get_new_data_addr()
+def CREATE_P(ctx: 'CompilationContext'):
+    pointer_addr = ctx.memory.get_new_data_addr()
     # reference in register
-    arg2 = Semantic().stack[TOP]
-    if arg2.val >= Memory().start_tmp_p:
-        Semantic().stack[TOP] = Arg(AddressType.INDIRECT, arg2.val)
+    arg2 = ctx.semantic.stack[TOP]
+    if arg2.val >= ctx.memory.start_tmp_p:
+        ctx.semantic.stack[TOP] = Arg(AddressType.INDIRECT, arg2.val)
     
-    Memory().set_new_command(
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.ASSIGN,
             Arg(AddressType.NUM, pointer_addr),
-            Semantic().stack[TOP],
+            ctx.semantic.stack[TOP],
             None
         )
     )
-    POP()
-    Semantic().stack.append(Arg(AddressType.DIRECT, pointer_addr))
+    POP(ctx)
+    ctx.semantic.stack.append(Arg(AddressType.DIRECT, pointer_addr))
 
-def POP(idx=None):
+def POP(ctx: 'CompilationContext', idx=None):
     if idx is None:
-        return Semantic().stack.pop()
+        return ctx.semantic.stack.pop()
     else:
-        return Semantic().stack.pop(idx)
+        return ctx.semantic.stack.pop(idx)
 
-def GIVE_BACK():
-    Memory().data_p -= Memory().unit
+def GIVE_BACK(ctx: 'CompilationContext'):
+    ctx.memory.data_p -= ctx.memory.unit
 
-def SET_RET_VAL(end_func: bool = False):
-    func_scope = Semantic().scope_tree[Semantic().current_scope].father.scope_no
-    row = SymbolTable().find_func_scope(func_scope)
+def SET_RET_VAL(ctx: 'CompilationContext', end_func: bool = False):
+    func_scope = ctx.semantic.scope_tree[ctx.semantic.current_scope].father.scope_no
+    row = ctx.symbol_table.find_func_scope(func_scope)
 
     if not end_func and row.lexeme != DEAD_FUNC:
         row.attribute.have_returned_stmt = True
     arg2 = Arg(AddressType.DIRECT, row.attribute.ret_val_addr)
-    Memory().set_new_command(
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.ASSIGN,
-            Semantic().stack[TOP],
+            ctx.semantic.stack[TOP],
             arg2,
             None
         )
     )
-    POP()
+    POP(ctx)
 
     arg2 = Arg(AddressType.INDIRECT, row.attribute.jp_addr)
-    Memory().set_new_command(
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.JP,
             arg2,
@@ -233,39 +233,39 @@ def SET_RET_VAL(end_func: bool = False):
         )
     )
 
-def SET_RET_VAL2():
-    Semantic().stack.append(Arg(AddressType.NUM, 0))
-    SET_RET_VAL()
+def SET_RET_VAL2(ctx: 'CompilationContext'):
+    ctx.semantic.stack.append(Arg(AddressType.NUM, 0))
+    SET_RET_VAL(ctx)
     
-def CHG_SCOPE(lexeme: int):
-    row = SymbolTable().find_row(lexeme, Semantic().current_scope)
+def CHG_SCOPE(ctx: 'CompilationContext', lexeme: int):
+    row = ctx.symbol_table.find_row(lexeme, ctx.semantic.current_scope)
     assert isinstance(row.attribute, FuncAttribute)
     
     # jump all functions at zero level to reach `main()` call
-    if Semantic().current_scope == 0:
-        SAVE()
+    if ctx.semantic.current_scope == 0:
+        SAVE(ctx)
 
-    row.attribute.start_addr_in_PB = Memory().prog_p
-    Semantic().create_new_scope()
-    SymbolTable().scope_boundary[Semantic().current_scope] = (len(SymbolTable().table), None)
+    row.attribute.start_addr_in_PB = ctx.memory.prog_p
+    ctx.semantic.create_new_scope()
+    ctx.symbol_table.scope_boundary[ctx.semantic.current_scope] = (len(ctx.symbol_table.table), None)
 
-    Semantic().stack.append(Arg(AddressType.DIRECT, Semantic().current_scope))
-    Semantic().stack.append(Arg(AddressType.DIRECT, Memory().data_p))
-    Semantic().stack.append(Arg(AddressType.DIRECT, len(SymbolTable().table) - 1))
+    ctx.semantic.stack.append(Arg(AddressType.DIRECT, ctx.semantic.current_scope))
+    ctx.semantic.stack.append(Arg(AddressType.DIRECT, ctx.memory.data_p))
+    ctx.semantic.stack.append(Arg(AddressType.DIRECT, len(ctx.symbol_table.table) - 1))
 
-    row.attribute.mem_addr = Memory().get_new_data_addr()
-    row.attribute.ret_val_addr = Memory().get_new_data_addr()
-    row.attribute.jp_addr = Memory().get_new_data_addr()
+    row.attribute.mem_addr = ctx.memory.get_new_data_addr()
+    row.attribute.ret_val_addr = ctx.memory.get_new_data_addr()
+    row.attribute.jp_addr = ctx.memory.get_new_data_addr()
 
-def END_FUNC():
+def END_FUNC(ctx: 'CompilationContext'):
     # always make sure having a return at the end
-    Semantic().stack.append(Arg(AddressType.NUM, 0))
-    SET_RET_VAL(end_func=True)
+    ctx.semantic.stack.append(Arg(AddressType.NUM, 0))
+    SET_RET_VAL(ctx, end_func=True)
     
-    func_scope = Semantic().scope_tree[Semantic().current_scope].father.scope_no
-    row = SymbolTable().find_func_scope(func_scope)
+    func_scope = ctx.semantic.scope_tree[ctx.semantic.current_scope].father.scope_no
+    row = ctx.symbol_table.find_func_scope(func_scope)
     arg2 = Arg(AddressType.INDIRECT, row.attribute.jp_addr)
-    Memory().set_new_command(
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.JP,
             arg2,
@@ -275,100 +275,100 @@ def END_FUNC():
     )
 
 
-    Semantic().switch_scope(Semantic().scope_tree[Semantic().current_scope].father.scope_no)
-    if Semantic().current_scope == 0:
-        Memory().set_new_command(
+    ctx.semantic.switch_scope(ctx.semantic.scope_tree[ctx.semantic.current_scope].father.scope_no)
+    if ctx.semantic.current_scope == 0:
+        ctx.memory.set_new_command(
             AddressingMode(
                 Command.JP,
-                Arg(AddressType.NUM, Memory().prog_p),
+                Arg(AddressType.NUM, ctx.memory.prog_p),
                 None,
                 None
             ),
-            idx=Semantic().stack[TOP].val,
+            idx=ctx.semantic.stack[TOP].val,
         )
-        POP()
+        POP(ctx)
 
-def NARG(lexeme: str):
-    func_scope = Semantic().scope_tree[Semantic().current_scope].father.scope_no
-    row = SymbolTable().find_func_scope(func_scope)
-    PID(lexeme)
-    POP()
-    arg = SymbolTable().table[-1]
+def NARG(ctx: 'CompilationContext', lexeme: str):
+    func_scope = ctx.semantic.scope_tree[ctx.semantic.current_scope].father.scope_no
+    row = ctx.symbol_table.find_func_scope(func_scope)
+    PID(ctx, lexeme)
+    POP(ctx)
+    arg = ctx.symbol_table.table[-1]
 
     row.attribute.args_addr.append(arg.attribute.mem_addr)
 
-def SAVE():
-    Semantic().stack.append(Arg(AddressType.NUM, Memory().prog_p))
-    Memory().prog_p += 1
+def SAVE(ctx: 'CompilationContext'):
+    ctx.semantic.stack.append(Arg(AddressType.NUM, ctx.memory.prog_p))
+    ctx.memory.prog_p += 1
 
-def SAVE_JPF():
-    Memory().set_new_command(
+def SAVE_JPF(ctx: 'CompilationContext'):
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.JPF,
-            Semantic().stack[TOP-2],
-            Arg(AddressType.NUM, Memory().prog_p),
+            ctx.semantic.stack[TOP-2],
+            Arg(AddressType.NUM, ctx.memory.prog_p),
             None
         ),
-        idx=Semantic().stack[TOP-1].val
+        idx=ctx.semantic.stack[TOP-1].val
     )
-    POP(-2)
-    POP(-2)
+    POP(ctx, -2)
+    POP(ctx, -2)
 
-def SAVE_JPT():
-    Memory().set_new_command(
+def SAVE_JPT(ctx: 'CompilationContext'):
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.JP,
-            Arg(AddressType.NUM, Memory().prog_p),
+            Arg(AddressType.NUM, ctx.memory.prog_p),
             None,
             None
         ),
-        idx=Semantic().stack[TOP].val
+        idx=ctx.semantic.stack[TOP].val
     )
-    POP()
+    POP(ctx)
 
-def WHILE_JPB():
-    Semantic().stack.append(Arg(AddressType.NUM, Memory().prog_p))
+def WHILE_JPB(ctx: 'CompilationContext'):
+    ctx.semantic.stack.append(Arg(AddressType.NUM, ctx.memory.prog_p))
 
-def ITMT_ATTR():
-    row = SymbolTable().find_row('while', Semantic().current_scope)
+def ITMT_ATTR(ctx: 'CompilationContext'):
+    row = ctx.symbol_table.find_row('while', ctx.semantic.current_scope)
     if not isinstance(row.attribute, ItmtAttribute):
-        row.attribute = ItmtAttribute(row.attribute.scope_no, row.attribute.mem_addr, [], [],
-                                     [0], [0], [])
+        ctx.symbol_table.set_attribute(row, ItmtAttribute(row.attribute.scope_no, row.attribute.mem_addr, [], [],
+                                     [0], [0], []))
     else:
         row.attribute.SS_break.append(len(row.attribute.breaks_PB))
         row.attribute.SS_cont.append(len(row.attribute.continues_PB))
     
-    row.attribute.start_addr_in_PBs.append(Memory().prog_p)
+    row.attribute.start_addr_in_PBs.append(ctx.memory.prog_p)
 
-def SAVE_WHILE():
-    row = SymbolTable().find_row('while', Semantic().current_scope)
-    Memory().set_new_command(
+def SAVE_WHILE(ctx: 'CompilationContext'):
+    row = ctx.symbol_table.find_row('while', ctx.semantic.current_scope)
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.JPF,
-            Semantic().stack[TOP-1],
-            Arg(AddressType.NUM, Memory().prog_p + 1),
+            ctx.semantic.stack[TOP-1],
+            Arg(AddressType.NUM, ctx.memory.prog_p + 1),
             None
         ),
-        idx=Semantic().stack[TOP].val
+        idx=ctx.semantic.stack[TOP].val
     )
-    POP()
-    POP()
+    POP(ctx)
+    POP(ctx)
     start_break = row.attribute.SS_break.pop()
     while row.attribute.breaks_PB and len(row.attribute.breaks_PB) > start_break:
-        Memory().set_new_command(
+        ctx.memory.set_new_command(
             AddressingMode(
                 Command.JP,
-                Arg(AddressType.NUM, Memory().prog_p + 1),
+                Arg(AddressType.NUM, ctx.memory.prog_p + 1),
                 None,
                 None
             ),
             idx = row.attribute.breaks_PB.pop()
         )
     
-    Memory().set_new_command(
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.JP,
-            Semantic().stack[TOP],
+            ctx.semantic.stack[TOP],
             None,
             None
         )
@@ -377,7 +377,7 @@ def SAVE_WHILE():
     start_cont = row.attribute.SS_cont.pop()
     prog_start_addr = row.attribute.start_addr_in_PBs.pop()
     while row.attribute.continues_PB and len(row.attribute.continues_PB) > start_cont:
-        Memory().set_new_command(
+        ctx.memory.set_new_command(
             AddressingMode(
                 Command.JP,
                 Arg(AddressType.NUM, prog_start_addr),
@@ -386,86 +386,86 @@ def SAVE_WHILE():
             ),
             idx = row.attribute.continues_PB.pop()
         )
-    POP()
+    POP(ctx)
 
-def RELOP0():
-    Semantic().stack.append(Arg(AddressType.NUM, 0))
+def RELOP0(ctx: 'CompilationContext'):
+    ctx.semantic.stack.append(Arg(AddressType.NUM, 0))
 
-def RELOP1():
-    Semantic().stack.append(Arg(AddressType.NUM, 1))
+def RELOP1(ctx: 'CompilationContext'):
+    ctx.semantic.stack.append(Arg(AddressType.NUM, 1))
 
-def SET_RELOP():
-    arg3 = Arg(AddressType.DIRECT, Memory().get_new_tmp())
-    if Semantic().stack[TOP-1].val == 0:
+def SET_RELOP(ctx: 'CompilationContext'):
+    arg3 = Arg(AddressType.DIRECT, ctx.memory.get_new_tmp())
+    if ctx.semantic.stack[TOP-1].val == 0:
         command = Command.EQ
-    elif Semantic().stack[TOP-1].val == 1:
+    elif ctx.semantic.stack[TOP-1].val == 1:
         command = Command.LT
     else:
         raise Exception()
     
-    Memory().set_new_command(
+    ctx.memory.set_new_command(
         AddressingMode(
             command,
-            Semantic().stack[TOP-2],
-            Semantic().stack[TOP],
+            ctx.semantic.stack[TOP-2],
+            ctx.semantic.stack[TOP],
             arg3
         )
     )
 
-    POP()
-    POP()
-    POP()
-    Semantic().stack.append(arg3)
+    POP(ctx)
+    POP(ctx)
+    POP(ctx)
+    ctx.semantic.stack.append(arg3)
 
-def PID(lexeme: str):
-    row = SymbolTable().find_row(lexeme, Semantic().current_scope)
+def PID(ctx: 'CompilationContext', lexeme: str):
+    row = ctx.symbol_table.find_row(lexeme, ctx.semantic.current_scope)
 
     addr = row.attribute.mem_addr
     if addr is None:
-        addr = Memory().get_new_data_addr()
+        addr = ctx.memory.get_new_data_addr()
         row.attribute.mem_addr = addr        
-        row.attribute.scope_no = Semantic().current_scope
+        ctx.symbol_table.set_scope(row, ctx.semantic.current_scope)
     
-    Semantic().stack.append(Arg(AddressType.DIRECT, addr))
+    ctx.semantic.stack.append(Arg(AddressType.DIRECT, addr))
 
-def PID2(lexeme: str):
-    row = SymbolTable().find_row(lexeme, Semantic().current_scope, force_mem_addr=True)
+def PID2(ctx: 'CompilationContext', lexeme: str):
+    row = ctx.symbol_table.find_row(lexeme, ctx.semantic.current_scope, force_mem_addr=True)
 
     if row is not None:
-        Semantic().stack.append(Arg(AddressType.DIRECT, row.attribute.mem_addr))
+        ctx.semantic.stack.append(Arg(AddressType.DIRECT, row.attribute.mem_addr))
     else:
-        Semantic().stack.append(Arg(AddressType.DIRECT, 0))        
+        ctx.semantic.stack.append(Arg(AddressType.DIRECT, 0))        
 
-def PNUM(NUM: str):
-    Semantic().stack.append(Arg(AddressType.NUM, NUM))
+def PNUM(ctx: 'CompilationContext', NUM: str):
+    ctx.semantic.stack.append(Arg(AddressType.NUM, NUM))
 
-def PRINT():
-    Memory().set_new_command(
+def PRINT(ctx: 'CompilationContext'):
+    ctx.memory.set_new_command(
         AddressingMode(
             Command.PRINT,
-            Semantic().stack[TOP],
+            ctx.semantic.stack[TOP],
             None,
             None
         )
     )
-    POP()
+    POP(ctx)
 
-def SCOPING(lexeme: str):
-    row = SymbolTable().find_row(lexeme, Semantic().current_scope, force_mem_addr=True)
+def SCOPING(ctx: 'CompilationContext', lexeme: str):
+    row = ctx.symbol_table.find_row(lexeme, ctx.semantic.current_scope, force_mem_addr=True)
     if row is None:
-        Semantic().error_handler(SemanticErrorType.SCOPING, lexeme)
+        ctx.semantic.error_handler(SemanticErrorType.SCOPING, lexeme)
 
-def MAIN_FUNC_DEF():
-    Semantic().error_handler(SemanticErrorType.MAIN_FUNC_DEF)
+def MAIN_FUNC_DEF(ctx: 'CompilationContext'):
+    ctx.semantic.error_handler(SemanticErrorType.MAIN_FUNC_DEF)
 
-def OVERLOADING():
-    symboltable_ind = int(POP().comb)
-    mem_data_ptr = int(POP().comb)
-    scope_no = int(POP().comb)
+def OVERLOADING(ctx: 'CompilationContext'):
+    symboltable_ind = int(POP(ctx).comb)
+    mem_data_ptr = int(POP(ctx).comb)
+    scope_no = int(POP(ctx).comb)
     
-    func_name = SymbolTable().table[symboltable_ind].lexeme
-    func_scope = Semantic().scope_tree[scope_no].father.scope_no
-    all_funcs = SymbolTable().find_func_scope(func_scope, lexeme=func_name, all=True)
+    func_name = ctx.symbol_table.table[symboltable_ind].lexeme
+    func_scope = ctx.semantic.scope_tree[scope_no].father.scope_no
+    all_funcs = ctx.symbol_table.find_func_scope(func_scope, lexeme=func_name, all=True)
     if len(all_funcs) <= 1:
         return
 
@@ -474,13 +474,13 @@ def OVERLOADING():
     for func in all_funcs:
         nargs_ = len(func.attribute.args_addr)
         if nargs == nargs_:
-            Semantic().error_handler(SemanticErrorType.OVERLOADING, target_func.lexeme)
-            SymbolTable().table[symboltable_ind] = Row(DEAD_FUNC, None, func.attribute)
-            Memory().data_p = mem_data_ptr
+            ctx.semantic.error_handler(SemanticErrorType.OVERLOADING, target_func.lexeme)
+            ctx.symbol_table.replace_row(symboltable_ind, Row(DEAD_FUNC, None, func.attribute))
+            ctx.memory.data_p = mem_data_ptr
             break
 
-def NO_OP():
-    Semantic().no_op = False
+def NO_OP(ctx: 'CompilationContext'):
+    ctx.semantic.no_op = False
 
-def FINISH_NO_OP():
-    Semantic().no_op = True
\ No newline at end of file
+def FINISH_NO_OP(ctx: 'CompilationContext'):
+    ctx.semantic.no_op = True
\ No newline at end of file
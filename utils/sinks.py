@@ -0,0 +1,147 @@
+import io
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Union
+
+from data_class.error import ScannerError
+from data_class.token import Token
+
+_WRITE_BUFFER = 1 << 16
+""" size of the buffer of streamed files, so they are written in large chunks """
+
+
+class LineGroupedSink:
+    """writes tokens or errors as soon as they arrive, grouped by their line number
+
+    Each line of the file looks like `<line>.\t<item> <item> ...`. A line is written once an item of a
+    later line arrives, so only the items of one line are kept in memory.
+
+    Args:
+        f (TextIO): file to write into
+        empty_msg (Optional[str]): written instead of the lines if nothing arrives. If None, an empty 
+            first line is written
+    """
+    def __init__(self, f: TextIO, empty_msg: Optional[str] = None) -> None:
+        self._f: TextIO = f
+        self._empty_msg: Optional[str] = empty_msg
+        self._line_num: int = 1
+        self._items_in_line: List[str] = list()
+        self._received: bool = False
+
+    def write(self, item: Union[Token, ScannerError]) -> None:
+        self._received = True
+        if item.line > self._line_num:
+            self._flush_line()
+            self._line_num = item.line
+        
+        self._items_in_line.append(item.all_in_one)
+
+    def _flush_line(self) -> None:
+        if self._items_in_line:
+            self._f.write(f"{self._line_num}.\t" + " ".join(self._items_in_line) + "\n")
+            self._items_in_line.clear()
+
+    def close(self) -> None:
+        """writes the last line"""
+
+        if not self._received and self._empty_msg is not None:
+            self._f.write(self._empty_msg)
+        else:
+            self._f.write(f"{self._line_num}.\t" + " ".join(self._items_in_line) + "\n")
+            self._items_in_line.clear()
+
+
+class ArtifactSink:
+    """output files of a compilation, each one written at once (NOTE: files are named like `output.txt`)
+
+    Between entering and exiting the sink, files given by `put` are held, so a file given many times
+    (e.g. `output.txt`, which is replaced if there are semantic errors) is written only once at the end.
+    Otherwise they are written right away. Files too large to hold, like the parse tree, are streamed by `open`.
+
+    Args:
+        save_dir (Optional[str]): directory where files are saved. If None, files are only kept in `buffers`
+        disabled (Iterable[str]): files which are neither saved nor kept
+        keep (bool): whether to keep files in `buffers` while saving them too
+    """
+    def __init__(self, save_dir: Optional[str] = ".", disabled: Iterable[str] = (), keep: bool = False) -> None:
+        self.save_dir: Optional[str] = save_dir
+        self.disabled: Set[str] = set(disabled)
+        self.keep: bool = keep or save_dir is None
+
+        self.buffers: Dict[str, str] = dict()
+        """ content of kept files by their names """
+
+        self._held: Optional[Dict[str, Optional[str]]] = None
+        """ files given since the sink is entered by their names, where removed ones are None """
+
+    def __enter__(self) -> 'ArtifactSink':
+        # kept files are the ones of the last compilation
+        self.buffers.clear()
+        self._held = dict()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        held, self._held = self._held, None
+        for name, content in held.items():
+            if content is None:
+                self._discard(name)
+            else:
+                self._save(name, content)
+
+    def enabled(self, name: str) -> bool:
+        """whether a file is saved or kept, so its content is worth making"""
+        return name not in self.disabled
+
+    def _save(self, name: str, content: str) -> None:
+        if self.keep:
+            self.buffers[name] = content
+        if self.save_dir is not None:
+            with open(os.path.join(self.save_dir, name), 'w') as f:
+                f.write(content)
+
+    def _discard(self, name: str) -> None:
+        self.buffers.pop(name, None)
+        if self.save_dir is not None:
+            try:
+                os.remove(os.path.join(self.save_dir, name))
+            except FileNotFoundError:
+                pass
+
+    def remove(self, name: str) -> None:
+        """removes a file which is not made this time, so a file of an earlier compilation is not left beside the new ones"""
+
+        if not self.enabled(name):
+            return
+        if self._held is not None:
+            self._held[name] = None
+        else:
+            self._discard(name)
+
+    def put(self, name: str, content: Union[str, Iterable[str]]) -> None:
+        """gives the whole content of a file, replacing what is given before
+
+        Args:
+            content (Union[str, Iterable[str]]): content or pieces of it, which are joined
+        """
+
+        if not self.enabled(name):
+            return
+        if not isinstance(content, str):
+            content = "".join(content)
+        if self._held is not None:
+            self._held[name] = content
+        else:
+            self._save(name, content)
+
+    @contextmanager
+    def open(self, name: str) -> Iterator[TextIO]:
+        """file to write a large content into piece by piece, which is saved once it is closed"""
+
+        if self.keep or not self.enabled(name):
+            f = io.StringIO()
+            yield f
+            if self.enabled(name):
+                self._save(name, f.getvalue())
+        else:
+            with open(os.path.join(self.save_dir, name), 'w', buffering=_WRITE_BUFFER) as f:
+                yield f